@@ -0,0 +1,34 @@
+"""image variants
+
+Revision ID: 5c07e3b9d2a1
+Revises: a81e4c5f09d2
+Create Date: 2026-10-18 12:24:05.731846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c07e3b9d2a1'
+down_revision: Union[str, None] = 'a81e4c5f09d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('post_images', sa.Column('thumbnail_url', sa.String(), nullable=True))
+    op.add_column('post_images', sa.Column('medium_url', sa.String(), nullable=True))
+    op.add_column('photos', sa.Column('thumbnail_url', sa.String(), nullable=True))
+    op.add_column('photos', sa.Column('medium_url', sa.String(), nullable=True))
+    op.add_column('users', sa.Column('profile_image_thumbnail_url', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'profile_image_thumbnail_url')
+    op.drop_column('photos', 'medium_url')
+    op.drop_column('photos', 'thumbnail_url')
+    op.drop_column('post_images', 'medium_url')
+    op.drop_column('post_images', 'thumbnail_url')
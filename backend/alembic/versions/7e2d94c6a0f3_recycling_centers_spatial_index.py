@@ -0,0 +1,57 @@
+"""recycling centers spatial index
+
+Revision ID: 7e2d94c6a0f3
+Revises: 5c07e3b9d2a1
+Create Date: 2026-10-18 13:02:48.116259
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e2d94c6a0f3'
+down_revision: Union[str, None] = '5c07e3b9d2a1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_TRIGGERS = {
+    'recycling_centers_rtree_ai': """
+        CREATE TRIGGER recycling_centers_rtree_ai AFTER INSERT ON recycling_centers
+        WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL BEGIN
+            INSERT INTO recycling_centers_rtree VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+        END""",
+    'recycling_centers_rtree_au': """
+        CREATE TRIGGER recycling_centers_rtree_au AFTER UPDATE OF latitude, longitude ON recycling_centers BEGIN
+            DELETE FROM recycling_centers_rtree WHERE id = old.id;
+            INSERT INTO recycling_centers_rtree
+                SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+                WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+        END""",
+    'recycling_centers_rtree_ad': """
+        CREATE TRIGGER recycling_centers_rtree_ad AFTER DELETE ON recycling_centers BEGIN
+            DELETE FROM recycling_centers_rtree WHERE id = old.id;
+        END""",
+}
+
+
+def upgrade() -> None:
+    op.create_index('ix_recycling_centers_latitude_longitude', 'recycling_centers', ['latitude', 'longitude'],
+                    unique=False)
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("CREATE VIRTUAL TABLE recycling_centers_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)")
+        for trigger in SQLITE_TRIGGERS.values():
+            op.execute(trigger)
+        op.execute(
+            "INSERT INTO recycling_centers_rtree SELECT id, latitude, latitude, longitude, longitude "
+            "FROM recycling_centers WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'sqlite':
+        for name in SQLITE_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS recycling_centers_rtree")
+    op.drop_index('ix_recycling_centers_latitude_longitude', table_name='recycling_centers')
@@ -0,0 +1,51 @@
+"""user ledgers
+
+Revision ID: 9b4e1f7c3a25
+Revises: 7e2d94c6a0f3
+Create Date: 2026-10-18 15:02:41.318220
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b4e1f7c3a25'
+down_revision: Union[str, None] = '7e2d94c6a0f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'user_ledgers',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('total_rewards', sa.Integer(), nullable=False),
+        sa.Column('total_expenses', sa.Integer(), nullable=False),
+        sa.Column('reward_count', sa.Integer(), nullable=False),
+        sa.Column('expense_count', sa.Integer(), nullable=False),
+        sa.Column('last_event_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    op.execute(
+        """
+        INSERT INTO user_ledgers (user_id, total_rewards, total_expenses, reward_count, expense_count, last_event_at)
+        SELECT user_id, COALESCE(SUM(reward_points), 0), COALESCE(SUM(expense_points), 0),
+               SUM(is_reward), SUM(1 - is_reward), MAX(at)
+        FROM (
+            SELECT user_id, points AS reward_points, 0 AS expense_points, 1 AS is_reward, created_at AS at
+            FROM rewards
+            UNION ALL
+            SELECT user_id, 0, points, 0, created_at FROM expenses
+        ) AS events
+        WHERE user_id IS NOT NULL
+        GROUP BY user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_ledgers')
@@ -0,0 +1,36 @@
+"""response cache invalidations
+
+Revision ID: a4c8e2f6b9d3
+Revises: f2b7d4e9a1c6
+Create Date: 2026-10-18 21:05:17.316842
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c8e2f6b9d3'
+down_revision: Union[str, None] = 'f2b7d4e9a1c6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'response_cache_invalidations',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('tag', sa.String(), nullable=False),
+        sa.Column('origin', sa.String(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_response_cache_invalidations_created_at', 'response_cache_invalidations', ['created_at'],
+                    unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_response_cache_invalidations_created_at', table_name='response_cache_invalidations')
+    op.drop_table('response_cache_invalidations')
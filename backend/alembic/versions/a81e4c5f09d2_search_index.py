@@ -0,0 +1,77 @@
+"""search index
+
+Revision ID: a81e4c5f09d2
+Revises: 3f9c2a7d1b64
+Create Date: 2026-10-18 11:03:17.594120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a81e4c5f09d2'
+down_revision: Union[str, None] = '3f9c2a7d1b64'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Posts are stored under rowid id * 2 and products under id * 2 + 1, see crud_search
+SQLITE_TRIGGERS = {
+    'posts_search_ai': """
+        CREATE TRIGGER posts_search_ai AFTER INSERT ON posts BEGIN
+            INSERT INTO search_index(rowid, title, body) VALUES (new.id * 2, new.title, new.content);
+        END""",
+    'posts_search_ad': """
+        CREATE TRIGGER posts_search_ad AFTER DELETE ON posts BEGIN
+            DELETE FROM search_index WHERE rowid = old.id * 2;
+        END""",
+    'posts_search_au': """
+        CREATE TRIGGER posts_search_au AFTER UPDATE OF title, content ON posts BEGIN
+            DELETE FROM search_index WHERE rowid = old.id * 2;
+            INSERT INTO search_index(rowid, title, body) VALUES (new.id * 2, new.title, new.content);
+        END""",
+    'products_search_ai': """
+        CREATE TRIGGER products_search_ai AFTER INSERT ON products BEGIN
+            INSERT INTO search_index(rowid, title, body) VALUES (new.id * 2 + 1, new.name, new.description);
+        END""",
+    'products_search_ad': """
+        CREATE TRIGGER products_search_ad AFTER DELETE ON products BEGIN
+            DELETE FROM search_index WHERE rowid = old.id * 2 + 1;
+        END""",
+    'products_search_au': """
+        CREATE TRIGGER products_search_au AFTER UPDATE OF name, description ON products BEGIN
+            DELETE FROM search_index WHERE rowid = old.id * 2 + 1;
+            INSERT INTO search_index(rowid, title, body) VALUES (new.id * 2 + 1, new.name, new.description);
+        END""",
+}
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("CREATE VIRTUAL TABLE search_index USING fts5(title, body, tokenize = 'porter unicode61')")
+        for trigger in SQLITE_TRIGGERS.values():
+            op.execute(trigger)
+        op.execute("INSERT INTO search_index(rowid, title, body) SELECT id * 2, title, content FROM posts")
+        op.execute("INSERT INTO search_index(rowid, title, body) SELECT id * 2 + 1, name, description FROM products")
+    elif dialect == 'postgresql':
+        op.execute(
+            "CREATE INDEX ix_posts_search ON posts USING gin "
+            "(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(content, '')))"
+        )
+        op.execute(
+            "CREATE INDEX ix_products_search ON products USING gin "
+            "(to_tsvector('english', coalesce(name, '') || ' ' || coalesce(description, '')))"
+        )
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for name in SQLITE_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {name}")
+        op.execute("DROP TABLE IF EXISTS search_index")
+    elif dialect == 'postgresql':
+        op.execute("DROP INDEX IF EXISTS ix_products_search")
+        op.execute("DROP INDEX IF EXISTS ix_posts_search")
@@ -0,0 +1,36 @@
+"""reference data versions
+
+Revision ID: c6d2a8e41f57
+Revises: 9b4e1f7c3a25
+Create Date: 2026-10-18 16:47:12.904355
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6d2a8e41f57'
+down_revision: Union[str, None] = '9b4e1f7c3a25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    versions = op.create_table(
+        'reference_data_versions',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('name')
+    )
+    op.bulk_insert(versions, [
+        {'name': 'waste_types', 'version': 0},
+        {'name': 'post_types', 'version': 0},
+        {'name': 'product_types', 'version': 0},
+    ])
+
+
+def downgrade() -> None:
+    op.drop_table('reference_data_versions')
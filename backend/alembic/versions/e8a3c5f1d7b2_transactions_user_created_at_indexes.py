@@ -0,0 +1,27 @@
+"""transactions user created_at indexes
+
+Revision ID: e8a3c5f1d7b2
+Revises: c6d2a8e41f57
+Create Date: 2026-10-18 10:36:52.417093
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e8a3c5f1d7b2'
+down_revision: Union[str, None] = 'c6d2a8e41f57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_rewards_user_id_created_at', 'rewards', ['user_id', 'created_at'], unique=False)
+    op.create_index('ix_expenses_user_id_created_at', 'expenses', ['user_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_expenses_user_id_created_at', table_name='expenses')
+    op.drop_index('ix_rewards_user_id_created_at', table_name='rewards')
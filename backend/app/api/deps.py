@@ -1,14 +1,16 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from backend.app.core.config import settings
 from backend.app.crud import crud_user
-from backend.app.db.session import SessionLocal
+from backend.app.db.routing import PIN_STATE, REPLICA_STATE, pin_is_active
+from backend.app.db.session import SessionLocal, AsyncSessionLocal, read_router
 from backend.app.schemas import TokenPayload, User
 
 reusable_oauth2 = OAuth2PasswordBearer(
@@ -16,31 +18,104 @@ reusable_oauth2 = OAuth2PasswordBearer(
 )
 
 
-def get_db() -> Generator:
+MUTATING_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+
+def _record_write(request: Request):
+    # Picked up by ReadYourWritesMiddleware and sent back to the client as a cookie
+    if request.method in MUTATING_METHODS:
+        setattr(request.state, PIN_STATE, read_router.pin_deadline())
+
+
+def _pinned(request: Request) -> bool:
+    return pin_is_active(request.cookies.get(settings.READ_YOUR_WRITES_COOKIE))
+
+
+def _read_session(request: Request) -> Session:
+    db = read_router.read_session(_pinned(request))
+    if db.info.get("replica"):
+        setattr(request.state, REPLICA_STATE, True)
+    return db
+
+
+def get_db(request: Request) -> Generator:
     try:
         db = SessionLocal()
         yield db
     finally:
         db.close()
+        _record_write(request)
 
 
-def get_current_user(
-        db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
-) -> User:
+def get_read_db(request: Request) -> Generator:
+    """Session on a replica (or the primary's read-only pool), for handlers that never write."""
+    db = _read_session(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def open_read_session(request: Request) -> Session:
+    """Read session the caller closes itself, for streamed responses that outlive the request's dependencies."""
+    return _read_session(request)
+
+
+async def get_async_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
+    _record_write(request)
+
+
+def get_token_payload(token: str = Depends(reusable_oauth2)) -> TokenPayload:
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        token_data = TokenPayload(**payload)
+        return TokenPayload(**payload)
     except (jwt.JWTError, ValidationError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
+
+
+def _snapshot(user) -> User:
+    # Copied, not validated: constraints such as balance >= 0 describe responses, and a row breaking one
+    # must not lock its owner out of every authenticated endpoint
+    return User.model_construct(**{field: getattr(user, field) for field in User.model_fields})
+
+
+def get_current_user(
+        db: Session = Depends(get_db), token_data: TokenPayload = Depends(get_token_payload)
+) -> User:
+    """The caller as a schemas.User snapshot, in both auth modes.
+
+    It is not an ORM instance: handlers that need the row (relationships, crud functions that modify it)
+    load it with crud_user.get_user(db, current_user.id).
+    """
+    if settings.STATELESS_AUTH:
+        cached_user = crud_user.user_cache.get(token_data.sub)
+        if cached_user is not None:
+            return cached_user
     user = crud_user.get_user(db, user_id=token_data.sub)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    snapshot = _snapshot(user)
+    if settings.STATELESS_AUTH:
+        crud_user.user_cache.set(user.id, snapshot)
+    return snapshot
+
+
+def get_current_user_id(
+        db: Session = Depends(get_db), token_data: TokenPayload = Depends(get_token_payload)
+) -> int:
+    """For handlers that only need the caller's id; in stateless mode this never touches the database."""
+    if settings.STATELESS_AUTH and token_data.is_active is not None:
+        if not token_data.is_active:
+            raise HTTPException(status_code=400, detail="Inactive user")
+        return token_data.sub
+    return get_current_user(db, token_data).id
 
 
 def get_current_active_user(
@@ -49,3 +124,11 @@ def get_current_active_user(
     if not crud_user.is_active(current_user):
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+
+def get_current_admin(
+        current_user: User = Depends(get_current_active_user),
+) -> User:
+    if current_user.email not in settings.ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    return current_user
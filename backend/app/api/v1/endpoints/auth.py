@@ -2,38 +2,43 @@
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from backend.app.api import deps
-from backend.app.core.security import create_access_token, get_password_hash, create_password_reset_token, \
-    verify_password_reset_token
+from backend.app.core.security import create_access_token, create_password_reset_token, verify_password_reset_token
 from backend.app.crud import crud_user
 from backend.app.schemas import Token, UserCreate, PasswordResetRequest, SetNewPasswordRequest
-from backend.app.services import send_reset_password_email
+from backend.app.services import queue_reset_password_email
 
 router = APIRouter()
 
 
+def _issue_token(user) -> dict:
+    # is_active travels in the token so stateless auth can reject inactive accounts without a lookup
+    access_token = create_access_token(subject=user.id, claims={"is_active": user.is_active})
+    return {"access_token": access_token, "token_type": "bearer"}
+
+
 @router.post("/signup", response_model=Token, status_code=201)
-def signup(user: UserCreate, db: Session = Depends(deps.get_db)):
-    db_user = crud_user.get_user_by_email(db, email=user.email)
+async def signup(user: UserCreate, db: Session = Depends(deps.get_db)):
+    # Async for the password pool; queries still go to the threadpool, see crud_user.create_user
+    db_user = await run_in_threadpool(crud_user.get_user_by_email, db, email=user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    user = crud_user.create_user(db, user=user)
-    access_token = create_access_token(subject=user.id)
-    return {"access_token": access_token, "token_type": "bearer"}
+    user = await crud_user.create_user(db, user=user)
+    return _issue_token(user)
 
 
 @router.post("/login", response_model=Token, status_code=200)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(deps.get_db)):
-    user = crud_user.authenticate_user(db, email=form_data.username, password=form_data.password)
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(deps.get_db)):
+    user = await crud_user.authenticate_user(db, email=form_data.username, password=form_data.password)
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
-    access_token = create_access_token(subject=user.id)
-    return {"access_token": access_token, "token_type": "bearer"}
+    return _issue_token(user)
 
 
 @router.post("/request-password-reset", status_code=200)
-async def request_password_reset(
+def request_password_reset(
         request: PasswordResetRequest,
         db: Session = Depends(deps.get_db)
 ):
@@ -43,27 +48,22 @@ async def request_password_reset(
         return {"message": "If an account with that email exists, we have sent a password reset link"}
 
     token = create_password_reset_token(email=request.email)
-
-    try:
-        await send_reset_password_email(request.email, token)
-    except Exception:
-        raise HTTPException(status_code=500, detail="Failed to send password reset email. Please try again later.")
+    # Delivered by the email worker, so the response doesn't wait on SMTP
+    queue_reset_password_email(db, request.email, token)
 
     return {"message": "If an account with that email exists, we have sent a password reset link"}
 
 
 @router.post("/reset-password", status_code=200)
-def reset_password(request: SetNewPasswordRequest, db: Session = Depends(deps.get_db)):
+async def reset_password(request: SetNewPasswordRequest, db: Session = Depends(deps.get_db)):
     email = verify_password_reset_token(request.token)
     if not email:
         raise HTTPException(status_code=400, detail="Invalid or expired token")
 
-    user = crud_user.get_user_by_email(db, email=email)
+    user = await run_in_threadpool(crud_user.get_user_by_email, db, email=email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    hashed_password = get_password_hash(request.new_password)
-    user.hashed_password = hashed_password
-    db.commit()
+    await crud_user.set_password(db, user, request.new_password)
 
     return {"message": "Password has been reset successfully"}
@@ -12,7 +12,7 @@ router = APIRouter()
 
 @router.get("/", response_model=list[CalendarEvent])
 def get_calendar_events(
-        db: Session = Depends(deps.get_db),
+        db: Session = Depends(deps.get_read_db),
         current_user: User = Depends(deps.get_current_user),
         skip: int = 0,
         limit: int = 100
@@ -11,7 +11,7 @@ router = APIRouter()
 
 @router.get("/", response_model=list[Expense])
 def read_expenses(
-        db: Session = Depends(deps.get_db),
+        db: Session = Depends(deps.get_read_db),
         current_user: User = Depends(deps.get_current_user),
         skip: int = 0,
         limit: int = 100
@@ -47,7 +47,7 @@ def update_expense(
 
 @router.get("/statistics")
 def get_expense_statistics(
-        db: Session = Depends(deps.get_db),
+        db: Session = Depends(deps.get_read_db),
         current_user: User = Depends(deps.get_current_user),
         period: str = Query(..., enum=["month", "year"])
 ):
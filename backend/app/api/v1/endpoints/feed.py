@@ -1,32 +1,80 @@
 # app/api/v1/endpoints/feed.py
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from fastapi import APIRouter, Depends, Query, HTTPException, status, UploadFile, File
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from backend.app.api import deps
+from backend.app.core.serialization import FastJSONResponse, serializers
 from backend.app.crud import crud_post
-from backend.app.schemas import Post, PostCreate, PostUpdate, User
+from backend.app.schemas import Post, PostCreate, PostSummary, PostUpdate, User
 
 router = APIRouter()
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
 
-@router.get("/", response_model=List[Post])
+
+def _next_cursor_headers(posts: list, limit: int) -> dict:
+    # A short page means the listing is exhausted, so there is nothing to continue from
+    if len(posts) == limit:
+        return {NEXT_CURSOR_HEADER: crud_post.encode_cursor(posts[-1])}
+    return {}
+
+
+@router.get("/", response_model=List[Post], response_class=FastJSONResponse)
 def read_feed(
-        db: Session = Depends(deps.get_db),
+        db: Session = Depends(deps.get_read_db),
+        skip: int = Query(0, ge=0),
+        limit: int = Query(20, ge=1, le=100),
+        search: Optional[str] = Query(None, min_length=3, max_length=50),
+        post_type_id: Optional[int] = Query(None),
+        cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header; overrides skip")
+):
+    try:
+        posts = crud_post.get_posts(db, skip=skip, limit=limit, search=search, post_type_id=post_type_id,
+                                    cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return serializers.response(List[Post], posts, headers=_next_cursor_headers(posts, limit))
+
+
+def summary_fields(
+        fields: Optional[str] = Query(
+            None, description=f"Comma-separated subset of {', '.join(crud_post.SUMMARY_FIELDS)}; id is always included")
+) -> Tuple[str, ...]:
+    if not fields:
+        return crud_post.SUMMARY_FIELDS
+    requested = tuple(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in requested if name not in crud_post.SUMMARY_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    return requested
+
+
+@router.get("/summary", response_model=List[PostSummary], response_class=FastJSONResponse)
+def read_feed_summary(
+        db: Session = Depends(deps.get_read_db),
+        fields: Tuple[str, ...] = Depends(summary_fields),
         skip: int = Query(0, ge=0),
         limit: int = Query(20, ge=1, le=100),
         search: Optional[str] = Query(None, min_length=3, max_length=50),
-        post_type_id: Optional[int] = Query(None)
+        post_type_id: Optional[int] = Query(None),
+        cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header; overrides skip")
 ):
-    posts = crud_post.get_posts(db, skip=skip, limit=limit, search=search, post_type_id=post_type_id)
-    return posts
+    try:
+        rows = crud_post.get_post_summaries(db, fields, skip=skip, limit=limit, search=search,
+                                            post_type_id=post_type_id, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return serializers.response(List[PostSummary], crud_post.summarize(db, rows, fields),
+                                headers=_next_cursor_headers(rows, limit), exclude_unset=True)
 
 
 @router.get("/{post_id}", response_model=Post)
 def read_post(
         post_id: int,
-        db: Session = Depends(deps.get_db)
+        db: Session = Depends(deps.get_read_db)
 ):
     post = crud_post.get_post(db, id=post_id)
     if post is None:
@@ -35,40 +83,61 @@ def read_post(
 
 
 @router.post("/", response_model=Post)
-def create_post(
+async def create_post(
         post: PostCreate = Depends(),
         files: List[UploadFile] = File(None),
         db: Session = Depends(deps.get_db),
         current_user: User = Depends(deps.get_current_user)
 ):
-    return crud_post.create_post(db, post, current_user.id, files)
+    return await crud_post.create_post(db, post, current_user.id, files)
 
 
-@router.get("/user/{user_id}", response_model=List[Post])
+@router.get("/user/{user_id}", response_model=List[Post], response_class=FastJSONResponse)
 def read_user_posts(
         user_id: int,
-        db: Session = Depends(deps.get_db),
+        db: Session = Depends(deps.get_read_db),
+        skip: int = Query(0, ge=0),
+        limit: int = Query(20, ge=1, le=100),
+        cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header; overrides skip")
+):
+    try:
+        posts = crud_post.get_user_posts(db, user_id=user_id, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return serializers.response(List[Post], posts, headers=_next_cursor_headers(posts, limit))
+
+
+@router.get("/user/{user_id}/summary", response_model=List[PostSummary], response_class=FastJSONResponse)
+def read_user_posts_summary(
+        user_id: int,
+        db: Session = Depends(deps.get_read_db),
+        fields: Tuple[str, ...] = Depends(summary_fields),
         skip: int = Query(0, ge=0),
-        limit: int = Query(20, ge=1, le=100)
+        limit: int = Query(20, ge=1, le=100),
+        cursor: Optional[str] = Query(None, description=f"Value of the {NEXT_CURSOR_HEADER} header; overrides skip")
 ):
-    posts = crud_post.get_user_posts(db, user_id=user_id, skip=skip, limit=limit)
-    return posts
+    try:
+        rows = crud_post.get_post_summaries(db, fields, author_id=user_id, skip=skip, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return serializers.response(List[PostSummary], crud_post.summarize(db, rows, fields),
+                                headers=_next_cursor_headers(rows, limit), exclude_unset=True)
 
 
 @router.put("/{post_id}", response_model=Post)
-def update_post(
+async def update_post(
         post_id: int,
         post: PostUpdate,
         files: List[UploadFile] = File(None),
         db: Session = Depends(deps.get_db),
         current_user: User = Depends(deps.get_current_user)
 ):
-    db_post = crud_post.get_post(db, post_id)
+    db_post = await run_in_threadpool(crud_post.get_post, db, post_id)
     if not db_post:
         raise HTTPException(status_code=404, detail="Post not found")
     if db_post.author_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    return crud_post.update_post(db, db_post, post, files)
+    return await crud_post.update_post(db, db_post, post, files)
 
 
 @router.delete("/{post_id}", response_model=Post)
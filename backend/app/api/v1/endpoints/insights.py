@@ -12,7 +12,7 @@ router = APIRouter()
 
 @router.get("/", response_model=UserInsights)
 def get_user_insights(
-        db: Session = Depends(deps.get_db),
+        db: Session = Depends(deps.get_read_db),
         current_user: User = Depends(deps.get_current_user)
 ):
     try:
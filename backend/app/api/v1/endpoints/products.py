@@ -3,22 +3,23 @@ from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.orm import Session
 
 from backend.app.api import deps
+from backend.app.core.serialization import FastJSONResponse, serializers
 from backend.app.crud import crud_product
 from backend.app.schemas import Product, ProductCreate, ProductUpdate, User
 
 router = APIRouter()
 
 
-@router.get("/", response_model=list[Product])
+@router.get("/", response_model=list[Product], response_class=FastJSONResponse)
 def read_products(
-        db: Session = Depends(deps.get_db),
+        db: Session = Depends(deps.get_read_db),
         skip: int = 0,
         limit: int = 100,
         search: str = Query(None, min_length=0, max_length=50),
         product_type_id: int = Query(None)
 ):
     products = crud_product.get_products(db, skip=skip, limit=limit, search=search, product_type_id=product_type_id)
-    return products
+    return serializers.response(list[Product], products)
 
 
 @router.post("/", response_model=Product)
@@ -35,7 +36,7 @@ def create_product(
 @router.get("/{product_id}", response_model=Product)
 def get_product(
         product_id: int,
-        db: Session = Depends(deps.get_db)
+        db: Session = Depends(deps.get_read_db)
 ):
     product = crud_product.get_product(db, product_id=product_id)
     if not product:
@@ -5,17 +5,18 @@ from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
 from backend.app.api import deps
+from backend.app.core.serialization import FastJSONResponse, serializers
 from backend.app.crud import crud_search
 from backend.app.schemas.search import SearchResult
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[SearchResult])
+@router.get("/", response_model=List[SearchResult], response_class=FastJSONResponse)
 def search(
         query: str = Query(..., min_length=3),
-        db: Session = Depends(deps.get_db),
+        db: Session = Depends(deps.get_read_db),
         skip: int = Query(0, ge=0),
         limit: int = Query(20, ge=1, le=100)
 ):
-    return crud_search.search(db, query, skip=skip, limit=limit)
+    return serializers.response(List[SearchResult], crud_search.search(db, query, skip=skip, limit=limit))
@@ -1,13 +1,17 @@
 # app/api/v1/endpoints/users.py
-from http.client import HTTPException
+from functools import partial
 from typing import List, Dict
 
-from fastapi import APIRouter, Depends, UploadFile, File, Body
+from fastapi import APIRouter, Depends, UploadFile, File, Body, HTTPException, Path, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from backend.app.api import deps
-from backend.app.crud import crud_user
+from backend.app.core.serialization import FastJSONResponse
+from backend.app.crud import crud_user, crud_user_async
 from backend.app.schemas import User, UserPhoto, UserBalance, Reward, RewardCreate, UserUpdate
+from backend.app.services.transaction_export import EXPORT_FORMATS, export_transactions
 
 router = APIRouter()
 
@@ -20,11 +24,11 @@ def read_user_me(current_user: User = Depends(deps.get_current_user)):
 @router.patch("/me", response_model=User)
 async def update_user_profile(
         *,
-        db: Session = Depends(deps.get_db),
+        db: AsyncSession = Depends(deps.get_async_db),
         current_user: User = Depends(deps.get_current_active_user),
         user_update: UserUpdate = Body(...)
 ):
-    updated_user = await crud_user.update_user_profile(db, current_user.id, user_update)
+    updated_user = await crud_user_async.update_user_profile(db, current_user.id, user_update)
     if updated_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return updated_user
@@ -32,22 +36,22 @@ async def update_user_profile(
 
 @router.get("/me/photos", response_model=List[UserPhoto])
 async def get_user_photos(
-        db: Session = Depends(deps.get_db),
-        current_user: User = Depends(deps.get_current_user),
+        db: AsyncSession = Depends(deps.get_async_db),
+        current_user_id: int = Depends(deps.get_current_user_id),
         skip: int = 0,
         limit: int = 30
 ):
-    return await crud_user.get_user_photos(db, user_id=current_user.id, skip=skip, limit=limit)
+    return await crud_user_async.get_user_photos(db, user_id=current_user_id, skip=skip, limit=limit)
 
 
 @router.patch("/me/profile-photo", response_model=User)
 async def update_profile_photo(
         *,
-        db: Session = Depends(deps.get_db),
+        db: AsyncSession = Depends(deps.get_async_db),
         current_user: User = Depends(deps.get_current_active_user),
         profile_photo: UploadFile = File(...)
 ):
-    updated_user = await crud_user.update_user_profile_photo(db, current_user.id, profile_photo)
+    updated_user = await crud_user_async.update_user_profile_photo(db, current_user.id, profile_photo)
     if updated_user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return updated_user
@@ -56,18 +60,18 @@ async def update_profile_photo(
 @router.post("/me/photos", response_model=UserPhoto, status_code=201)
 async def upload_photo(
         file: UploadFile = File(...),
-        db: Session = Depends(deps.get_db),
+        db: AsyncSession = Depends(deps.get_async_db),
         current_user: User = Depends(deps.get_current_user)
 ):
-    return await crud_user.upload_user_photo(db, user_id=current_user.id, file=file)
+    return await crud_user_async.upload_user_photo(db, user_id=current_user.id, file=file)
 
 
 @router.get("/options", response_model=dict)
 def get_user_options(
-        db: Session = Depends(deps.get_db),
-        current_user: User = Depends(deps.get_current_user)
+        db: Session = Depends(deps.get_read_db),
+        current_user_id: int = Depends(deps.get_current_user_id)
 ):
-    return crud_user.get_user_options(db, user_id=current_user.id)
+    return crud_user.get_user_options(db, user_id=current_user_id)
 
 
 @router.put("/options", response_model=dict)
@@ -80,33 +84,48 @@ def update_user_options(
 
 
 @router.get("/balance", response_model=UserBalance)
-async def get_user_balance(current_user: User = Depends(deps.get_current_user),
-                           db: Session = Depends(deps.get_db)):
-    rewards, total_rewards = crud_user.get_user_rewards(db, user_id=current_user.id, limit=5)
-    expenses, total_expenses = crud_user.get_user_expenses(db, user_id=current_user.id, limit=5)
-    balance = total_rewards - total_expenses
+async def get_user_balance(current_user_id: int = Depends(deps.get_current_user_id),
+                           db: AsyncSession = Depends(deps.get_async_db)):
+    rewards = await crud_user_async.get_user_rewards(db, user_id=current_user_id, limit=5)
+    expenses = await crud_user_async.get_user_expenses(db, user_id=current_user_id, limit=5)
+    balance = await crud_user_async.get_user_balance(db, user_id=current_user_id)
     return {"balance": balance, "rewards": rewards, "expenses": expenses}
 
 
 @router.post("/rewards", response_model=Reward)
 async def add_user_reward(reward: RewardCreate, current_user: User = Depends(deps.get_current_user),
-                          db: Session = Depends(deps.get_db)):
-    return crud_user.create_user_reward(db, reward=reward, user_id=current_user.id)
+                          db: AsyncSession = Depends(deps.get_async_db)):
+    return await crud_user_async.create_user_reward(db, reward=reward, user_id=current_user.id)
 
 
-@router.get("/weekly-data", response_model=List[Dict])
+@router.get("/weekly-data", response_model=List[Dict], response_class=FastJSONResponse)
 async def get_weekly_data(
-        current_user: User = Depends(deps.get_current_user),
-        db: Session = Depends(deps.get_db)
+        current_user_id: int = Depends(deps.get_current_user_id),
+        db: AsyncSession = Depends(deps.get_async_db)
 ):
-    return crud_user.get_weekly_data(db, user_id=current_user.id)
+    # Plain dicts; nothing to validate, so they go straight to orjson
+    return FastJSONResponse(await crud_user_async.get_weekly_data(db, user_id=current_user_id))
 
 
-@router.get("/monthly-transactions/{year}/{month}", response_model=List[Dict])
+@router.get("/monthly-transactions/{year}/{month}", response_model=List[Dict], response_class=FastJSONResponse)
 async def get_monthly_transactions(
-        year: int,
-        month: int,
-        current_user: User = Depends(deps.get_current_user),
-        db: Session = Depends(deps.get_db)
+        year: int = Path(..., ge=1, le=9998),
+        month: int = Path(..., ge=1, le=12),
+        current_user_id: int = Depends(deps.get_current_user_id),
+        db: AsyncSession = Depends(deps.get_async_db)
+):
+    return FastJSONResponse(
+        await crud_user_async.get_monthly_transactions(db, user_id=current_user_id, year=year, month=month))
+
+
+@router.get("/transactions/export", response_class=StreamingResponse)
+def export_user_transactions(
+        request: Request,
+        export_format: str = Query("ndjson", alias="format", pattern=f"^({'|'.join(EXPORT_FORMATS)})$"),
+        current_user_id: int = Depends(deps.get_current_user_id)
 ):
-    return crud_user.get_monthly_transactions(db, user_id=current_user.id, year=year, month=month)
+    return StreamingResponse(
+        export_transactions(partial(deps.open_read_session, request), current_user_id, export_format),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="transactions.{export_format}"'},
+    )
@@ -1,18 +1,30 @@
-from typing import List
+import tempfile
+import zipfile
+from typing import Any, AsyncIterator, Awaitable, Callable, List, Tuple
 
-from fastapi import APIRouter, Depends, File, UploadFile, Query
+import orjson
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, Query
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile as FormFile
+from starlette.responses import StreamingResponse
 
 from backend.app.api import deps
+from backend.app.core.config import settings
+from backend.app.core.serialization import FastJSONResponse
 from backend.app.crud import crud_waste_collection
-from backend.app.schemas import WasteCollection, WasteCollectionCreate, User
-from backend.app.services import detect_waste_type
+from backend.app.schemas import WasteCollection, WasteCollectionCreate, User, RecyclingCenterBatchQuery, \
+    WasteCollectionBulkResult, BulkItemError, WasteDetection, RecyclingCenter, RecyclingCenterCreate, \
+    RecyclingCenterUpdate
+from backend.app.services import classify_waste, detect_waste_type
+from backend.app.services.batch_detection import ImageSource, archive_sources, detect_batch, upload_sources
 
 router = APIRouter()
 
 
 @router.get("/waste-types", response_model=List[str])
-def get_waste_types(db: Session = Depends(deps.get_db)):
+def get_waste_types(db: Session = Depends(deps.get_read_db)):
     return crud_waste_collection.get_waste_types(db)
 
 
@@ -25,6 +37,106 @@ async def detect_waste(
     return waste_type
 
 
+@router.post("/classify", response_model=WasteDetection)
+async def classify(
+        file: UploadFile = File(...)
+):
+    """Like detect-waste, with the model's confidence and the score of every label."""
+    return (await classify_waste(await file.read()))._asdict()
+
+
+ZIP_CONTENT_TYPES = ("application/zip", "application/x-zip-compressed")
+
+
+async def _form_sources(request: Request) -> Tuple[List[ImageSource], Callable[[], Awaitable[None]]]:
+    form = await request.form(max_files=settings.WASTE_DETECTION_BATCH_MAX_IMAGES)
+    try:
+        sources = upload_sources([value for _, value in form.multi_items() if isinstance(value, FormFile)])
+    except HTTPException:
+        await form.close()
+        raise
+    return sources, form.close
+
+
+async def _archive_sources(request: Request) -> Tuple[List[ImageSource], Callable[[], Awaitable[None]]]:
+    # Spooled to disk as it arrives: a zip is only readable once its trailing directory is in
+    spool = tempfile.SpooledTemporaryFile(max_size=settings.WASTE_DETECTION_BATCH_MAX_IMAGE_BYTES)
+    try:
+        async for data in request.stream():
+            spool.write(data)
+        try:
+            archive = zipfile.ZipFile(spool)
+        except zipfile.BadZipFile:
+            raise HTTPException(status_code=400, detail="Body is not a valid zip archive")
+        sources = archive_sources(archive)
+    except BaseException:
+        spool.close()
+        raise
+
+    async def close():
+        archive.close()
+        spool.close()
+    return sources, close
+
+
+def _body_too_large(limit: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Request bodies are limited to {limit} bytes")
+
+
+def _limit_body(request: Request, limit: int) -> Request:
+    """The same request, failing with a 413 as soon as its body outgrows `limit` bytes.
+
+    Content-Length is checked up front; the count covers chunked uploads, which don't declare one.
+    """
+    try:
+        declared = int(request.headers.get("content-length", 0))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length")
+    if declared > limit:
+        raise _body_too_large(limit)
+    received = 0
+
+    async def receive():
+        nonlocal received
+        message = await request.receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > limit:
+                raise _body_too_large(limit)
+        return message
+
+    return Request(request.scope, receive)
+
+
+@router.post("/detect-waste/batch", response_class=StreamingResponse)
+async def detect_waste_batch(
+        request: Request,
+        current_user_id: int = Depends(deps.get_current_user_id)
+):
+    """Detect the waste type of many images, sent as multipart files or as one zip archive.
+
+    Responds with NDJSON, a line per image in the order they finish: `index` and `name` of the image, and
+    its `waste_type` or an `error`.
+    """
+    request = _limit_body(request, settings.WASTE_DETECTION_BATCH_MAX_BYTES)
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    if content_type == "multipart/form-data":
+        sources, close = await _form_sources(request)
+    elif content_type in ZIP_CONTENT_TYPES:
+        sources, close = await _archive_sources(request)
+    else:
+        raise HTTPException(status_code=415, detail="Send images as multipart/form-data or application/zip")
+
+    async def results():
+        # Uploads stay open until the last result is out, then go
+        try:
+            async for line in detect_batch(sources, settings.WASTE_DETECTION_BATCH_CONCURRENCY):
+                yield line
+        finally:
+            await close()
+    return StreamingResponse(results(), media_type="application/x-ndjson")
+
+
 @router.post("/", response_model=WasteCollection)
 def create_waste_collection(
         waste_collection: WasteCollectionCreate,
@@ -34,18 +146,146 @@ def create_waste_collection(
     return crud_waste_collection.create_waste_collection(db, waste_collection=waste_collection, user_id=current_user.id)
 
 
-@router.get("/recycling-centers", response_model=List[dict])
+async def _ndjson_lines(request: Request) -> AsyncIterator[bytes]:
+    pending = b""
+    async for data in request.stream():
+        *lines, pending = (pending + data).split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line
+    if pending.strip():
+        yield pending
+
+
+async def _uploaded_items(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """(index, item) pairs from a JSON array body, or raw lines read as they arrive from an NDJSON body."""
+    if request.headers.get("content-type", "").split(";")[0].strip() == "application/x-ndjson":
+        index = 0
+        async for line in _ndjson_lines(request):
+            yield index, line
+            index += 1
+        return
+
+    # An array is only parsed once it has all arrived, so its size is capped before anything is buffered
+    request = _limit_body(request, settings.WASTE_COLLECTION_BULK_MAX_BYTES)
+    try:
+        items = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(items, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+    if len(items) > settings.WASTE_COLLECTION_BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.WASTE_COLLECTION_BULK_MAX_ITEMS} items per "
+                                                    f"array, send larger uploads as NDJSON")
+    for index, item in enumerate(items):
+        yield index, item
+
+
+def _validate(item: Any) -> WasteCollectionCreate:
+    if isinstance(item, bytes):
+        return WasteCollectionCreate.model_validate_json(item)
+    return WasteCollectionCreate.model_validate(item)
+
+
+@router.post("/bulk", response_model=WasteCollectionBulkResult)
+async def create_waste_collections_bulk(
+        request: Request,
+        db: Session = Depends(deps.get_db),
+        current_user_id: int = Depends(deps.get_current_user_id)
+):
+    """Store many collections from a JSON array or an NDJSON stream, rewarding each one.
+
+    Items are written in chunks of WASTE_COLLECTION_BULK_CHUNK_SIZE, each in its own transaction; invalid
+    items are reported by index and don't stop the rest of the upload.
+    """
+    result = WasteCollectionBulkResult()
+    chunk = []
+
+    async def flush():
+        created, reward_points, errors = await run_in_threadpool(
+            crud_waste_collection.create_waste_collections, db, chunk, current_user_id)
+        result.created += created
+        result.reward_points += reward_points
+        result.errors.extend(BulkItemError(**error) for error in errors)
+        chunk.clear()
+
+    async for index, item in _uploaded_items(request):
+        result.received += 1
+        try:
+            chunk.append((index, _validate(item)))
+        except ValidationError as e:
+            result.errors.append(BulkItemError(index=index, detail="; ".join(
+                f"{'.'.join(map(str, error['loc'])) or 'item'}: {error['msg']}" for error in e.errors())))
+            continue
+        if len(chunk) >= settings.WASTE_COLLECTION_BULK_CHUNK_SIZE:
+            await flush()
+    if chunk:
+        await flush()
+    result.errors.sort(key=lambda error: error.index)
+    return result
+
+
+@router.get("/recycling-centers", response_model=List[dict], response_class=FastJSONResponse)
 def get_nearby_recycling_centers(
-        latitude: float = Query(...),
-        longitude: float = Query(...),
-        db: Session = Depends(deps.get_db)
+        latitude: float = Query(..., ge=-90, le=90),
+        longitude: float = Query(..., ge=-180, le=180),
+        radius: float = Query(10.0, gt=0, le=500, description="Search radius in km"),
+        limit: int = Query(10, ge=1, le=100),
+        db: Session = Depends(deps.get_read_db)
+):
+    return FastJSONResponse(crud_waste_collection.get_nearby_recycling_centers(
+        db, latitude=latitude, longitude=longitude, radius=radius, limit=limit))
+
+
+@router.post("/recycling-centers/batch", response_model=List[List[dict]], response_class=FastJSONResponse)
+def get_nearby_recycling_centers_batch(
+        batch: RecyclingCenterBatchQuery,
+        db: Session = Depends(deps.get_read_db)
+):
+    return FastJSONResponse([
+        crud_waste_collection.get_nearby_recycling_centers(db, latitude=point.latitude, longitude=point.longitude,
+                                                           radius=batch.radius, limit=batch.limit)
+        for point in batch.points
+    ])
+
+
+@router.post("/recycling-centers", response_model=RecyclingCenter, status_code=201)
+def create_recycling_center(
+        center: RecyclingCenterCreate,
+        db: Session = Depends(deps.get_db),
+        current_user: User = Depends(deps.get_current_admin)
+):
+    return crud_waste_collection.create_recycling_center(db, center)
+
+
+@router.patch("/recycling-centers/{center_id}", response_model=RecyclingCenter)
+def update_recycling_center(
+        center_id: int,
+        center_update: RecyclingCenterUpdate,
+        db: Session = Depends(deps.get_db),
+        current_user: User = Depends(deps.get_current_admin)
+):
+    center = crud_waste_collection.get_recycling_center(db, center_id)
+    if not center:
+        raise HTTPException(status_code=404, detail="Recycling center not found")
+    return crud_waste_collection.update_recycling_center(db, db_obj=center, obj_in=center_update)
+
+
+@router.delete("/recycling-centers/{center_id}", response_model=RecyclingCenter)
+def remove_recycling_center(
+        center_id: int,
+        db: Session = Depends(deps.get_db),
+        current_user: User = Depends(deps.get_current_admin)
 ):
-    return crud_waste_collection.get_nearby_recycling_centers(db, latitude=latitude, longitude=longitude)
+    center = crud_waste_collection.get_recycling_center(db, center_id)
+    if not center:
+        raise HTTPException(status_code=404, detail="Recycling center not found")
+    return crud_waste_collection.delete_recycling_center(db, center)
 
 
 @router.get("/reward", response_model=dict)
 def get_reward(
         waste_type: str = Query(...),
-        db: Session = Depends(deps.get_db)
+        db: Session = Depends(deps.get_read_db)
 ):
     return {"reward": crud_waste_collection.get_reward_for_waste_type(db, waste_type)}
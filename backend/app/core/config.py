@@ -1,5 +1,5 @@
 # /app/core/config.py
-from typing import List
+from typing import List, Optional
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -10,23 +10,154 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "f4e7e7b1"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    # Trust the claims inside access tokens instead of loading the user on every request
+    STATELESS_AUTH: bool = False
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+    # Raising the cost upgrades existing hashes on the next successful login
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    # Hash jobs allowed to wait for a worker before requests are turned away with a 429
+    PASSWORD_HASH_QUEUE_DEPTH: int = 64
+    # Accounts allowed to manage shared data such as recycling centers
+    ADMIN_EMAILS: List[str] = []
     SQLALCHEMY_DATABASE_URI: str = "sqlite:///./backend/recycle_m.db"
+    # Derived from SQLALCHEMY_DATABASE_URI (aiosqlite / asyncpg) when not set
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[str] = None
+    # Connection pools; the read pool serves GET routes
+    DB_POOL_SIZE: int = 5
+    DB_READ_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    # Read replicas for GET routes (any engine URL; a second SQLite file works for local testing).
+    # Clients are pinned to the primary for a while after writing so they see their own changes; the pin is
+    # a cookie holding its deadline, so it holds across workers
+    SQLALCHEMY_REPLICA_URIS: List[str] = []
+    READ_YOUR_WRITES_SECONDS: float = 5.0
+    READ_YOUR_WRITES_COOKIE: str = "primary_until"
+    REPLICA_MAX_LAG_SECONDS: float = 10.0
+    REPLICA_LAG_CHECK_SECONDS: float = 5.0
+    # Compiled-SQL cache entries per engine, and asyncpg's per-connection prepared statement cache
+    DB_QUERY_CACHE_SIZE: int = 500
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    # Applied to every SQLite connection. WAL lets readers proceed while a writer commits
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE_BYTES: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KIB: int = 64 * 1024
     ALLOWED_ORIGINS: List[str] = ["http://localhost", "http://localhost:8080",
                                   "http://127.0.0.1", "http://127.0.0.1:8080",]
-    # For saving images
+    # For saving images: "imgur", "local" or "s3" (any S3-compatible endpoint, e.g. MinIO)
+    IMAGE_STORAGE_BACKEND: str = "imgur"
     IMGUR_CLIENT_ID: str = "xxx"
+    LOCAL_MEDIA_DIR: str = "./backend/media"
+    LOCAL_MEDIA_URL: str = "/media"
+    S3_ENDPOINT_URL: str = "http://localhost:9000"
+    S3_BUCKET: str = "recycle-m"
+    S3_REGION: str = "us-east-1"
+    S3_ACCESS_KEY_ID: str = "xxx"
+    S3_SECRET_ACCESS_KEY: str = "xxx"
+    S3_PUBLIC_URL: Optional[str] = None
+    UPLOAD_CONCURRENCY: int = 4
+    UPLOAD_MAX_RETRIES: int = 3
+    UPLOAD_RETRY_BACKOFF_SECONDS: float = 0.5
+    UPLOAD_TIMEOUT_SECONDS: float = 30.0
+    # Derivatives rendered at upload time: a square thumbnail and a copy bounded by the medium size
+    IMAGE_THUMBNAIL_SIZE: int = 320
+    IMAGE_MEDIUM_SIZE: int = 1080
+    IMAGE_VARIANT_FORMAT: str = "WEBP"  # or "JPEG"
+    IMAGE_VARIANT_QUALITY: int = 80
 
     # For map in step 4 of "scan"
     GOOGLE_MAPS_API_KEY: str = "xxx"
 
-    # For password resets
+    # In-memory KD-tree for recycling-center lookups; the SQL path is used when disabled or not loaded yet
+    GEO_INDEX_ENABLED: bool = True
+    GEO_INDEX_REFRESH_SECONDS: int = 300
+    GEO_INDEX_REBUILD_THRESHOLD: int = 1024
+
+    # Waste classification. Backends: "constant" (always the first label, no model needed),
+    # "numpy" (.npz softmax regression, needs numpy) and "onnx" (needs numpy and onnxruntime).
+    # WASTE_MODEL_LABELS lists class names in model output order; .npz models carry their own.
+    WASTE_MODEL_BACKEND: str = "constant"
+    WASTE_MODEL_PATH: Optional[str] = None
+    WASTE_MODEL_LABELS: List[str] = ["plastic"]
+    WASTE_MODEL_INPUT_SIZE: int = 224
+    WASTE_MODEL_MEAN: List[float] = [0.485, 0.456, 0.406]
+    WASTE_MODEL_STD: List[float] = [0.229, 0.224, 0.225]
+    WASTE_MODEL_OUTPUTS_LOGITS: bool = True
+    WASTE_MODEL_THREADS: int = 0  # ONNX Runtime intra-op threads, 0 lets it decide
+    # Concurrent scans are grouped into batches of up to MAX_BATCH_SIZE; a batch waits at most
+    # MAX_LATENCY_MS for company. Uploads are decoded in PREPROCESS_WORKERS processes (0: threads).
+    WASTE_DETECTION_MAX_BATCH_SIZE: int = 32
+    WASTE_DETECTION_MAX_LATENCY_MS: float = 10.0
+    WASTE_DETECTION_PREPROCESS_WORKERS: int = 2
+    # Classification results are cached by SHA-256 of the upload and, for re-shot or re-encoded photos, by
+    # a 64-bit dHash within MAX_DISTANCE differing bits (None: exact matches only). DISK_PATH adds a SQLite
+    # tier for exact matches that survives restarts.
+    DETECTION_CACHE_ENABLED: bool = True
+    DETECTION_CACHE_MAX_ENTRIES: int = 10_000
+    DETECTION_CACHE_TTL_SECONDS: int = 86400
+    DETECTION_CACHE_MAX_DISTANCE: Optional[int] = 6
+    DETECTION_CACHE_DISK_PATH: Optional[str] = None
+    DETECTION_CACHE_DISK_MAX_ENTRIES: int = 100_000
+    # Batch detection (multipart or zip): images per request, bytes per image, bytes per request body,
+    # and images classified at once
+    WASTE_DETECTION_BATCH_MAX_IMAGES: int = 100
+    WASTE_DETECTION_BATCH_MAX_IMAGE_BYTES: int = 10 * 1024 * 1024
+    WASTE_DETECTION_BATCH_MAX_BYTES: int = 50 * 1024 * 1024
+    WASTE_DETECTION_BATCH_CONCURRENCY: int = 8
+
+    # Bulk waste collection uploads: items per transaction, and the caps for plain JSON arrays, which are
+    # read whole (NDJSON bodies are streamed and not capped)
+    WASTE_COLLECTION_BULK_CHUNK_SIZE: int = 500
+    WASTE_COLLECTION_BULK_MAX_ITEMS: int = 10_000
+    WASTE_COLLECTION_BULK_MAX_BYTES: int = 5 * 1024 * 1024
+
+    # Reference tables (waste/post/product types) and rendered responses are cached per process. Set
+    # REFERENCE_DATA_SHARED when running several workers so writes in one are picked up by the others within
+    # REFERENCE_DATA_CHECK_SECONDS
+    REFERENCE_DATA_SHARED: bool = False
+    REFERENCE_DATA_CHECK_SECONDS: float = 5.0
+
+    # Rendered bodies of public GET endpoints, invalidated by tag from the write paths (in every worker with
+    # REFERENCE_DATA_SHARED). The TTL bounds how long embedded data without its own tag (e.g. a post author's
+    # profile) can lag behind
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1024
+    RESPONSE_CACHE_TTL_SECONDS: int = 60
+    RESPONSE_CACHE_MAX_BODY_BYTES: int = 1024 * 1024
+
+    # Log requests running more SQL statements than this (unset disables counting);
+    # QUERY_COUNT_HEADER additionally reports the count on every response, e.g. "X-Query-Count"
+    QUERY_BUDGET_PER_REQUEST: Optional[int] = None
+    QUERY_COUNT_HEADER: Optional[str] = None
+
+    # For password resets. An empty SMTP_USER skips login
     SMTP_HOST: str = "smtp.example.com"
     SMTP_PORT: int = 587
+    SMTP_STARTTLS: bool = True
+    SMTP_TIMEOUT_SECONDS: float = 30.0
     SMTP_USER: str = "your_email@example.com"
     SMTP_PASSWORD: str = "your_email_password"
     EMAILS_FROM_EMAIL: str = "noreply@example.com"
     EMAILS_FROM_NAME: str = "Recycle-M Support"
     PASSWORD_RESET_TOKEN_EXPIRE_HOURS: int = 24
+    # Outbox delivery: messages per batch over up to SMTP_POOL_SIZE reused connections. Failed sends are
+    # retried after RETRY_BACKOFF_SECONDS, doubling up to RETRY_MAX_BACKOFF_SECONDS, until MAX_ATTEMPTS.
+    # A batch is claimed for CLAIM_SECONDS, after which another worker may pick up what wasn't recorded.
+    # Sent and failed messages are deleted RETENTION_DAYS after they were queued
+    EMAIL_WORKER_ENABLED: bool = True
+    EMAIL_SMTP_POOL_SIZE: int = 2
+    EMAIL_BATCH_SIZE: int = 50
+    EMAIL_POLL_SECONDS: float = 5.0
+    EMAIL_MAX_ATTEMPTS: int = 8
+    EMAIL_RETRY_BACKOFF_SECONDS: float = 30.0
+    EMAIL_RETRY_MAX_BACKOFF_SECONDS: float = 3600.0
+    EMAIL_CLAIM_SECONDS: float = 300.0
+    EMAIL_RETENTION_DAYS: int = 7
 
     model_config = SettingsConfigDict(env_file=".env")
 
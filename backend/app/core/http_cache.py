@@ -0,0 +1,222 @@
+# /app/core/http_cache.py
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Pattern, Sequence, Set, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.app.core.config import settings
+
+Header = Tuple[bytes, bytes]
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    headers: List[Header]
+    etag: str
+    tags: Tuple[str, ...]
+    expires_at: float
+
+
+class CacheRule(NamedTuple):
+    """Paths matching `pattern` are cached under `tags`, which may use the pattern's named groups."""
+    pattern: Pattern
+    tags: Tuple[str, ...]
+
+    @classmethod
+    def route(cls, path: str, *tags: str) -> "CacheRule":
+        return cls(re.compile(path), tags)
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as RFC 9110 prescribes for If-None-Match
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return etag in candidates
+
+
+class ResponseCache:
+    """Thread-safe LRU of rendered GET responses, invalidated by tag."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._keys_by_tag: Dict[str, Set[str]] = {}
+        self._tag_versions: Dict[str, int] = {}
+        self._invalidated_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def versions(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._tag_versions.get(tag, 0) for tag in tags)
+
+    def invalidated_within(self, tags: Iterable[str], seconds: float) -> bool:
+        since = time.monotonic() - seconds
+        with self._lock:
+            return any(self._invalidated_at.get(tag, float("-inf")) > since for tag in tags)
+
+    def set(self, key: str, body: bytes, headers: List[Header], etag: str, tags: Sequence[str],
+            versions: Tuple[int, ...]):
+        with self._lock:
+            # A write landed while this response was rendering, so it may already be stale
+            if tuple(self._tag_versions.get(tag, 0) for tag in tags) != versions:
+                return
+            self._remove(key)
+            self._entries[key] = CachedResponse(body, headers, etag, tuple(tags), time.monotonic() + self.ttl)
+            for tag in tags:
+                self._keys_by_tag.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, *tags: str):
+        now = time.monotonic()
+        with self._lock:
+            for tag in tags:
+                self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+                self._invalidated_at[tag] = now
+                for key in list(self._keys_by_tag.pop(tag, ())):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ResponseCacheMiddleware:
+    """Serves matching GETs from `cache` with strong ETags, answering If-None-Match with 304.
+
+    Requests for which `bypass(scope)` is true skip the cache both ways. `staleness(scope)`, called once the
+    response is rendered, gives how far behind the latest writes its data may be; such a body is not stored
+    while one of its tags was invalidated more recently than that, as it may predate the write.
+    """
+
+    def __init__(self, app: ASGIApp, cache: ResponseCache, rules: Sequence[CacheRule], max_body_size: int,
+                 bypass: Optional[Callable[[Scope], bool]] = None,
+                 staleness: Optional[Callable[[Scope], float]] = None):
+        self.app = app
+        self.cache = cache
+        self.rules = rules
+        self.max_body_size = max_body_size
+        self.bypass = bypass
+        self.staleness = staleness
+
+    def _match(self, path: str) -> Optional[Tuple[str, ...]]:
+        for rule in self.rules:
+            match = rule.pattern.fullmatch(path)
+            if match:
+                return tuple(tag.format(**match.groupdict()) for tag in rule.tags)
+        return None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        tags = self._match(scope["path"]) if scope["type"] == "http" and scope["method"] == "GET" else None
+        if tags is None or (self.bypass is not None and self.bypass(scope)):
+            await self.app(scope, receive, send)
+            return
+
+        query = urlencode(sorted(parse_qsl(scope["query_string"].decode("latin-1"), keep_blank_values=True)))
+        key = f"{scope['path']}?{query}"
+        if_none_match = Headers(scope=scope).get("if-none-match")
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            await self._send(send, entry.body, entry.headers, entry.etag, if_none_match)
+            return
+
+        versions = self.cache.versions(tags)
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+        size = 0
+        passthrough = False
+
+        async def capture(message: Message):
+            nonlocal start, size, passthrough
+            if passthrough:
+                await send(message)
+            elif message["type"] == "http.response.start":
+                start = message
+                if message["status"] != 200:
+                    passthrough = True
+                    await send(message)
+            else:
+                chunks.append(message.get("body", b""))
+                size += len(chunks[-1])
+                if size > self.max_body_size:
+                    # Too big to keep around; stream the rest untouched
+                    passthrough = True
+                    await send(start)
+                    await send({"type": "http.response.body", "body": b"".join(chunks),
+                                "more_body": message.get("more_body", False)})
+                elif not message.get("more_body", False):
+                    await self._store_and_send(send, scope, key, start, b"".join(chunks), tags, versions,
+                                               if_none_match)
+
+        await self.app(scope, receive, capture)
+
+    def _storable(self, scope: Scope, headers: List[Header], tags: Tuple[str, ...]) -> bool:
+        if any(name.lower() == b"set-cookie" for name, _ in headers):
+            return False
+        staleness = self.staleness(scope) if self.staleness is not None else 0.0
+        return not (staleness and self.cache.invalidated_within(tags, staleness))
+
+    async def _store_and_send(self, send: Send, scope: Scope, key: str, start: Message, body: bytes,
+                              tags: Tuple[str, ...], versions: Tuple[int, ...], if_none_match: Optional[str]):
+        headers = [(name, value) for name, value in start["headers"] if name.lower() not in (b"content-length", b"etag")]
+        etag = make_etag(body)
+        if self._storable(scope, headers, tags):
+            self.cache.set(key, body, headers, etag, tags, versions)
+        await self._send(send, body, headers, etag, if_none_match)
+
+    @staticmethod
+    async def _send(send: Send, body: bytes, headers: List[Header], etag: str, if_none_match: Optional[str]):
+        headers = headers + [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+        if etag_matches(if_none_match, etag):
+            headers = [(name, value) for name, value in headers if name.lower() != b"content-type"]
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+# Write paths call response_cache.invalidate() with the tags of what they changed
+response_cache = ResponseCache(maxsize=settings.RESPONSE_CACHE_MAX_ENTRIES, ttl=settings.RESPONSE_CACHE_TTL_SECONDS)
@@ -1,20 +1,33 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any, Union
+from typing import Any, Optional, Tuple, Union
 
+from fastapi import HTTPException, status
 from jose import jwt
 from passlib.context import CryptContext
 
 from backend.app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min_rounds makes hashes below the configured cost report as needing a rehash
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto",
+                           bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+                           bcrypt__min_rounds=settings.BCRYPT_ROUNDS)
 
+# bcrypt releases the GIL, so hashing on a dedicated pool runs in parallel without
+# occupying the threadpool that serves sync endpoints
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_DEPTH)
 
-def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None) -> str:
+
+def create_access_token(subject: Union[str, Any], expires_delta: timedelta = None,
+                        claims: Optional[dict] = None) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {**(claims or {}), "exp": expire, "sub": str(subject)}
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
@@ -27,6 +40,36 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+def needs_rehash(hashed_password: str) -> bool:
+    return pwd_context.needs_update(hashed_password)
+
+
+async def _run_hash_job(fn, *args):
+    if not _hash_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please try again shortly",
+            headers={"Retry-After": "1"},
+        )
+    try:
+        future = _hash_executor.submit(fn, *args)
+    except RuntimeError:
+        _hash_slots.release()
+        raise
+    # Release on completion rather than when the awaiting request finishes, which may be cancelled early
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return await asyncio.wrap_future(future)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await _run_hash_job(pwd_context.hash, password)
+
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify on the hash pool; also returns a fresh hash when the stored one is below the current cost."""
+    return await _run_hash_job(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
 def create_password_reset_token(email: str) -> str:
     delta = timedelta(hours=settings.PASSWORD_RESET_TOKEN_EXPIRE_HOURS)
     now = datetime.utcnow()
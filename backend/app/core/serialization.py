@@ -0,0 +1,55 @@
+# /app/core/serialization.py
+import threading
+from decimal import Decimal
+from typing import Any, Dict, Mapping, Optional
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+
+
+def _orjson_default(value: Any) -> Any:
+    # orjson covers datetimes, UUIDs, dataclasses and pydantic-free containers natively
+    if isinstance(value, Decimal):
+        return float(value)
+    return jsonable_encoder(value)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered by orjson; bytes are taken as already-serialized JSON."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class SerializerRegistry:
+    """One cached TypeAdapter per response type.
+
+    Validating ORM objects once and dumping the validated result straight to JSON bytes in pydantic-core
+    replaces FastAPI's response_model pass plus its jsonable_encoder and json.dumps passes.
+    """
+
+    def __init__(self):
+        self._adapters: Dict[Any, TypeAdapter] = {}
+        self._lock = threading.Lock()
+
+    def adapter(self, type_: Any) -> TypeAdapter:
+        adapter = self._adapters.get(type_)
+        if adapter is None:
+            with self._lock:
+                adapter = self._adapters.setdefault(type_, TypeAdapter(type_))
+        return adapter
+
+    def dump(self, type_: Any, value: Any, **dump_options) -> bytes:
+        adapter = self.adapter(type_)
+        return adapter.dump_json(adapter.validate_python(value, from_attributes=True), **dump_options)
+
+    def response(self, type_: Any, value: Any, status_code: int = 200,
+                 headers: Optional[Mapping[str, str]] = None, **dump_options) -> FastJSONResponse:
+        return FastJSONResponse(self.dump(type_, value, **dump_options), status_code=status_code, headers=headers)
+
+
+serializers = SerializerRegistry()
@@ -0,0 +1,75 @@
+# app/crud/crud_email_outbox.py
+import uuid
+from datetime import datetime, timedelta
+from typing import List
+
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.orm import Session
+
+from backend.app.core.config import settings
+from backend.app.models import EmailOutbox
+
+
+def enqueue(db: Session, to_email: str, subject: str, body: str) -> EmailOutbox:
+    message = EmailOutbox(to_email=to_email, subject=subject, body=body)
+    db.add(message)
+    db.commit()
+    return message
+
+
+def claim_due(db: Session, limit: int, lease_seconds: float) -> List[EmailOutbox]:
+    """Claim up to `limit` due messages for this caller, oldest first.
+
+    The due conditions are repeated on the outer UPDATE so a row another worker claimed in the
+    meantime is skipped rather than claimed twice. Finished messages older than EMAIL_RETENTION_DAYS are
+    deleted in the same transaction.
+    """
+    now = datetime.utcnow()
+    token = uuid.uuid4().hex
+    db.execute(
+        delete(EmailOutbox)
+        .where(EmailOutbox.status.in_(("sent", "failed")),
+               EmailOutbox.created_at < now - timedelta(days=settings.EMAIL_RETENTION_DAYS))
+        .execution_options(synchronize_session=False)
+    )
+    due = (EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now,
+           or_(EmailOutbox.claimed_until.is_(None), EmailOutbox.claimed_until < now))
+    candidates = select(EmailOutbox.id).where(*due).order_by(EmailOutbox.id).limit(limit).scalar_subquery()
+    db.execute(
+        update(EmailOutbox)
+        .where(EmailOutbox.id.in_(candidates), *due)
+        .values(claim_token=token, claimed_until=now + timedelta(seconds=lease_seconds))
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return list(db.scalars(select(EmailOutbox).where(EmailOutbox.claim_token == token).order_by(EmailOutbox.id)))
+
+
+def mark_sent(db: Session, ids: List[int]):
+    if not ids:
+        return
+    # Bodies can carry live tokens (password reset links), so they are not kept once a message is finished
+    db.execute(
+        update(EmailOutbox).where(EmailOutbox.id.in_(ids))
+        .values(status="sent", sent_at=datetime.utcnow(), body="", claim_token=None, claimed_until=None,
+                last_error=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def mark_failed(db: Session, message: EmailOutbox, error: str, permanent: bool = False):
+    """Schedule another attempt with exponential backoff, or give up after EMAIL_MAX_ATTEMPTS and clear the body."""
+    attempts = message.attempts + 1
+    values = {"attempts": attempts, "last_error": error[:1000], "claim_token": None, "claimed_until": None}
+    if permanent or attempts >= settings.EMAIL_MAX_ATTEMPTS:
+        values.update(status="failed", body="")
+    else:
+        delay = min(settings.EMAIL_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1),
+                    settings.EMAIL_RETRY_MAX_BACKOFF_SECONDS)
+        values["next_attempt_at"] = datetime.utcnow() + timedelta(seconds=delay)
+    db.execute(
+        update(EmailOutbox).where(EmailOutbox.id == message.id).values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
+from backend.app.crud import crud_ledger
 from backend.app.models import Expense
 from backend.app.schemas import ExpenseCreate, ExpenseUpdate
 
@@ -12,11 +13,7 @@ def get_user_expenses(db: Session, user_id: int, skip: int = 0, limit: int = 100
 
 
 def create_expense(db: Session, expense: ExpenseCreate, user_id: int):
-    db_expense = Expense(**expense.dict(), user_id=user_id)
-    db.add(db_expense)
-    db.commit()
-    db.refresh(db_expense)
-    return db_expense
+    return crud_ledger.post_expense(db, expense, user_id)
 
 
 def get_expense_statistics(db: Session, user_id: int, period: str):
@@ -59,9 +56,19 @@ def get_expense(db: Session, expense_id: int):
 
 def update_expense(db: Session, db_obj: Expense, obj_in: ExpenseUpdate):
     update_data = obj_in.dict(exclude_unset=True)
+    points_delta = update_data.get("points", db_obj.points) - db_obj.points
     for field, value in update_data.items():
         setattr(db_obj, field, value)
     db.add(db_obj)
+    if points_delta:
+        try:
+            crud_ledger.apply_to_balances(db, {db_obj.user_id: -points_delta})
+        except crud_ledger.InsufficientBalance:
+            db.rollback()
+            raise crud_ledger.not_enough_points()
+        crud_ledger.apply_to_summary(db, db_obj.user_id, total_expenses=points_delta, touch=False)
     db.commit()
     db.refresh(db_obj)
+    if points_delta:
+        crud_ledger.invalidate_users([db_obj.user_id])
     return db_obj
@@ -0,0 +1,237 @@
+# app/crud/crud_ledger.py
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import bindparam, func, insert, literal, select, union_all, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from backend.app.models import Reward, Expense, User, UserLedger
+from backend.app.schemas import RewardCreate, ExpenseCreate
+
+SUMMARY_FIELDS = ("total_rewards", "total_expenses", "reward_count", "expense_count")
+
+
+class InsufficientBalance(ValueError):
+    """A posting would take the user's balance below zero; the caller rolls back."""
+
+    def __init__(self, user_id: int):
+        super().__init__(f"User {user_id} does not have enough points")
+        self.user_id = user_id
+
+
+@dataclass
+class Posting:
+    """One ledger entry: a reward when waste_type_id is set, otherwise an expense with a description."""
+    user_id: int
+    points: int
+    waste_type_id: Optional[int] = None
+    description: Optional[str] = None
+    created_at: Optional[datetime] = None
+
+    @property
+    def is_reward(self) -> bool:
+        return self.waste_type_id is not None
+
+
+def get_ledger_summary(db: Session, user_id: int) -> Optional[UserLedger]:
+    return db.get(UserLedger, user_id)
+
+
+def _apply_summaries(db: Session, deltas: Dict[int, Dict[str, int]], touch: bool = True):
+    params = [{"user_id": user_id, **{field: delta.get(field, 0) for field in SUMMARY_FIELDS}}
+              for user_id, delta in deltas.items()]
+    if not params:
+        return
+    table = UserLedger.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        insert = sqlite_insert if dialect == "sqlite" else postgresql_insert
+        stmt = insert(table).values(last_event_at=func.now() if touch else None)
+        updates = {field: table.c[field] + stmt.excluded[field] for field in SUMMARY_FIELDS}
+        if touch:
+            updates["last_event_at"] = stmt.excluded.last_event_at
+        db.execute(stmt.on_conflict_do_update(index_elements=[table.c.user_id], set_=updates), params)
+        return
+
+    for row in params:
+        values = {field: table.c[field] + row[field] for field in SUMMARY_FIELDS}
+        if touch:
+            values["last_event_at"] = func.now()
+        updated = db.execute(update(table).where(table.c.user_id == row["user_id"]).values(values)).rowcount
+        if not updated:
+            db.execute(table.insert().values(last_event_at=func.now() if touch else None, **row))
+
+
+def apply_to_summary(db: Session, user_id: int, total_rewards: int = 0, total_expenses: int = 0,
+                     reward_count: int = 0, expense_count: int = 0, touch: bool = True):
+    """Add the deltas to the user's summary row in the caller's transaction; does not commit."""
+    _apply_summaries(db, {user_id: {
+        "total_rewards": total_rewards,
+        "total_expenses": total_expenses,
+        "reward_count": reward_count,
+        "expense_count": expense_count,
+    }}, touch=touch)
+
+
+def apply_to_balances(db: Session, deltas: Dict[int, int]):
+    """UPDATE users SET balance = balance + :delta for each user, in the caller's transaction.
+
+    Debits only apply while the balance covers them, checked by the UPDATE itself so concurrent
+    spends can't both pass; raises InsufficientBalance otherwise.
+    """
+    users = User.__table__
+    balance = func.coalesce(users.c.balance, 0)
+    credits = [{"user_id_": user_id, "delta": delta} for user_id, delta in deltas.items() if delta > 0]
+    if credits:
+        db.execute(update(users).where(users.c.id == bindparam("user_id_"))
+                   .values(balance=balance + bindparam("delta")), credits)
+    # One statement per user: drivers don't all report per-row counts for executemany
+    for user_id, delta in deltas.items():
+        if delta < 0:
+            updated = db.execute(
+                update(users).where(users.c.id == user_id, balance >= -delta).values(balance=balance + delta)
+            ).rowcount
+            if not updated:
+                raise InsufficientBalance(user_id)
+
+
+def not_enough_points() -> HTTPException:
+    return HTTPException(status_code=400, detail="Not enough points")
+
+
+def _apply_postings(db: Session, postings: List[Posting]):
+    balances: Dict[int, int] = defaultdict(int)
+    summaries: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    for posting in postings:
+        summary = summaries[posting.user_id]
+        if posting.is_reward:
+            balances[posting.user_id] += posting.points
+            summary["total_rewards"] += posting.points
+            summary["reward_count"] += 1
+        else:
+            balances[posting.user_id] -= posting.points
+            summary["total_expenses"] += posting.points
+            summary["expense_count"] += 1
+    apply_to_balances(db, balances)
+    _apply_summaries(db, summaries)
+
+
+def invalidate_users(user_ids: Iterable[int]):
+    # Imported here because crud_user builds on this module
+    from backend.app.crud.crud_user import user_cache
+    for user_id in user_ids:
+        user_cache.invalidate(user_id)
+
+
+def post_reward(db: Session, reward: RewardCreate, user_id: int) -> Reward:
+    db_reward = Reward(**reward.dict(), user_id=user_id)
+    db.add(db_reward)
+    _apply_postings(db, [Posting(user_id=user_id, points=reward.points, waste_type_id=reward.waste_type_id)])
+    db.commit()
+    db.refresh(db_reward)
+    invalidate_users([user_id])
+    return db_reward
+
+
+def post_expense(db: Session, expense: ExpenseCreate, user_id: int) -> Expense:
+    db_expense = Expense(**expense.dict(), user_id=user_id)
+    db.add(db_expense)
+    try:
+        _apply_postings(db, [Posting(user_id=user_id, points=expense.points, description=expense.description)])
+    except InsufficientBalance:
+        db.rollback()
+        raise not_enough_points()
+    db.commit()
+    db.refresh(db_expense)
+    invalidate_users([user_id])
+    return db_expense
+
+
+def post_batch(db: Session, postings: List[Posting]) -> int:
+    """Write all postings, their balance changes and summaries in one transaction; all or nothing.
+
+    Raises ValueError if any posting references a user that doesn't exist, InsufficientBalance (also a
+    ValueError) if the expenses would overdraw someone.
+    """
+    if not postings:
+        return 0
+    user_ids = {posting.user_id for posting in postings}
+    missing = user_ids - set(db.scalars(select(User.id).where(User.id.in_(user_ids))))
+    if missing:
+        raise ValueError(f"Unknown user ids: {sorted(missing)}")
+
+    def row(posting: Posting, **fields):
+        if posting.created_at is not None:
+            fields["created_at"] = posting.created_at
+        return {"user_id": posting.user_id, "points": posting.points, **fields}
+
+    rewards = [row(p, waste_type_id=p.waste_type_id) for p in postings if p.is_reward]
+    expenses = [row(p, description=p.description) for p in postings if not p.is_reward]
+    try:
+        if rewards:
+            db.execute(insert(Reward), rewards)
+        if expenses:
+            db.execute(insert(Expense), expenses)
+        _apply_postings(db, postings)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    invalidate_users(user_ids)
+    return len(postings)
+
+
+def _aggregates(user_ids: Optional[Iterable[int]] = None):
+    events = union_all(
+        select(Reward.user_id.label("user_id"), Reward.points.label("reward_points"),
+               literal(0).label("expense_points"), literal(1).label("is_reward"), Reward.created_at.label("at")),
+        select(Expense.user_id, literal(0), Expense.points, literal(0), Expense.created_at),
+    ).subquery()
+    query = select(
+        events.c.user_id,
+        func.coalesce(func.sum(events.c.reward_points), 0).label("total_rewards"),
+        func.coalesce(func.sum(events.c.expense_points), 0).label("total_expenses"),
+        func.sum(events.c.is_reward).label("reward_count"),
+        func.sum(1 - events.c.is_reward).label("expense_count"),
+        func.max(events.c.at).label("last_event_at"),
+    ).where(events.c.user_id.isnot(None)).group_by(events.c.user_id)
+    if user_ids is not None:
+        query = query.where(events.c.user_id.in_(list(user_ids)))
+    return query
+
+
+def rebuild_summaries(db: Session, user_ids: Optional[Iterable[int]] = None) -> int:
+    """Recompute summaries from the reward and expense history and return how many rows had drifted."""
+    if user_ids is not None:
+        user_ids = list(user_ids)
+    existing_query = db.query(UserLedger)
+    if user_ids is not None:
+        existing_query = existing_query.filter(UserLedger.user_id.in_(user_ids))
+    existing = {summary.user_id: summary for summary in existing_query}
+
+    drifted = 0
+    for row in db.execute(_aggregates(user_ids)):
+        summary = existing.pop(row.user_id, None)
+        if summary is None:
+            summary = UserLedger(user_id=row.user_id)
+            db.add(summary)
+        elif all(getattr(summary, field) == getattr(row, field) for field in SUMMARY_FIELDS):
+            continue
+        drifted += 1
+        for field in SUMMARY_FIELDS:
+            setattr(summary, field, getattr(row, field))
+        summary.last_event_at = row.last_event_at
+
+    # Summaries left over belong to users without any history
+    for summary in existing.values():
+        if any(getattr(summary, field) for field in SUMMARY_FIELDS):
+            drifted += 1
+        db.delete(summary)
+
+    db.commit()
+    return drifted
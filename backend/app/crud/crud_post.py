@@ -1,11 +1,80 @@
-from typing import List, Optional
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from fastapi import UploadFile
-from sqlalchemy.orm import Session, joinedload
-
-from backend.app.crud.crud_user import upload_to_imgur
-from backend.app.models import Post
-from backend.app.schemas import PostCreate, PostUpdate, PostImage
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Query, Session, joinedload, selectinload
+from starlette.concurrency import run_in_threadpool
+
+from backend.app.models import Post, PostImage, PostType, User
+from backend.app.schemas import PostCreate, PostSummary, PostUpdate
+from backend.app.services import upload_images_with_variants
+from backend.app.services.reference_data import reference_data, attach_types
+from backend.app.services.response_cache_sync import invalidate_on_commit
+
+
+# schemas.Post serializes author and images, so every loader has to bring them along or each post
+# lazy-loads them during serialization. post_type comes from the reference data cache on list views.
+# Images go through selectinload: joining a collection would multiply rows and break LIMIT.
+LIST_OPTIONS = (joinedload(Post.author), selectinload(Post.images))
+DETAIL_OPTIONS = (joinedload(Post.author), joinedload(Post.post_type), selectinload(Post.images))
+
+
+SNIPPET_LENGTH = 200
+
+SUMMARY_FIELDS = tuple(PostSummary.model_fields)
+
+
+def _summary_columns() -> Dict[str, object]:
+    # post_type_name is filled from the reference data cache, everything else is computed by the database
+    first_image = (select(func.coalesce(PostImage.thumbnail_url, PostImage.url))
+                   .where(PostImage.post_id == Post.id).order_by(PostImage.id).limit(1))
+    return {
+        "id": Post.id,
+        "title": Post.title,
+        "snippet": func.substr(Post.content, 1, SNIPPET_LENGTH),
+        "created_at": Post.created_at,
+        "author_id": Post.author_id,
+        "author_name": select(User.full_name).where(User.id == Post.author_id).scalar_subquery(),
+        "post_type_id": Post.post_type_id,
+        "thumbnail_url": first_image.scalar_subquery(),
+    }
+
+
+def encode_cursor(post: Post) -> str:
+    """Build the opaque cursor pointing just past `post` in (created_at, id) order."""
+    raw = json.dumps([post.created_at.isoformat(), post.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, post_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), int(post_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def _paginate(query: Query, skip: int, limit: int, cursor: Optional[str]) -> List[Post]:
+    # Newest first; `id` breaks ties between posts created in the same instant.
+    query = query.order_by(Post.created_at.desc(), Post.id.desc())
+    if cursor:
+        created_at, post_id = decode_cursor(cursor)
+        # Compare against the stored value of the anchor post so equality holds regardless of how the
+        # driver renders datetimes; the decoded timestamp only matters if the anchor has been deleted.
+        anchor = func.coalesce(select(Post.created_at).where(Post.id == post_id).scalar_subquery(), created_at)
+        query = query.filter(or_(
+            Post.created_at < anchor,
+            and_(Post.created_at == anchor, Post.id < post_id)
+        ))
+    else:
+        query = query.offset(skip)
+    return query.limit(limit).all()
 
 
 def get_posts(
@@ -13,65 +82,119 @@ def get_posts(
         skip: int = 0,
         limit: int = 100,
         search: Optional[str] = None,
-        post_type_id: Optional[int] = None
+        post_type_id: Optional[int] = None,
+        cursor: Optional[str] = None
 ) -> List[Post]:
-    query = db.query(Post).options(joinedload(Post.author), joinedload(Post.post_type))
+    query = db.query(Post).options(*LIST_OPTIONS)
     if search:
         query = query.filter(Post.title.ilike(f"%{search}%") | Post.content.ilike(f"%{search}%"))
     if post_type_id:
         query = query.filter(Post.post_type_id == post_type_id)
-    return query.offset(skip).limit(limit).all()
+    posts = _paginate(query, skip, limit, cursor)
+    attach_types(posts, "post_type", "post_type_id", reference_data.post_types(db), PostType)
+    return posts
 
 
-def create_post(db: Session, post: PostCreate, user_id: int, files: List[UploadFile] = None):
-    db_post = Post(**post.dict(exclude={'images'}), author_id=user_id)
+def get_post_summaries(
+        db: Session,
+        fields: Sequence[str] = SUMMARY_FIELDS,
+        author_id: Optional[int] = None,
+        skip: int = 0,
+        limit: int = 100,
+        search: Optional[str] = None,
+        post_type_id: Optional[int] = None,
+        cursor: Optional[str] = None
+) -> List[Row]:
+    """Rows carrying only the columns behind `fields`, plus id and created_at for the cursor."""
+    columns = _summary_columns()
+    wanted = {"id", "created_at", *fields}
+    if "post_type_name" in wanted:
+        wanted.add("post_type_id")
+    query = db.query(*(column.label(name) for name, column in columns.items() if name in wanted))
+    if author_id is not None:
+        query = query.filter(Post.author_id == author_id)
+    if search:
+        query = query.filter(Post.title.ilike(f"%{search}%") | Post.content.ilike(f"%{search}%"))
+    if post_type_id:
+        query = query.filter(Post.post_type_id == post_type_id)
+    return _paginate(query, skip, limit, cursor)
+
+
+def summarize(db: Session, rows: Sequence[Row], fields: Sequence[str] = SUMMARY_FIELDS) -> List[PostSummary]:
+    post_types = reference_data.post_types(db) if "post_type_name" in fields else None
+    summaries = []
+    for row in rows:
+        values = row._asdict()
+        if post_types is not None:
+            values["post_type_name"] = post_types.name_of(values["post_type_id"])
+        summaries.append(PostSummary(**{name: values[name] for name in ("id", *fields) if name in values}))
+    return summaries
+
+
+def _save_post(db: Session, db_post: Post) -> Post:
+    # Runs on the threadpool: create_post and update_post only await the uploads on the event loop
     db.add(db_post)
+    invalidate_on_commit(db, "posts", *([f"post:{db_post.id}"] if db_post.id is not None else []))
     db.commit()
-    db.refresh(db_post)
+    # Reloaded with its relationships, so serializing the response doesn't query
+    return get_post(db, db_post.id)
 
-    if files:
-        for file in files:
-            file_url = upload_to_imgur(file)
-            db_image = PostImage(url=file_url, post_id=db_post.id)
-            db.add(db_image)
-        db.commit()
 
-    return db_post
+async def create_post(db: Session, post: PostCreate, user_id: int, files: List[UploadFile] = None):
+    # Upload before touching the database so a failed upload doesn't leave an image-less post behind
+    stored_images = await upload_images_with_variants(files) if files else []
+
+    db_post = Post(**post.dict(exclude={'images'}), author_id=user_id)
+    db_post.images = [
+        PostImage(url=image.url, thumbnail_url=image.thumbnail_url, medium_url=image.medium_url)
+        for image in stored_images
+    ]
+    return await run_in_threadpool(_save_post, db, db_post)
 
 
 def get_post(db: Session, id: int) -> Optional[Post]:
-    return db.query(Post).options(joinedload(Post.author), joinedload(Post.post_type), joinedload(Post.images)).filter(
-        Post.id == id).first()
+    return db.query(Post).options(*DETAIL_OPTIONS).filter(Post.id == id).first()
 
 
-def get_user_posts(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Post]:
-    return db.query(Post).filter(Post.author_id == user_id).offset(skip).limit(limit).all()
+def get_user_posts(
+        db: Session,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+) -> List[Post]:
+    posts = _paginate(db.query(Post).options(*LIST_OPTIONS).filter(Post.author_id == user_id), skip, limit, cursor)
+    attach_types(posts, "post_type", "post_type_id", reference_data.post_types(db), PostType)
+    return posts
 
 
-def update_post(db: Session, db_obj: Post, obj_in: PostUpdate, files: List[UploadFile] = None):
-    update_data = obj_in.dict(exclude_unset=True, exclude={'images'})
+def _apply_update(db: Session, db_obj: Post, update_data: dict, stored_images: Optional[list]) -> Post:
     for field, value in update_data.items():
         setattr(db_obj, field, value)
 
-    if files:
+    if stored_images is not None:
         # Remove existing images
         for image in db_obj.images:
             db.delete(image)
 
         # Add new images
-        for file in files:
-            file_url = upload_to_imgur(file)
-            db_image = PostImage(url=file_url, post_id=db_obj.id)
+        for stored_image in stored_images:
+            db_image = PostImage(url=stored_image.url, thumbnail_url=stored_image.thumbnail_url,
+                                 medium_url=stored_image.medium_url, post_id=db_obj.id)
             db.add(db_image)
 
-    db.add(db_obj)
-    db.commit()
-    db.refresh(db_obj)
-    return db_obj
+    return _save_post(db, db_obj)
+
+
+async def update_post(db: Session, db_obj: Post, obj_in: PostUpdate, files: List[UploadFile] = None):
+    update_data = obj_in.dict(exclude_unset=True, exclude={'images'})
+    stored_images = await upload_images_with_variants(files) if files else None
+    return await run_in_threadpool(_apply_update, db, db_obj, update_data, stored_images)
 
 
 def delete_post(db: Session, id: int) -> Post:
     post = db.query(Post).get(id)
     db.delete(post)
+    invalidate_on_commit(db, "posts", f"post:{id}")
     db.commit()
     return post
@@ -1,13 +1,15 @@
 from fastapi import HTTPException
 from sqlalchemy import or_
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session
 
-from backend.app.models import Product
+from backend.app.models import Product, ProductType
 from backend.app.schemas import ProductCreate, ProductUpdate
+from backend.app.services.reference_data import reference_data, attach_types
+from backend.app.services.response_cache_sync import invalidate_on_commit
 
 
 def get_products(db: Session, skip: int = 0, limit: int = 100, search: str = None, product_type_id: int = None):
-    query = db.query(Product).options(joinedload(Product.product_type))
+    query = db.query(Product)
     if search:
         query = query.filter(
             or_(
@@ -17,7 +19,9 @@ def get_products(db: Session, skip: int = 0, limit: int = 100, search: str = Non
         )
     if product_type_id:
         query = query.filter(Product.product_type_id == product_type_id)
-    return query.offset(skip).limit(limit).all()
+    products = query.offset(skip).limit(limit).all()
+    attach_types(products, "product_type", "product_type_id", reference_data.product_types(db), ProductType)
+    return products
 
 
 def create_product(db: Session, product: ProductCreate, user_id: int):
@@ -25,6 +29,7 @@ def create_product(db: Session, product: ProductCreate, user_id: int):
         raise HTTPException(status_code=400, detail="product_type_id is required")
     db_product = Product(**product.dict(), seller_id=user_id)
     db.add(db_product)
+    invalidate_on_commit(db, "products")
     db.commit()
     db.refresh(db_product)
     return db_product
@@ -41,6 +46,7 @@ def update_product(db: Session, db_obj: Product, obj_in: ProductUpdate):
     for field, value in update_data.items():
         setattr(db_obj, field, value)
     db.add(db_obj)
+    invalidate_on_commit(db, "products", f"product:{db_obj.id}")
     db.commit()
     db.refresh(db_obj)
     return db_obj
@@ -49,5 +55,6 @@ def update_product(db: Session, db_obj: Product, obj_in: ProductUpdate):
 def remove_product(db: Session, id: int):
     product = db.query(Product).get(id)
     db.delete(product)
+    invalidate_on_commit(db, "products", f"product:{id}")
     db.commit()
     return product
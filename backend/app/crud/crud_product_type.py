@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 
 from backend.app.models import ProductType
 from backend.app.schemas import ProductTypeCreate
+from backend.app.services.reference_data import reference_data
 
 
 def create_product_type(db: Session, product_type: ProductTypeCreate):
@@ -18,4 +19,4 @@ def get_product_type_by_name(db: Session, name: str):
 
 
 def get_all_product_types(db: Session):
-    return db.query(ProductType).all()
+    return reference_data.product_types(db).entries
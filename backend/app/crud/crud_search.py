@@ -1,40 +1,108 @@
 # app/crud/crud_search.py
-from typing import List
+import re
+from typing import List, Tuple
 
-from sqlalchemy import or_
+from sqlalchemy import or_, text, literal, select, union_all, func, literal_column
 from sqlalchemy.orm import Session
 
 from backend.app.models import Post, Product
 from backend.app.schemas.search import SearchResult
+from backend.app.services.reference_data import reference_data
 
+# The FTS5 table shares one rowid space between both sources: posts use even rowids, products odd ones.
+# Triggers created in the migration keep it in sync with every insert, update and delete.
+SQLITE_INDEX = "search_index"
 
-def search(db: Session, query: str, skip: int = 0, limit: int = 100) -> List[SearchResult]:
-    posts = db.query(Post).filter(
-        or_(Post.title.ilike(f"%{query}%"), Post.content.ilike(f"%{query}%"))
+# Same expressions as the GIN indexes from the migration, otherwise Postgres won't use them.
+POST_TSVECTOR = "to_tsvector('english', coalesce(posts.title, '') || ' ' || coalesce(posts.content, ''))"
+PRODUCT_TSVECTOR = ("to_tsvector('english', coalesce(products.name, '') || ' ' || "
+                    "coalesce(products.description, ''))")
+
+
+def _fts5_query(query: str) -> str:
+    # Quote every term so user input can't inject FTS5 syntax; the trailing * keeps "recyc" matching "recycling"
+    terms = re.findall(r"\w+", query)
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _search_sqlite(db: Session, query: str, skip: int, limit: int) -> List[Tuple[str, int]]:
+    match = _fts5_query(query)
+    if not match:
+        return []
+    rows = db.execute(
+        text(
+            f"SELECT rowid FROM {SQLITE_INDEX} WHERE {SQLITE_INDEX} MATCH :match "
+            f"ORDER BY bm25({SQLITE_INDEX}, 2.0, 1.0) LIMIT :limit OFFSET :skip"
+        ),
+        {"match": match, "limit": limit, "skip": skip}
     ).all()
+    return [("post" if row.rowid % 2 == 0 else "product", row.rowid // 2) for row in rows]
+
 
-    products = db.query(Product).filter(
-        or_(Product.name.ilike(f"%{query}%"), Product.description.ilike(f"%{query}%"))
+def _search_postgres(db: Session, query: str, skip: int, limit: int) -> List[Tuple[str, int]]:
+    ts_query = func.websearch_to_tsquery("english", query)
+    post_doc = literal_column(POST_TSVECTOR)
+    product_doc = literal_column(PRODUCT_TSVECTOR)
+    hits = union_all(
+        select(literal("post").label("kind"), Post.id.label("id"),
+               func.ts_rank_cd(post_doc, ts_query).label("score")).where(post_doc.op("@@")(ts_query)),
+        select(literal("product").label("kind"), Product.id.label("id"),
+               func.ts_rank_cd(product_doc, ts_query).label("score")).where(product_doc.op("@@")(ts_query)),
+    ).subquery()
+    rows = db.execute(
+        select(hits.c.kind, hits.c.id).order_by(hits.c.score.desc(), hits.c.id).offset(skip).limit(limit)
     ).all()
+    return [(row.kind, row.id) for row in rows]
+
+
+def _search_like(db: Session, query: str, skip: int, limit: int) -> List[Tuple[str, int]]:
+    # Fallback for databases without a full-text index: unranked, but still paginated in SQL
+    pattern = f"%{query}%"
+    hits = union_all(
+        select(literal("post").label("kind"), Post.id.label("id"))
+        .where(or_(Post.title.ilike(pattern), Post.content.ilike(pattern))),
+        select(literal("product").label("kind"), Product.id.label("id"))
+        .where(or_(Product.name.ilike(pattern), Product.description.ilike(pattern))),
+    ).subquery()
+    rows = db.execute(select(hits.c.kind, hits.c.id).order_by(hits.c.kind, hits.c.id).offset(skip).limit(limit)).all()
+    return [(row.kind, row.id) for row in rows]
+
+
+def search(db: Session, query: str, skip: int = 0, limit: int = 100) -> List[SearchResult]:
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        hits = _search_sqlite(db, query, skip, limit)
+    elif dialect == "postgresql":
+        hits = _search_postgres(db, query, skip, limit)
+    else:
+        hits = _search_like(db, query, skip, limit)
+
+    post_ids = [id_ for kind, id_ in hits if kind == "post"]
+    product_ids = [id_ for kind, id_ in hits if kind == "product"]
+    # Only the columns the results need, as plain rows: nothing to lazy-load per hit
+    posts = {post.id: post for post in db.query(Post.id, Post.title, Post.content, Post.post_type_id)
+             .filter(Post.id.in_(post_ids))} if post_ids else {}
+    post_types = reference_data.post_types(db)
+    products = {product.id: product for product in db.query(Product.id, Product.name, Product.description)
+                .filter(Product.id.in_(product_ids))} if product_ids else {}
 
     results = []
-    for post in posts:
-        results.append(SearchResult(
-            id=post.id,
-            type=post.post_type.name,
-            title=post.title,
-            description=post.content[:100]
-        ))
-
-    for product in products:
-        results.append(SearchResult(
-            id=product.id,
-            type="product",
-            title=product.name,
-            description=product.description[:100] if product.description else ""
-        ))
-
-    results.sort(key=lambda x: x.title.lower().count(query.lower()) + x.description.lower().count(query.lower()),
-                 reverse=True)
-
-    return results[skip: skip + limit]
+    for kind, id_ in hits:
+        if kind == "post" and id_ in posts:
+            post = posts[id_]
+            results.append(SearchResult(
+                id=post.id,
+                type=post_types.name_of(post.post_type_id, "post"),
+                title=post.title,
+                description=post.content[:100] if post.content else ""
+            ))
+        elif kind == "product" and id_ in products:
+            product = products[id_]
+            results.append(SearchResult(
+                id=product.id,
+                type="product",
+                title=product.name,
+                description=product.description[:100] if product.description else ""
+            ))
+
+    return results
@@ -1,14 +1,22 @@
-from typing import List, Tuple, Dict
+import heapq
+from typing import Dict, Iterator, List
 
-import requests
-from fastapi import UploadFile, HTTPException
-from sqlalchemy import func
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import Integer, String, func, literal, null, select, union_all
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
+from backend.app.core.cache import TTLCache
 from backend.app.core.config import settings
-from backend.app.core.security import get_password_hash, verify_password
-from backend.app.models import User, UserPhoto, Reward, Expense
-from backend.app.schemas import UserCreate, UserUpdate, UserPhotoCreate, RewardCreate, ExpenseCreate
+from backend.app.core.security import get_password_hash_async, verify_and_update_password
+from backend.app.crud import crud_ledger
+from backend.app.db.time_range import in_range, month_bounds
+from backend.app.models import User, Reward, Expense
+from backend.app.schemas import UserCreate, RewardCreate, ExpenseCreate, User as UserSnapshot
+from backend.app.services.reference_data import reference_data
+
+# schemas.User snapshots for stateless auth, see deps.get_current_user. Anything that changes a field
+# exposed by schemas.User must invalidate the entry.
+user_cache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
 
 
 def get_user(db: Session, user_id: int):
@@ -19,73 +27,45 @@ def get_user_by_email(db: Session, email: str):
     return db.query(User).filter(User.email == email).first()
 
 
-def create_user(db: Session, user: UserCreate):
-    db_user = User(email=user.email, hashed_password=get_password_hash(user.password), full_name=user.full_name)
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
-
-
-def update_user(db: Session, db_obj: User, obj_in: UserUpdate):
-    update_data = obj_in.dict(exclude_unset=True)
-    if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(update_data["password"])
-        del update_data["password"]
-    for field, value in update_data.items():
-        setattr(db_obj, field, value)
+def _save(db: Session, db_obj):
     db.add(db_obj)
     db.commit()
     db.refresh(db_obj)
     return db_obj
 
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = get_user_by_email(db, email)
-    if not user or not verify_password(password, user.hashed_password):
-        return None
-    return user
-
+# The async functions below hash on the password pool and run their queries on the threadpool, so
+# neither bcrypt nor the sync session blocks the event loop.
 
-def is_active(user: User) -> bool:
-    return user.is_active
+async def create_user(db: Session, user: UserCreate):
+    hashed_password = await get_password_hash_async(user.password)
+    db_user = User(email=user.email, hashed_password=hashed_password, full_name=user.full_name)
+    return await run_in_threadpool(_save, db, db_user)
 
 
-async def get_user_photos(db: Session, user_id: int, skip: int = 0, limit: int = 30) -> List[UserPhoto]:
-    return db.query(UserPhoto).filter(UserPhoto.user_id == user_id).offset(skip).limit(limit).all()
+async def set_password(db: Session, user: User, password: str):
+    user.hashed_password = await get_password_hash_async(password)
+    await run_in_threadpool(db.commit)
+    user_cache.invalidate(user.id)
+    return user
 
 
-def upload_to_imgur(file: UploadFile):
-    headers = {'Authorization': f'Client-ID {settings.IMGUR_CLIENT_ID}'}
-    response = requests.post(
-        url="https://api.imgur.com/3/upload",
-        headers=headers,
-        files={'image': file.file.read()}
-    )
-    if response.status_code == 200:
-        json_response = response.json()
-        return json_response['data']['link']
-    else:
-        raise HTTPException(status_code=response.status_code, detail="Failed to upload image to Imgur")
-
-
-async def upload_user_photo(db: Session, user_id: int, file: UploadFile):
-    file_url = upload_to_imgur(file)
-    photo_create = UserPhotoCreate(url=file_url)
-    db_photo = UserPhoto(**photo_create.dict(), user_id=user_id)
-    db.add(db_photo)
-    db.commit()
-    db.refresh(db_photo)
-    return db_photo
+async def authenticate_user(db: Session, email: str, password: str):
+    user = await run_in_threadpool(get_user_by_email, db, email)
+    if not user:
+        return None
+    verified, new_hash = await verify_and_update_password(password, user.hashed_password)
+    if not verified:
+        return None
+    if new_hash:
+        # Stored hash predates the current BCRYPT_ROUNDS; upgrade it while we have the plaintext
+        user.hashed_password = new_hash
+        await run_in_threadpool(db.commit)
+    return user
 
 
-async def create_user_photo(db: Session, user_id: int, photo_url: str):
-    photo_create = UserPhotoCreate(url=photo_url)
-    db_photo = UserPhoto(**photo_create.dict(), user_id=user_id)
-    db.add(db_photo)
-    db.commit()
-    db.refresh(db_photo)
-    return db_photo
+def is_active(user: UserSnapshot) -> bool:
+    return user.is_active
 
 
 def get_user_options(db: Session, user_id: int):
@@ -111,86 +91,44 @@ def update_user_options(db: Session, user_id: int, options: dict):
     db.add(user)
     db.commit()
     db.refresh(user)
+    user_cache.invalidate(user_id)
     return get_user_options(db, user_id)
 
 
 def create_user_reward(db: Session, reward: RewardCreate, user_id: int) -> Reward:
-    db_reward = Reward(**reward.dict(), user_id=user_id)
-    db.add(db_reward)
-    db.commit()
-    db.refresh(db_reward)
-
-    # Update user balance
-    user = db.query(User).filter(User.id == user_id).first()
-    user.balance += reward.points
-    db.commit()
-
-    return db_reward
-
-
-async def update_user_profile(db: Session, user_id: int, user_update: UserUpdate):
-    user = get_user(db, user_id)
-    if not user:
-        return None
-
-    if user_update.bio is not None:
-        user.bio = user_update.bio
-
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+    return crud_ledger.post_reward(db, reward, user_id)
 
 
-def get_user_rewards(db: Session, user_id: int, limit: int = 10) -> Tuple[List[Reward], int]:
-    rewards = db.query(Reward).options(joinedload(Reward.waste_type)).filter(Reward.user_id == user_id).order_by(
+def get_user_rewards(db: Session, user_id: int, limit: int = 10) -> List[Reward]:
+    rewards = db.query(Reward).filter(Reward.user_id == user_id).order_by(
         Reward.created_at.desc()).limit(limit).all()
-    total_rewards = db.query(func.sum(Reward.points)).filter(Reward.user_id == user_id).scalar() or 0
+    waste_types = reference_data.waste_types(db)
     rewards_with_waste_type = [
         Reward(
             id=reward.id,
             user_id=reward.user_id,
             points=reward.points,
-            waste_type=reward.waste_type.name if reward.waste_type else "Unknown",
+            waste_type=waste_types.name_of(reward.waste_type_id, "Unknown"),
             created_at=reward.created_at
         ) for reward in rewards
     ]
-    return rewards_with_waste_type, total_rewards
+    return rewards_with_waste_type
 
 
-def get_user_expenses(db: Session, user_id: int, limit: int = 10) -> Tuple[List[Expense], float]:
-    expenses = db.query(Expense).filter(Expense.user_id == user_id).order_by(
+def get_user_expenses(db: Session, user_id: int, limit: int = 10) -> List[Expense]:
+    return db.query(Expense).filter(Expense.user_id == user_id).order_by(
         Expense.created_at.desc()).limit(limit).all()
-    total_expenses = db.query(func.sum(Expense.points)).filter(Expense.user_id == user_id).scalar() or 0.0
-    return expenses, total_expenses
-
-
-def create_user_expense(db: Session, expense: ExpenseCreate, user_id: int):
-    db_expense = Expense(**expense.dict(), user_id=user_id)
-    db.add(db_expense)
-    db.commit()
-    db.refresh(db_expense)
-
-    # Update user balance
-    user = db.query(User).filter(User.id == user_id).first()
-    user.balance -= expense.points
-    db.commit()
-
-    return db_expense
 
 
-async def update_user_profile_photo(db: Session, user_id: int, profile_photo: UploadFile):
-    user = get_user(db, user_id)
-    if not user:
-        return None
+def get_user_balance(db: Session, user_id: int) -> int:
+    summary = crud_ledger.get_ledger_summary(db, user_id)
+    if summary is None:
+        return 0
+    return summary.total_rewards - summary.total_expenses
 
-    photo_url = upload_to_imgur(profile_photo)
-    user.profile_image = photo_url
 
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+def create_user_expense(db: Session, expense: ExpenseCreate, user_id: int):
+    return crud_ledger.post_expense(db, expense, user_id)
 
 
 def get_weekly_data(db: Session, user_id: int) -> List[Dict]:
@@ -237,36 +175,66 @@ def get_weekly_data(db: Session, user_id: int) -> List[Dict]:
 
 
 def get_monthly_transactions(db: Session, user_id: int, year: int, month: int) -> List[Dict]:
-    rewards = db.query(Reward).options(joinedload(Reward.waste_type)).filter(
+    start, end = month_bounds(year, month)
+    rewards = db.query(Reward.waste_type_id, Reward.points, Reward.created_at).filter(
         Reward.user_id == user_id,
-        func.strftime('%Y', Reward.created_at) == str(year),
-        func.strftime('%m', Reward.created_at) == f'{month:02d}'
-    ).all()
+        in_range(db, Reward.created_at, start, end)
+    ).order_by(Reward.created_at.desc(), Reward.id.desc())
 
-    expenses = db.query(Expense).filter(
+    expenses = db.query(Expense.description, Expense.points, Expense.created_at).filter(
         Expense.user_id == user_id,
-        func.strftime('%Y', Expense.created_at) == str(year),
-        func.strftime('%m', Expense.created_at) == f'{month:02d}'
-    ).all()
-
-    transactions = [  # noqa: E126
-                       {  # noqa: E126
-                           "type": "reward",
-                           "description": reward.waste_type.name,
-                           "points": reward.points,
-                           "created_at": reward.created_at
-                       }
-                       for reward in rewards
-                   ] + [  # noqa: E126
-                       {  # noqa: E126
-                           "type": "expense",
-                           "description": expense.description,
-                           "points": expense.points,
-                           "created_at": expense.created_at
-                       }
-                       for expense in expenses
-                   ]  # noqa: E126
-
-    transactions.sort(key=lambda x: x["created_at"], reverse=True)
-
-    return transactions
+        in_range(db, Expense.created_at, start, end)
+    ).order_by(Expense.created_at.desc(), Expense.id.desc())
+
+    waste_types = reference_data.waste_types(db)
+    # Both sides come back newest first from the (user_id, created_at) indexes, so merging keeps the order
+    return list(heapq.merge(
+        (
+            {
+                "type": "reward",
+                "description": waste_types.name_of(reward.waste_type_id),
+                "points": reward.points,
+                "created_at": reward.created_at
+            }
+            for reward in rewards
+        ),
+        (
+            {
+                "type": "expense",
+                "description": expense.description,
+                "points": expense.points,
+                "created_at": expense.created_at
+            }
+            for expense in expenses
+        ),
+        key=lambda transaction: transaction["created_at"],
+        reverse=True,
+    ))
+
+
+def iter_transactions(db: Session, user_id: int, batch_size: int = 1000) -> Iterator[Dict]:
+    """The user's whole reward and expense history, oldest first, merged and ordered by the database.
+
+    Rows are fetched `batch_size` at a time, so memory stays flat however long the history is.
+    """
+    history = union_all(
+        select(literal("reward").label("type"), Reward.id, Reward.waste_type_id,
+               null().cast(String).label("description"), Reward.points, Reward.created_at)
+        .where(Reward.user_id == user_id),
+        select(literal("expense").label("type"), Expense.id, null().cast(Integer).label("waste_type_id"),
+               Expense.description, Expense.points, Expense.created_at)
+        .where(Expense.user_id == user_id),
+    ).subquery()
+    rows = db.execute(
+        select(history).order_by(history.c.created_at, history.c.type, history.c.id)
+        .execution_options(yield_per=batch_size)
+    )
+    waste_types = reference_data.waste_types(db)
+    for row in rows:
+        yield {
+            "type": row.type,
+            "id": row.id,
+            "description": waste_types.name_of(row.waste_type_id) if row.type == "reward" else row.description,
+            "points": row.points,
+            "created_at": row.created_at,
+        }
@@ -0,0 +1,110 @@
+# app/crud/crud_user_async.py
+"""AsyncSession counterparts of crud_user for the async endpoints.
+
+Simple reads are native async queries. Paths that share logic with the sync layer (ledger postings,
+reports) run that code through AsyncSession.run_sync, which still does its IO on the async driver.
+"""
+from typing import Dict, List, Optional
+
+from fastapi import UploadFile
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from backend.app.crud import crud_ledger, crud_user
+from backend.app.models import User, UserPhoto, Reward, Expense, UserLedger
+from backend.app.schemas import UserUpdate, RewardCreate
+from backend.app.services import upload_image_with_variants
+from backend.app.services.reference_data import reference_data
+
+
+async def get_user(db: AsyncSession, user_id: int) -> Optional[User]:
+    return await db.get(User, user_id)
+
+
+async def get_user_photos(db: AsyncSession, user_id: int, skip: int = 0, limit: int = 30) -> List[UserPhoto]:
+    result = await db.scalars(select(UserPhoto).where(UserPhoto.user_id == user_id).offset(skip).limit(limit))
+    return list(result)
+
+
+async def upload_user_photo(db: AsyncSession, user_id: int, file: UploadFile) -> UserPhoto:
+    stored_image = await upload_image_with_variants(file)
+    db_photo = UserPhoto(url=stored_image.url, thumbnail_url=stored_image.thumbnail_url,
+                         medium_url=stored_image.medium_url, user_id=user_id)
+    db.add(db_photo)
+    await db.commit()
+    await db.refresh(db_photo)
+    return db_photo
+
+
+async def update_user_profile(db: AsyncSession, user_id: int, user_update: UserUpdate) -> Optional[User]:
+    user = await get_user(db, user_id)
+    if not user:
+        return None
+    if user_update.bio is not None:
+        user.bio = user_update.bio
+    await db.commit()
+    await db.refresh(user)
+    crud_user.user_cache.invalidate(user_id)
+    return user
+
+
+async def update_user_profile_photo(db: AsyncSession, user_id: int, profile_photo: UploadFile) -> Optional[User]:
+    user = await get_user(db, user_id)
+    if not user:
+        return None
+    stored_image = await upload_image_with_variants(profile_photo)
+    user.profile_image = stored_image.url
+    user.profile_image_thumbnail_url = stored_image.thumbnail_url
+    await db.commit()
+    await db.refresh(user)
+    crud_user.user_cache.invalidate(user_id)
+    return user
+
+
+async def get_user_rewards(db: AsyncSession, user_id: int, limit: int = 10) -> List[Dict]:
+    rewards = await db.scalars(
+        select(Reward).where(Reward.user_id == user_id).order_by(Reward.created_at.desc()).limit(limit))
+    waste_types = await db.run_sync(reference_data.waste_types)
+    return [
+        {
+            "id": reward.id,
+            "user_id": reward.user_id,
+            "points": reward.points,
+            "waste_type": waste_types.name_of(reward.waste_type_id, "Unknown"),
+            "created_at": reward.created_at,
+        }
+        for reward in rewards
+    ]
+
+
+async def get_user_expenses(db: AsyncSession, user_id: int, limit: int = 10) -> List[Expense]:
+    result = await db.scalars(
+        select(Expense).where(Expense.user_id == user_id).order_by(Expense.created_at.desc()).limit(limit))
+    return list(result)
+
+
+async def get_user_balance(db: AsyncSession, user_id: int) -> int:
+    summary = await db.get(UserLedger, user_id)
+    if summary is None:
+        return 0
+    return summary.total_rewards - summary.total_expenses
+
+
+async def create_user_reward(db: AsyncSession, reward: RewardCreate, user_id: int) -> Dict:
+    db_reward = await db.run_sync(crud_ledger.post_reward, reward, user_id)
+    waste_types = await db.run_sync(reference_data.waste_types)
+    return {
+        "id": db_reward.id,
+        "user_id": db_reward.user_id,
+        "points": db_reward.points,
+        "waste_type": waste_types.name_of(db_reward.waste_type_id, "Unknown"),
+        "created_at": db_reward.created_at,
+    }
+
+
+async def get_weekly_data(db: AsyncSession, user_id: int) -> List[Dict]:
+    return await db.run_sync(crud_user.get_weekly_data, user_id)
+
+
+async def get_monthly_transactions(db: AsyncSession, user_id: int, year: int, month: int) -> List[Dict]:
+    return await db.run_sync(crud_user.get_monthly_transactions, user_id, year, month)
@@ -1,37 +1,208 @@
-from sqlalchemy import func
+import heapq
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import and_, column, insert, inspect, or_, select, table, update
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
-from backend.app.models import WasteCollection, RecyclingCenter, WasteType
-from backend.app.schemas import WasteCollectionCreate
+from backend.app.core.config import settings
+from backend.app.core.geo import bounding_boxes, haversine_km
+from backend.app.crud import crud_ledger
+from backend.app.models import WasteCollection, RecyclingCenter, ReferenceDataVersion
+from backend.app.schemas import WasteCollectionCreate, RecyclingCenterCreate, RecyclingCenterUpdate
+from backend.app.services.geo_index import recycling_center_index
+from backend.app.services.reference_data import reference_data
+
+# SQLite R*Tree over center coordinates, kept in sync by triggers from the migration
+RTREE_TABLE = table(
+    "recycling_centers_rtree",
+    column("id"), column("min_lat"), column("max_lat"), column("min_lon"), column("max_lon"),
+)
+_rtree_available = {}
+
+logger = logging.getLogger(__name__)
 
 
 def get_waste_types(db: Session):
-    return [waste_type.name for waste_type in db.query(WasteType).all()]
+    return [waste_type.name for waste_type in reference_data.waste_types(db)]
 
 
 def create_waste_collection(db: Session, waste_collection: WasteCollectionCreate, user_id: int):
-    db_waste_collection = WasteCollection(**waste_collection.dict(), user_id=user_id)
+    entry = reference_data.waste_types(db).by_name(waste_collection.waste_type)
+    if entry is None:
+        raise HTTPException(status_code=400, detail=f"Unknown waste type: {waste_collection.waste_type}")
+    db_waste_collection = WasteCollection(**waste_collection.dict(exclude={"waste_type"}), waste_type_id=entry.id,
+                                          user_id=user_id)
     db.add(db_waste_collection)
     db.commit()
     db.refresh(db_waste_collection)
     return db_waste_collection
 
 
-def get_nearby_recycling_centers(db: Session, latitude: float, longitude: float, radius: float = 10.0):
-    # Increase the radius to 10.0 km to find more centers
-    distance = func.sqrt(
-        func.pow(111.045 * (RecyclingCenter.latitude - latitude), 2) +
-        func.pow(111.045 * func.cos(func.radians(latitude)) * (RecyclingCenter.longitude - longitude), 2)
-    )
+def create_waste_collections(
+        db: Session, items: Sequence[Tuple[int, WasteCollectionCreate]], user_id: int
+) -> Tuple[int, int, List[Dict]]:
+    """Insert one chunk of collections plus a reward for each, in a single transaction.
+
+    `items` pairs each collection with its position in the upload. Unknown waste types are reported
+    and skipped; if the write fails, every item of the chunk is reported. Returns
+    (collections created, reward points posted, errors).
+    """
+    waste_types = reference_data.waste_types(db)
+    indexes, rows, postings, errors = [], [], [], []
+    for index, item in items:
+        entry = waste_types.by_name(item.waste_type)
+        if entry is None:
+            errors.append({"index": index, "detail": f"Unknown waste type: {item.waste_type}"})
+            continue
+        indexes.append(index)
+        rows.append({**item.dict(exclude={"waste_type"}), "waste_type_id": entry.id, "user_id": user_id})
+        if entry.reward_points:
+            postings.append(crud_ledger.Posting(user_id=user_id, points=entry.reward_points, waste_type_id=entry.id))
+    if not rows:
+        return 0, 0, errors
+
+    try:
+        db.execute(insert(WasteCollection), rows)
+        if postings:
+            # Commits the collections along with the rewards, or rolls both back
+            crud_ledger.post_batch(db, postings)
+        else:
+            db.commit()
+    except (SQLAlchemyError, ValueError):
+        db.rollback()
+        logger.exception("Failed to store a chunk of %d waste collections", len(rows))
+        errors.extend({"index": index, "detail": "Could not be stored, retry the item"} for index in indexes)
+        return 0, 0, errors
+    return len(rows), sum(posting.points for posting in postings), errors
+
+
+def _has_rtree(db: Session) -> bool:
+    bind = db.get_bind()
+    if bind.dialect.name != "sqlite":
+        return False
+    if bind not in _rtree_available:
+        _rtree_available[bind] = inspect(bind).has_table(RTREE_TABLE.name)
+    return _rtree_available[bind]
+
+
+def _index_center(center: RecyclingCenter):
+    if center.latitude is not None and center.longitude is not None:
+        recycling_center_index.upsert((center.id, center.name, center.address, center.latitude, center.longitude))
+    else:
+        # A center without coordinates can't be found by distance, drop whatever point it had
+        recycling_center_index.remove(center.id)
+
+
+def _bump_recycling_centers_version(db: Session):
+    # Lets every worker's refresh skip the full index rebuild while the table is unchanged
+    bumped = db.execute(
+        update(ReferenceDataVersion).where(ReferenceDataVersion.name == RecyclingCenter.__tablename__)
+        .values(version=ReferenceDataVersion.version + 1)
+    ).rowcount
+    if not bumped:
+        db.add(ReferenceDataVersion(name=RecyclingCenter.__tablename__, version=1))
+
+
+def recycling_centers_version(db: Session) -> int:
+    return db.scalar(
+        select(ReferenceDataVersion.version).where(ReferenceDataVersion.name == RecyclingCenter.__tablename__)
+    ) or 0
+
+
+def load_recycling_center_index(db: Session):
+    def fetch():
+        return db.query(
+            RecyclingCenter.id,
+            RecyclingCenter.name,
+            RecyclingCenter.address,
+            RecyclingCenter.latitude,
+            RecyclingCenter.longitude,
+        ).filter(RecyclingCenter.latitude.isnot(None), RecyclingCenter.longitude.isnot(None)).all()
+
+    recycling_center_index.load(lambda: (tuple(row) for row in fetch()))
+
+
+def refresh_recycling_center_index(db: Session, loaded_version: Optional[int] = None) -> int:
+    """Rebuild the index unless the centers are unchanged since `loaded_version`; returns the version now loaded.
 
+    The version is read before the rows, so a write landing during the load triggers another rebuild next time.
+    """
+    version = recycling_centers_version(db)
+    if version != loaded_version or not recycling_center_index.ready:
+        load_recycling_center_index(db)
+    return version
+
+
+def get_recycling_center(db: Session, center_id: int):
+    return db.get(RecyclingCenter, center_id)
+
+
+def create_recycling_center(db: Session, center: RecyclingCenterCreate):
+    db_center = RecyclingCenter(**center.dict())
+    db.add(db_center)
+    _bump_recycling_centers_version(db)
+    db.commit()
+    db.refresh(db_center)
+    _index_center(db_center)
+    return db_center
+
+
+def update_recycling_center(db: Session, db_obj: RecyclingCenter, obj_in: RecyclingCenterUpdate):
+    for field, value in obj_in.dict(exclude_unset=True).items():
+        setattr(db_obj, field, value)
+    db.add(db_obj)
+    _bump_recycling_centers_version(db)
+    db.commit()
+    db.refresh(db_obj)
+    _index_center(db_obj)
+    return db_obj
+
+
+def delete_recycling_center(db: Session, db_obj: RecyclingCenter):
+    center_id = db_obj.id
+    db.delete(db_obj)
+    _bump_recycling_centers_version(db)
+    db.commit()
+    recycling_center_index.remove(center_id)
+    return db_obj
+
+
+def get_nearby_recycling_centers(db: Session, latitude: float, longitude: float, radius: float = 10.0,
+                                 limit: int = 10):
+    if settings.GEO_INDEX_ENABLED and recycling_center_index.ready:
+        return recycling_center_index.nearest(latitude, longitude, limit=limit, radius=radius)
+
+    # Only centers inside the bounding box of the search circle are read; exact distances are computed here
+    # because SQLite ships without trigonometric functions.
+    boxes = bounding_boxes(latitude, longitude, radius)
     query = db.query(
         RecyclingCenter.id,
         RecyclingCenter.name,
         RecyclingCenter.address,
         RecyclingCenter.latitude,
         RecyclingCenter.longitude,
-        distance.label('distance')
-    ).filter(distance <= radius).order_by(distance).limit(10)
+    )
+    if _has_rtree(db):
+        query = query.join(RTREE_TABLE, RTREE_TABLE.c.id == RecyclingCenter.id).filter(or_(*(
+            and_(RTREE_TABLE.c.min_lat <= max_lat, RTREE_TABLE.c.max_lat >= min_lat,
+                 RTREE_TABLE.c.min_lon <= max_lon, RTREE_TABLE.c.max_lon >= min_lon)
+            for min_lat, max_lat, min_lon, max_lon in boxes
+        )))
+    else:
+        query = query.filter(or_(*(
+            and_(RecyclingCenter.latitude.between(min_lat, max_lat),
+                 RecyclingCenter.longitude.between(min_lon, max_lon))
+            for min_lat, max_lat, min_lon, max_lon in boxes
+        )))
+
+    candidates = (
+        (haversine_km(latitude, longitude, row.latitude, row.longitude), row)
+        for row in query
+    )
+    nearest = heapq.nsmallest(limit, (c for c in candidates if c[0] <= radius), key=lambda c: c[0])
 
     results = [
         {
@@ -40,16 +211,16 @@ def get_nearby_recycling_centers(db: Session, latitude: float, longitude: float,
             "address": row.address,
             "latitude": float(row.latitude),
             "longitude": float(row.longitude),
-            "distance": float(row.distance)
+            "distance": float(distance)
         }
-        for row in query
+        for distance, row in nearest
     ]
 
     return results
 
 
 def get_reward_for_waste_type(db: Session, waste_type: str):
-    waste_type_obj = db.query(WasteType).filter(WasteType.name == waste_type).first()
-    if waste_type_obj:
-        return waste_type_obj.reward_points
+    entry = reference_data.waste_types(db).by_name(waste_type)
+    if entry:
+        return entry.reward_points
     return 0
@@ -0,0 +1,90 @@
+# app/db/engine.py
+from typing import Any, Dict
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, URL, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from backend.app.core.config import settings
+
+# Async drivers for the same database, unless SQLALCHEMY_ASYNC_DATABASE_URI points somewhere explicitly
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg"}
+
+
+def async_database_uri(uri: str) -> str:
+    url = make_url(uri)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)).render_as_string(
+        hide_password=False)
+
+
+def _is_memory_sqlite(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def _engine_options(url: URL, read_only: bool, is_async: bool = False) -> Dict[str, Any]:
+    options: Dict[str, Any] = {"pool_pre_ping": True, "query_cache_size": settings.DB_QUERY_CACHE_SIZE}
+    if _is_memory_sqlite(url):
+        return options
+    options.update(
+        pool_size=settings.DB_READ_POOL_SIZE if read_only else settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+    if url.get_backend_name() == "sqlite" and is_async:
+        # aiosqlite would otherwise open a new connection (and rerun the pragmas) per session
+        options["poolclass"] = AsyncAdaptedQueuePool
+    if url.get_backend_name() == "postgresql":
+        if url.drivername == "postgresql+asyncpg":
+            options["connect_args"] = {"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+        if read_only:
+            options["execution_options"] = {"postgresql_readonly": True}
+    return options
+
+
+def _sqlite_pragmas(read_only: bool) -> Dict[str, Any]:
+    pragmas = {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE_BYTES,
+        # Negative values are KiB rather than pages
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KIB,
+    }
+    if read_only:
+        pragmas["query_only"] = "ON"
+    return pragmas
+
+
+def _install_sqlite_pragmas(engine: Engine, url: URL, read_only: bool):
+    if url.get_backend_name() != "sqlite" or _is_memory_sqlite(url):
+        return
+    pragmas = _sqlite_pragmas(read_only)
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+
+def create_db_engine(uri: str, read_only: bool = False) -> Engine:
+    """Engine tuned from Settings: pool sizing everywhere, WAL and friends on SQLite.
+
+    A read_only engine refuses writes at the connection level (query_only / READ ONLY transactions).
+    """
+    url = make_url(uri)
+    engine = create_engine(url, **_engine_options(url, read_only))
+    _install_sqlite_pragmas(engine, url, read_only)
+    return engine
+
+
+def create_async_db_engine(uri: str, read_only: bool = False) -> AsyncEngine:
+    url = make_url(uri)
+    engine = create_async_engine(url, **_engine_options(url, read_only, is_async=True))
+    _install_sqlite_pragmas(engine.sync_engine, url, read_only)
+    return engine
@@ -0,0 +1,78 @@
+# app/db/query_counter.py
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCount:
+    def __init__(self):
+        self.statements: List[str] = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+
+# Counters are looked up through the context so concurrent requests don't count each other's queries.
+# Starlette copies the context into its worker threads, so sync handlers and dependencies are counted too.
+_active: ContextVar[tuple] = ContextVar("active_query_counts", default=())
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    for counter in _active.get():
+        counter.statements.append(statement)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCount]:
+    """Count the SQL statements executed inside the block, on any engine."""
+    counter = QueryCount()
+    token = _active.set(_active.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryCount]:
+    """Fail if the block runs more than `limit` statements; meant to pin down N+1 regressions."""
+    with count_queries() as counter:
+        yield counter
+    if counter.count > limit:
+        raise AssertionError(
+            f"Expected at most {limit} queries, got {counter.count}:\n" + "\n".join(counter.statements))
+
+
+class QueryBudgetMiddleware:
+    """Logs every request that runs more than `budget` SQL statements."""
+
+    def __init__(self, app: ASGIApp, budget: int, header: Optional[str] = None):
+        self.app = app
+        self.budget = budget
+        self.header = header.lower().encode() if header else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries() as counter:
+            async def send_with_count(message):
+                if self.header and message["type"] == "http.response.start":
+                    message["headers"] = [*message.get("headers", []), (self.header, str(counter.count).encode())]
+                await send(message)
+
+            await self.app(scope, receive, send_with_count)
+
+        if counter.count > self.budget:
+            logger.warning("%s %s ran %d queries (budget %d)",
+                           scope["method"], scope["path"], counter.count, self.budget)
@@ -0,0 +1,151 @@
+# app/db/routing.py
+import asyncio
+import itertools
+import logging
+import math
+import threading
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.datastructures import Headers
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from backend.app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Request state key the write paths set to the epoch time until which the client reads from the primary
+PIN_STATE = "primary_until"
+# Request state key set when the response was rendered from a replica
+REPLICA_STATE = "read_from_replica"
+
+
+def pin_is_active(value: Optional[str]) -> bool:
+    """Whether a pin cookie's deadline is still ahead. Deadlines further out than any pin window are ignored."""
+    try:
+        until = float(value)
+    except (TypeError, ValueError):
+        return False
+    now = time.time()
+    return now < until <= now + settings.READ_YOUR_WRITES_SECONDS + settings.REPLICA_MAX_LAG_SECONDS
+
+
+class ReplicaRouter:
+    """Hands out read sessions from replicas, falling back to the primary when needed.
+
+    A client that wrote recently is pinned to the primary for READ_YOUR_WRITES_SECONDS, stretched to the
+    worst replica lag seen, so it always reads its own writes. The pin travels with the client, see
+    ReadYourWritesMiddleware. Replicas lagging more than
+    REPLICA_MAX_LAG_SECONDS are skipped until they catch up; lag is probed in the background once `start`
+    is called, every REPLICA_LAG_CHECK_SECONDS.
+    """
+
+    def __init__(self, primary: sessionmaker, replicas: List[sessionmaker]):
+        self.primary = primary
+        self.replicas = replicas
+        self._cycle = itertools.cycle(range(len(replicas)))
+        self._lag: Dict[int, float] = {}
+        self._probe_task: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    def pin_deadline(self) -> float:
+        """Epoch time until which a client that just wrote should read from the primary."""
+        usable_lag = [lag for lag in self._lag.values() if lag <= settings.REPLICA_MAX_LAG_SECONDS]
+        return time.time() + max([settings.READ_YOUR_WRITES_SECONDS, *usable_lag])
+
+    def _measure_lag(self, index: int) -> float:
+        session = self.replicas[index]()
+        try:
+            bind = session.get_bind()
+            if bind.dialect.name != "postgresql":
+                return 0.0
+            # A replica that has replayed everything it received is caught up, however long ago the last
+            # transaction was; only otherwise does the age of the last replayed one say how far behind it is
+            lag = session.execute(text(
+                "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+                " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+            )).scalar()
+            return float(lag or 0.0)
+        finally:
+            session.close()
+
+    def refresh_lag(self):
+        for index in range(len(self.replicas)):
+            try:
+                self._lag[index] = self._measure_lag(index)
+            except Exception:
+                logger.warning("Replica %d is unreachable, routing reads elsewhere", index, exc_info=True)
+                self._lag[index] = float("inf")
+
+    async def start(self):
+        self._probe_task = asyncio.create_task(self._probe())
+
+    async def stop(self):
+        if self._probe_task is not None:
+            self._probe_task.cancel()
+            await asyncio.gather(self._probe_task, return_exceptions=True)
+            self._probe_task = None
+
+    async def _probe(self):
+        # Off the request path: a slow or unreachable replica delays the next probe, not a read
+        while True:
+            await asyncio.to_thread(self.refresh_lag)
+            await asyncio.sleep(settings.REPLICA_LAG_CHECK_SECONDS)
+
+    def read_session(self, pinned: bool = False) -> Session:
+        if not self.replicas or pinned:
+            return self.primary()
+        for _ in range(len(self.replicas)):
+            with self._lock:
+                index = next(self._cycle)
+            if self._lag.get(index, 0.0) <= settings.REPLICA_MAX_LAG_SECONDS:
+                return self.replicas[index]()
+        return self.primary()
+
+
+def scope_is_pinned(scope: Scope) -> bool:
+    cookies = cookie_parser(Headers(scope=scope).get("cookie", ""))
+    return pin_is_active(cookies.get(settings.READ_YOUR_WRITES_COOKIE))
+
+
+def replica_staleness(scope: Scope) -> float:
+    """How far behind the primary a response may be: the most lag a replica is used with, if it read from one."""
+    return settings.REPLICA_MAX_LAG_SECONDS if scope.get("state", {}).get(REPLICA_STATE) else 0.0
+
+
+class ReadYourWritesMiddleware:
+    """Sends a client that wrote a cookie holding its pin deadline, so whichever worker serves its next
+    read routes it to the primary.
+
+    Forging the cookie only sends the forger's own reads to the primary.
+    """
+
+    def __init__(self, app: ASGIApp, cookie_name: str):
+        self.app = app
+        self.cookie_name = cookie_name
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_pin(message: Message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                until = scope.get("state", {}).get(PIN_STATE)
+                if until is not None:
+                    max_age = max(1, math.ceil(until - time.time()))
+                    cookie = f"{self.cookie_name}={until:.3f}; Max-Age={max_age}; Path=/; HttpOnly; SameSite=Lax"
+                    message = {**message, "headers": [*message.get("headers", []), (b"set-cookie", cookie.encode())]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_pin)
+
+
+def replica_sessionmakers(engines: List[Engine]) -> List[sessionmaker]:
+    # Sessions are tagged so the request can tell the response cache its data may lag
+    return [sessionmaker(autocommit=False, autoflush=False, bind=engine, info={"replica": True})
+            for engine in engines]
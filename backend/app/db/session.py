@@ -1,11 +1,27 @@
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 
 from backend.app.core.config import settings
+from backend.app.db.engine import async_database_uri, create_async_db_engine, create_db_engine
+from backend.app.db.routing import ReplicaRouter, replica_sessionmakers
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
+engine = create_db_engine(settings.SQLALCHEMY_DATABASE_URI)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Separate pool for GET routes, so long reads never queue behind writers for a connection
+read_engine = create_db_engine(settings.SQLALCHEMY_DATABASE_URI, read_only=True)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+replica_engines = [create_db_engine(uri, read_only=True) for uri in settings.SQLALCHEMY_REPLICA_URIS]
+# Without replicas, reads use the primary's read-only pool
+read_router = ReplicaRouter(SessionLocal, replica_sessionmakers(replica_engines) or [ReadSessionLocal])
+
+async_engine = create_async_db_engine(
+    settings.SQLALCHEMY_ASYNC_DATABASE_URI or async_database_uri(settings.SQLALCHEMY_DATABASE_URI)
+)
+# Objects stay usable after commit; lazy loads would need IO outside an await
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 def get_db():
     db = SessionLocal()
@@ -0,0 +1,27 @@
+# app/db/time_range.py
+from datetime import datetime
+from typing import Tuple
+
+from sqlalchemy import String, and_, bindparam
+from sqlalchemy.orm import Session
+
+# SQLite keeps datetimes as text, with microseconds when SQLAlchemy wrote the row and without when
+# CURRENT_TIMESTAMP did. Bounds rendered to the second compare correctly against both spellings.
+SQLITE_BOUND_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def month_bounds(year: int, month: int) -> Tuple[datetime, datetime]:
+    """[first instant of the month, first instant of the next month)."""
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+
+def in_range(db: Session, column, start: datetime, end: datetime):
+    """Half-open `start <= column < end` on the bare column, so an index on it can serve the filter."""
+    if db.get_bind().dialect.name == "sqlite":
+        return and_(
+            column >= bindparam(None, start.strftime(SQLITE_BOUND_FORMAT), type_=String),
+            column < bindparam(None, end.strftime(SQLITE_BOUND_FORMAT), type_=String),
+        )
+    return and_(column >= start, column < end)
@@ -0,0 +1,51 @@
+# app/jobs/import_rewards.py
+"""Import rewards from a CSV file with user_id, waste_type_id, points and optional created_at columns.
+
+    python -m backend.app.jobs.import_rewards rewards.csv [--batch-size 1000]
+
+Each batch is posted in a single transaction, so a failed batch leaves no partial balances behind.
+"""
+import argparse
+import csv
+import logging
+from datetime import datetime
+from itertools import islice
+
+from backend.app.crud import crud_ledger
+from backend.app.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def read_postings(path: str):
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            created_at = row.get("created_at")
+            yield crud_ledger.Posting(
+                user_id=int(row["user_id"]),
+                points=int(row["points"]),
+                waste_type_id=int(row["waste_type_id"]),
+                created_at=datetime.fromisoformat(created_at) if created_at else None,
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    postings = read_postings(args.path)
+    db = SessionLocal()
+    imported = 0
+    try:
+        while batch := list(islice(postings, args.batch_size)):
+            imported += crud_ledger.post_batch(db, batch)
+            logger.info("Imported %d rewards", imported)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
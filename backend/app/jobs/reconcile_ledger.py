@@ -0,0 +1,55 @@
+# app/jobs/reconcile_ledger.py
+"""Rebuild user ledger summaries from the reward and expense history.
+
+Run periodically (e.g. nightly from cron) with:
+
+    python -m backend.app.jobs.reconcile_ledger [--fix-balances] [user_id ...]
+"""
+import argparse
+import logging
+
+from sqlalchemy import func, select
+
+from backend.app.crud import crud_ledger
+from backend.app.db.session import SessionLocal
+from backend.app.models import User, UserLedger
+
+logger = logging.getLogger(__name__)
+
+
+def fix_balances(db, user_ids=None) -> int:
+    """Reset users.balance to rewards minus expenses wherever it disagrees with the summary."""
+    expected = func.coalesce(
+        select(UserLedger.total_rewards - UserLedger.total_expenses)
+        .where(UserLedger.user_id == User.id)
+        .scalar_subquery(),
+        0,
+    )
+    query = db.query(User).filter(func.coalesce(User.balance, 0) != expected)
+    if user_ids:
+        query = query.filter(User.id.in_(user_ids))
+    fixed = query.update({User.balance: expected}, synchronize_session=False)
+    db.commit()
+    return fixed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("user_ids", nargs="*", type=int, help="Only reconcile these users")
+    parser.add_argument("--fix-balances", action="store_true", help="Also correct drifted users.balance values")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    db = SessionLocal()
+    try:
+        user_ids = args.user_ids or None
+        drifted = crud_ledger.rebuild_summaries(db, user_ids)
+        logger.info("Rebuilt ledger summaries, %d had drifted", drifted)
+        if args.fix_balances:
+            logger.info("Corrected %d user balances", fix_balances(db, user_ids))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,83 @@
 # app/main.py
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager, suppress
+from typing import Optional
+
 from fastapi import FastAPI
+from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.cors import CORSMiddleware
 
 from backend.app.api.v1.api import api_router
 from backend.app.core.config import settings
+from backend.app.core.http_cache import CacheRule, ResponseCacheMiddleware, response_cache
+from backend.app.crud import crud_waste_collection
+from backend.app.db.query_counter import QueryBudgetMiddleware
+from backend.app.db.routing import ReadYourWritesMiddleware, replica_staleness, scope_is_pinned
+from backend.app.db.session import SessionLocal, async_engine, read_router
+from backend.app.services.email import email_worker
+from backend.app.services.response_cache_sync import invalidation_feed
+from backend.app.services.storage import close_http_client
+from backend.app.services.waste_detection import waste_detector
+
+logger = logging.getLogger(__name__)
+
+
+def _load_recycling_center_index(loaded_version: Optional[int] = None) -> int:
+    db = SessionLocal()
+    try:
+        return crud_waste_collection.refresh_recycling_center_index(db, loaded_version)
+    finally:
+        db.close()
+
+
+async def _refresh_recycling_center_index(loaded_version: Optional[int]):
+    # Picks up centers written by other processes; local writes are applied immediately.
+    # Only the version row is read while nothing changed.
+    while True:
+        await asyncio.sleep(settings.GEO_INDEX_REFRESH_SECONDS)
+        try:
+            loaded_version = await run_in_threadpool(_load_recycling_center_index, loaded_version)
+        except Exception:
+            logger.exception("Failed to refresh the recycling center index")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    refresh_task = None
+    if settings.SQLALCHEMY_REPLICA_URIS:
+        await read_router.start()
+    if settings.GEO_INDEX_ENABLED:
+        loaded_version = None
+        try:
+            loaded_version = await run_in_threadpool(_load_recycling_center_index)
+        except Exception:
+            # Lookups fall back to SQL until the next refresh succeeds
+            logger.exception("Failed to load the recycling center index")
+        refresh_task = asyncio.create_task(_refresh_recycling_center_index(loaded_version))
+    try:
+        # Load the model before the first scan rather than during it
+        await waste_detector.start()
+    except Exception:
+        logger.exception("Failed to load the waste classification model")
+    if settings.EMAIL_WORKER_ENABLED:
+        email_worker.start()
+    if settings.RESPONSE_CACHE_ENABLED and settings.REFERENCE_DATA_SHARED:
+        await invalidation_feed.start()
+    yield
+    await invalidation_feed.stop()
+    await read_router.stop()
+    if refresh_task is not None:
+        refresh_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await refresh_task
+    await waste_detector.stop()
+    await email_worker.stop()
+    await close_http_client()
+    await async_engine.dispose()
+
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -11,8 +85,34 @@ app = FastAPI(
     openapi_url=None,
     docs_url=None,
     redoc_url=None,
+    lifespan=lifespan,
 )
 
+if settings.SQLALCHEMY_REPLICA_URIS:
+    app.add_middleware(ReadYourWritesMiddleware, cookie_name=settings.READ_YOUR_WRITES_COOKIE)
+
+if settings.RESPONSE_CACHE_ENABLED:
+    # Added before CORS so cached responses still pass through it
+    app.add_middleware(
+        ResponseCacheMiddleware,
+        cache=response_cache,
+        rules=[
+            CacheRule.route(r"/api/v1/feed/", "posts", "post_types"),
+            CacheRule.route(r"/api/v1/feed/summary", "posts", "post_types"),
+            CacheRule.route(r"/api/v1/feed/user/(?P<user_id>\d+)/summary", "posts", "post_types"),
+            CacheRule.route(r"/api/v1/feed/(?P<post_id>\d+)", "post:{post_id}", "post_types"),
+            CacheRule.route(r"/api/v1/feed/user/(?P<user_id>\d+)", "posts", "post_types"),
+            CacheRule.route(r"/api/v1/products/", "products", "product_types"),
+            CacheRule.route(r"/api/v1/products/(?P<product_id>\d+)", "product:{product_id}", "product_types"),
+            CacheRule.route(r"/api/v1/waste-collection/waste-types", "waste_types"),
+            CacheRule.route(r"/api/v1/search/", "posts", "products", "post_types"),
+        ],
+        max_body_size=settings.RESPONSE_CACHE_MAX_BODY_BYTES,
+        # A client that just wrote must see its change, and a replica may not have it yet
+        bypass=scope_is_pinned,
+        staleness=replica_staleness,
+    )
+
 # Set up CORS
 app.add_middleware(
     CORSMiddleware,
@@ -20,10 +120,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+if settings.QUERY_BUDGET_PER_REQUEST is not None:
+    app.add_middleware(QueryBudgetMiddleware, budget=settings.QUERY_BUDGET_PER_REQUEST,
+                       header=settings.QUERY_COUNT_HEADER)
+
 app.include_router(api_router, prefix="/api/v1")
 
+if settings.IMAGE_STORAGE_BACKEND == "local":
+    os.makedirs(settings.LOCAL_MEDIA_DIR, exist_ok=True)
+    app.mount(settings.LOCAL_MEDIA_URL, StaticFiles(directory=settings.LOCAL_MEDIA_DIR), name="media")
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -1,12 +1,16 @@
 # /app/models/__init__.py
 from .calendar_event import CalendarEvent
+from .email_outbox import EmailOutbox
 from .expense import Expense
-from .post import Post
+from .post import Post, PostImage
 from .post_type import PostType
 from .product import Product
 from .product_type import ProductType
 from .recycling_center import RecyclingCenter
+from .reference_data_version import ReferenceDataVersion
+from .response_cache_invalidation import ResponseCacheInvalidation
 from .reward import Reward
 from .user import User, UserPhoto
+from .user_ledger import UserLedger
 from .waste_collection import WasteCollection
 from .waste_type import WasteType
@@ -0,0 +1,29 @@
+# /app/models/email_outbox.py
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+
+from backend.app.db.base import Base
+
+
+class EmailOutbox(Base):
+    """Emails waiting for the delivery worker, see services/email.py.
+
+    A worker claims due rows by stamping them with its claim_token until claimed_until, so several
+    workers can share the table and a crashed worker's rows become due again once the claim runs out.
+    """
+    __tablename__ = "email_outbox"
+    id = Column(Integer, primary_key=True)
+    to_email = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    body = Column(Text, nullable=False)
+    status = Column(String, nullable=False, default="pending")  # pending, sent or failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    claim_token = Column(String)
+    claimed_until = Column(DateTime)
+    last_error = Column(Text)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    sent_at = Column(DateTime)
+
+    __table_args__ = (Index("ix_email_outbox_status_next_attempt_at", "status", "next_attempt_at"),)
@@ -1,5 +1,5 @@
 # /app/models/expense.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, func
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, func
 from sqlalchemy.orm import relationship
 
 from backend.app.db.base import Base
@@ -14,3 +14,6 @@ class Expense(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     user = relationship("User", back_populates="expenses")
+
+    # Per-user date ranges, see crud_user.get_monthly_transactions
+    __table_args__ = (Index("ix_expenses_user_id_created_at", "user_id", "created_at"),)
@@ -1,7 +1,7 @@
 # app/models/post.py
 from datetime import datetime
 
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from backend.app.db.base import Base
@@ -21,11 +21,19 @@ class Post(Base):
     post_type = relationship("PostType")
     images = relationship("PostImage", back_populates="post")
 
+    # Keyset pagination walks these in (created_at, id) order, see crud_post.get_posts
+    __table_args__ = (
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        Index("ix_posts_author_id_created_at_id", "author_id", "created_at", "id"),
+    )
+
 
 class PostImage(Base):
     __tablename__ = "post_images"
     id = Column(Integer, primary_key=True, index=True)
     url = Column(String)
+    thumbnail_url = Column(String, nullable=True)
+    medium_url = Column(String, nullable=True)
     post_id = Column(Integer, ForeignKey("posts.id"))
 
     post = relationship("Post", back_populates="images")
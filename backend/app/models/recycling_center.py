@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Integer, String, Float, Index
 
 from backend.app.db.base import Base
 
@@ -11,3 +11,6 @@ class RecyclingCenter(Base):
     address = Column(String)
     latitude = Column(Float)
     longitude = Column(Float)
+
+    # Bounding-box prefilter for nearby lookups on databases without an R-tree
+    __table_args__ = (Index("ix_recycling_centers_latitude_longitude", "latitude", "longitude"),)
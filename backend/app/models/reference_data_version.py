@@ -0,0 +1,11 @@
+# /app/models/reference_data_version.py
+from sqlalchemy import Column, Integer, String
+
+from backend.app.db.base import Base
+
+
+class ReferenceDataVersion(Base):
+    """Bumped on every write to a cached lookup table so other workers know to reload it."""
+    __tablename__ = "reference_data_versions"
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
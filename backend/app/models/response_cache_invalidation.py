@@ -0,0 +1,21 @@
+# /app/models/response_cache_invalidation.py
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, String
+
+from backend.app.db.base import Base
+
+
+class ResponseCacheInvalidation(Base):
+    """Response cache tags invalidated by a committed write, replayed by the other workers.
+
+    See services/response_cache_sync.py; rows are only written with REFERENCE_DATA_SHARED and are pruned
+    once every worker has had time to read them.
+    """
+    __tablename__ = "response_cache_invalidations"
+    id = Column(Integer, primary_key=True)
+    tag = Column(String, nullable=False)
+    origin = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (Index("ix_response_cache_invalidations_created_at", "created_at"),)
@@ -1,5 +1,5 @@
 # /app/models/reward.py
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 
 from backend.app.db.base import Base
@@ -15,3 +15,6 @@ class Reward(Base):
 
     user = relationship("User", back_populates="rewards")
     waste_type = relationship("WasteType")
+
+    # Per-user date ranges, see crud_user.get_monthly_transactions
+    __table_args__ = (Index("ix_rewards_user_id_created_at", "user_id", "created_at"),)
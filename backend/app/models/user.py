@@ -22,6 +22,7 @@ class User(Base):
     appear_in_search_results = Column(Boolean, default=True)
     allow_data_collection = Column(Boolean, default=True)
     profile_image = Column(String)
+    profile_image_thumbnail_url = Column(String, nullable=True)
 
     posts = relationship("Post", back_populates="author")
     expenses = relationship("Expense", back_populates="user")
@@ -36,6 +37,8 @@ class UserPhoto(Base):
     __tablename__ = 'photos'
     id = Column(Integer, primary_key=True, index=True)
     url = Column(String)
+    thumbnail_url = Column(String, nullable=True)
+    medium_url = Column(String, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"))
 
     user = relationship("User", back_populates="photos")
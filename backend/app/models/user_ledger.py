@@ -0,0 +1,15 @@
+# /app/models/user_ledger.py
+from sqlalchemy import Column, Integer, ForeignKey, DateTime
+
+from backend.app.db.base import Base
+
+
+class UserLedger(Base):
+    """Running per-user totals of rewards and expenses, so balance reads don't have to scan history."""
+    __tablename__ = "user_ledgers"
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    total_rewards = Column(Integer, nullable=False, default=0)
+    total_expenses = Column(Integer, nullable=False, default=0)
+    reward_count = Column(Integer, nullable=False, default=0)
+    expense_count = Column(Integer, nullable=False, default=0)
+    last_event_at = Column(DateTime(timezone=True))
@@ -4,7 +4,7 @@ from .auth import PasswordResetRequest, SetNewPasswordRequest
 from .calendar_event import CalendarEvent, CalendarEventCreate, CalendarEventUpdate
 from .expense import Expense, ExpenseCreate, ExpenseUpdate
 from .insights import UserInsights, ExpenseInsight
-from .post import Post, PostCreate, PostUpdate, PostImage, PostImageCreate
+from .post import Post, PostCreate, PostUpdate, PostImage, PostImageCreate, PostSummary
 from .post_type import PostType, PostTypeCreate
 from .product import Product, ProductCreate, ProductUpdate
 from .product_type import ProductType, ProductTypeCreate
@@ -14,4 +14,5 @@ from .token import Token, TokenPayload
 from .user import User, UserCreate, UserUpdate, UserPhotoSchema
 from .user_balance import UserBalance
 from .user_photo import UserPhoto, UserPhotoCreate
-from .waste_collection import WasteCollection, WasteCollectionCreate
+from .waste_collection import WasteCollection, WasteCollectionCreate, RecyclingCenterCreate, RecyclingCenterUpdate, \
+    RecyclingCenter, RecyclingCenterBatchQuery, WasteCollectionBulkResult, BulkItemError, WasteDetection
@@ -18,6 +18,8 @@ class PostImageCreate(PostImageBase):
 class PostImage(PostImageBase):
     id: int
     post_id: int
+    thumbnail_url: Optional[str] = None
+    medium_url: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -40,6 +42,22 @@ class PostUpdate(BaseModel):
     images: Optional[List[PostImageCreate]] = []
 
 
+class PostSummary(BaseModel):
+    """Compact list item: a content snippet and the first image's thumbnail instead of everything.
+
+    With a sparse fieldset only the requested fields are set, and only those are serialized.
+    """
+    id: int
+    title: Optional[str] = None
+    snippet: Optional[str] = None
+    created_at: Optional[datetime] = None
+    author_id: Optional[int] = None
+    author_name: Optional[str] = None
+    post_type_id: Optional[int] = None
+    post_type_name: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+
+
 class Post(PostBase):
     id: int
     created_at: datetime
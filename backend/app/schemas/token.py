@@ -9,3 +9,5 @@ class Token(BaseModel):
 
 class TokenPayload(BaseModel):
     sub: int | None = None
+    # Absent from tokens issued before claims were added
+    is_active: bool | None = None
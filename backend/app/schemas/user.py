@@ -28,6 +28,7 @@ class User(UserBase):
     balance: float = Field(default=0.0, ge=0)
     opt_out_newspaper: bool = False
     profile_image: Optional[str] = None
+    profile_image_thumbnail_url: Optional[str] = None
 
     class Config:
         from_attributes = True
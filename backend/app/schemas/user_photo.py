@@ -1,4 +1,6 @@
 # app/schemas/user_photo.py
+from typing import Optional
+
 from pydantic import BaseModel
 
 
@@ -14,6 +16,8 @@ class UserPhoto(BaseModel):
     id: int
     url: str
     user_id: int
+    thumbnail_url: Optional[str] = None
+    medium_url: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -1,7 +1,7 @@
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, field_validator
 
 
 class WasteCollectionBase(BaseModel):
@@ -20,17 +20,66 @@ class WasteCollection(WasteCollectionBase):
     id: int
     user_id: int
 
+    @field_validator("waste_type", mode="before")
+    @classmethod
+    def waste_type_name(cls, value):
+        # The ORM object carries the WasteType relationship, the API speaks in names
+        return getattr(value, "name", value)
+
     class Config:
         from_attributes = True
 
 
+class WasteDetection(BaseModel):
+    waste_type: str
+    confidence: float
+    scores: Dict[str, float]
+
+
+class BulkItemError(BaseModel):
+    index: int
+    detail: str
+
+
+class WasteCollectionBulkResult(BaseModel):
+    received: int = 0
+    created: int = 0
+    reward_points: int = 0
+    errors: List[BulkItemError] = []
+
+
+class RecyclingCenterCreate(BaseModel):
+    name: str
+    address: str
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+
+
+class RecyclingCenterUpdate(BaseModel):
+    name: Optional[str] = None
+    address: Optional[str] = None
+    latitude: Optional[float] = Field(None, ge=-90, le=90)
+    longitude: Optional[float] = Field(None, ge=-180, le=180)
+
+
+class GeoPoint(BaseModel):
+    latitude: float = Field(..., ge=-90, le=90)
+    longitude: float = Field(..., ge=-180, le=180)
+
+
+class RecyclingCenterBatchQuery(BaseModel):
+    points: List[GeoPoint] = Field(..., max_length=1000)
+    radius: float = Field(10.0, gt=0, le=500)
+    limit: int = Field(10, ge=1, le=100)
+
+
 class RecyclingCenter(BaseModel):
     id: int
     name: str
     address: str
-    latitude: float
-    longitude: float
-    distance: Optional[float]
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    distance: Optional[float] = None
 
     class Config:
         from_attributes = True
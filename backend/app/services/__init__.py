@@ -1,3 +1,5 @@
 # /app/services/__init__.py
-from .waste_detection import detect_waste_type
-from .email import send_reset_password_email
+from .waste_detection import classify_waste, detect_waste_type
+from .email import queue_reset_password_email
+from .storage import upload_image
+from .images import StoredImage, upload_image_with_variants, upload_images_with_variants
@@ -0,0 +1,93 @@
+# /app/services/batch_detection.py
+import asyncio
+import logging
+import zipfile
+from typing import AsyncIterator, Awaitable, Callable, List, NamedTuple
+
+import orjson
+from fastapi import HTTPException
+from starlette.datastructures import UploadFile
+
+from backend.app.core.config import settings
+from backend.app.services.waste_detection import detect_waste_type
+
+logger = logging.getLogger(__name__)
+
+
+class ImageSource(NamedTuple):
+    name: str
+    read: Callable[[], Awaitable[bytes]]
+
+
+def _too_large() -> HTTPException:
+    return HTTPException(status_code=413,
+                         detail=f"Images are limited to {settings.WASTE_DETECTION_BATCH_MAX_IMAGE_BYTES} bytes")
+
+
+def _check_count(count: int):
+    if count > settings.WASTE_DETECTION_BATCH_MAX_IMAGES:
+        raise HTTPException(status_code=413,
+                            detail=f"At most {settings.WASTE_DETECTION_BATCH_MAX_IMAGES} images per batch")
+
+
+def upload_sources(uploads: List[UploadFile]) -> List[ImageSource]:
+    """One source per file of a multipart upload."""
+    _check_count(len(uploads))
+
+    async def read_upload(upload: UploadFile) -> bytes:
+        if upload.size is not None and upload.size > settings.WASTE_DETECTION_BATCH_MAX_IMAGE_BYTES:
+            raise _too_large()
+        return await upload.read()
+
+    return [ImageSource(upload.filename or "", lambda upload=upload: read_upload(upload)) for upload in uploads]
+
+
+def archive_sources(archive: zipfile.ZipFile) -> List[ImageSource]:
+    """One source per file in a zip archive, skipping directories and macOS/hidden entries."""
+    members = [member for member in archive.infolist()
+               if not member.is_dir() and not any(part.startswith((".", "__MACOSX")) for part in
+                                                  member.filename.split("/"))]
+    _check_count(len(members))
+
+    def read_member(member: zipfile.ZipInfo) -> bytes:
+        # The declared size can lie, so the read itself is capped too
+        limit = settings.WASTE_DETECTION_BATCH_MAX_IMAGE_BYTES
+        if member.file_size > limit:
+            raise _too_large()
+        with archive.open(member) as file:
+            data = file.read(limit + 1)
+        if len(data) > limit:
+            raise _too_large()
+        return data
+
+    return [ImageSource(member.filename, lambda member=member: asyncio.to_thread(read_member, member))
+            for member in members]
+
+
+async def detect_batch(sources: List[ImageSource], concurrency: int) -> AsyncIterator[bytes]:
+    """Classify images with at most `concurrency` in flight, yielding an NDJSON line per image as it finishes.
+
+    Lines carry the image's index and name, and either `waste_type` or `error`; one bad image doesn't fail
+    the others. Work still pending is cancelled if the client goes away.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def detect(index: int, source: ImageSource) -> dict:
+        result = {"index": index, "name": source.name}
+        async with semaphore:
+            try:
+                result["waste_type"] = await detect_waste_type(await source.read())
+            except HTTPException as e:
+                result["error"] = e.detail
+            except Exception:
+                logger.exception("Waste detection failed for %s", source.name)
+                result["error"] = "Detection failed"
+        return result
+
+    tasks = [asyncio.ensure_future(detect(index, source)) for index, source in enumerate(sources)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield orjson.dumps(await finished) + b"\n"
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,226 @@
+# /app/services/detection_cache.py
+import asyncio
+import hashlib
+import io
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional, Set
+
+import orjson
+from PIL import Image, ImageOps
+
+from backend.app.core.config import settings
+from backend.app.services.waste_detection import Prediction
+
+HASH_SIZE = 8  # dHash over an 8x8 gradient grid: 64 bits
+HASH_BITS = HASH_SIZE * HASH_SIZE
+
+
+def dhash(image_data: bytes) -> int:
+    """Difference hash: one bit per horizontally adjacent pixel pair of a 9x8 grayscale thumbnail."""
+    with Image.open(io.BytesIO(image_data)) as image:
+        # JPEGs can be decoded straight at a fraction of their size, which is most of the cost saved
+        image.draft("L", (HASH_SIZE * 8, HASH_SIZE * 8))
+        small = ImageOps.exif_transpose(image).convert("L").resize((HASH_SIZE + 1, HASH_SIZE),
+                                                                   Image.Resampling.BILINEAR)
+    pixels = small.tobytes()
+    bits = 0
+    for row in range(HASH_SIZE):
+        offset = row * (HASH_SIZE + 1)
+        for col in range(HASH_SIZE):
+            bits = bits << 1 | (pixels[offset + col] < pixels[offset + col + 1])
+    return bits
+
+
+class _Entry(NamedTuple):
+    expires_at: float
+    perceptual_hash: Optional[int]
+    prediction: Prediction
+
+
+class _MemoryTier:
+    """LRU of predictions by content digest, with a multi-index over the perceptual hashes.
+
+    The 64 hash bits are split into max_distance + 1 bands; two hashes within max_distance bits of each
+    other must agree exactly on at least one band, so candidates come from dict lookups, not a scan.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, max_distance: Optional[int]):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_distance = max_distance
+        bands = (max_distance or 0) + 1
+        widths = [HASH_BITS // bands + (i < HASH_BITS % bands) for i in range(bands)]
+        self._bands = [(sum(widths[:i]), (1 << width) - 1) for i, width in enumerate(widths)]
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._index: List[Dict[int, Set[str]]] = [{} for _ in self._bands]
+        self._lock = threading.Lock()
+
+    def _band_values(self, perceptual_hash: int):
+        return [(perceptual_hash >> shift) & mask for shift, mask in self._bands]
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None or entry.perceptual_hash is None:
+            return
+        for band, value in zip(self._index, self._band_values(entry.perceptual_hash)):
+            keys = band.get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del band[value]
+
+    def get(self, key: str) -> Optional[Prediction]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry.prediction
+
+    def similar(self, perceptual_hash: int) -> Optional[Prediction]:
+        if self.max_distance is None:
+            return None
+        with self._lock:
+            candidates = set()
+            for band, value in zip(self._index, self._band_values(perceptual_hash)):
+                candidates.update(band.get(value, ()))
+            best = None
+            now = time.monotonic()
+            for key in candidates:
+                entry = self._entries[key]
+                distance = (entry.perceptual_hash ^ perceptual_hash).bit_count()
+                if distance <= self.max_distance and entry.expires_at >= now and (best is None or distance < best[0]):
+                    best = (distance, key)
+            if best is None:
+                return None
+            self._entries.move_to_end(best[1])
+            return self._entries[best[1]].prediction
+
+    def set(self, key: str, perceptual_hash: Optional[int], prediction: Prediction):
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = _Entry(time.monotonic() + self.ttl, perceptual_hash, prediction)
+            if perceptual_hash is not None and self.max_distance is not None:
+                for band, value in zip(self._index, self._band_values(perceptual_hash)):
+                    band.setdefault(value, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            for band in self._index:
+                band.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _DiskTier:
+    """SQLite file of exact-match predictions that survives restarts and is shared by local workers."""
+
+    def __init__(self, path: str, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS detections "
+                         "(key TEXT PRIMARY KEY, prediction BLOB NOT NULL, stored_at REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS ix_detections_stored_at ON detections (stored_at)")
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[Prediction]:
+        with self._lock:
+            row = self._db.execute("SELECT prediction FROM detections WHERE key = ? AND stored_at >= ?",
+                                   (key, time.time() - self.ttl)).fetchone()
+        return Prediction(**orjson.loads(row[0])) if row else None
+
+    def set(self, key: str, prediction: Prediction):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO detections VALUES (?, ?, ?)",
+                             (key, orjson.dumps(prediction._asdict()), time.time()))
+            self._writes += 1
+            if self._writes % 256 == 0:
+                # Trim now and then rather than on every write
+                self._db.execute("DELETE FROM detections WHERE stored_at < ? OR key NOT IN "
+                                 "(SELECT key FROM detections ORDER BY stored_at DESC LIMIT ?)",
+                                 (time.time() - self.ttl, self.maxsize))
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM detections")
+
+
+def _model_key() -> str:
+    # Predictions are only reusable while the same model answers
+    return f"{settings.WASTE_MODEL_BACKEND}:{settings.WASTE_MODEL_PATH or ''}:{','.join(settings.WASTE_MODEL_LABELS)}"
+
+
+class DetectionCache:
+    """Exact (SHA-256) and near-duplicate (dHash) cache of classification results.
+
+    `stats` counts exact, similar and disk hits and misses since startup.
+    """
+
+    def __init__(self, maxsize: int, ttl: float, max_distance: Optional[int], disk_path: Optional[str] = None,
+                 disk_maxsize: int = 100_000):
+        self.memory = _MemoryTier(maxsize, ttl, max_distance)
+        self.disk = _DiskTier(disk_path, disk_maxsize, ttl) if disk_path else None
+        self.stats: Counter = Counter()
+
+    async def get_or_compute(self, image_data: bytes,
+                             compute: Callable[[bytes], Awaitable[Prediction]]) -> Prediction:
+        key = f"{_model_key()}:{hashlib.sha256(image_data).hexdigest()}"
+        prediction = self.memory.get(key)
+        if prediction is not None:
+            self.stats["exact_hits"] += 1
+            return prediction
+
+        perceptual_hash = None
+        if self.memory.max_distance is not None:
+            try:
+                perceptual_hash = await asyncio.to_thread(dhash, image_data)
+            except Exception:
+                # Not an image PIL can read; the model path reports that properly
+                perceptual_hash = None
+        if perceptual_hash is not None:
+            prediction = self.memory.similar(perceptual_hash)
+            if prediction is not None:
+                self.stats["similar_hits"] += 1
+                self.memory.set(key, perceptual_hash, prediction)
+                return prediction
+
+        if self.disk is not None:
+            prediction = await asyncio.to_thread(self.disk.get, key)
+            if prediction is not None:
+                self.stats["disk_hits"] += 1
+                self.memory.set(key, perceptual_hash, prediction)
+                return prediction
+
+        self.stats["misses"] += 1
+        prediction = await compute(image_data)
+        self.memory.set(key, perceptual_hash, prediction)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, prediction)
+        return prediction
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+
+detection_cache = DetectionCache(
+    maxsize=settings.DETECTION_CACHE_MAX_ENTRIES,
+    ttl=settings.DETECTION_CACHE_TTL_SECONDS,
+    max_distance=settings.DETECTION_CACHE_MAX_DISTANCE,
+    disk_path=settings.DETECTION_CACHE_DISK_PATH,
+    disk_maxsize=settings.DETECTION_CACHE_DISK_MAX_ENTRIES,
+)
@@ -1,27 +1,220 @@
+# /app/services/email.py
+"""Outgoing email.
+
+Messages are written to the email_outbox table and delivered by `email_worker`, which runs in the app's
+event loop, sends in batches over a pool of authenticated SMTP connections and retries with backoff. To try
+it locally against a stand-in server (no TLS, no auth):
+
+    python -m aiosmtpd -n -l localhost:1025
+    SMTP_HOST=localhost SMTP_PORT=1025 SMTP_STARTTLS=false SMTP_USER= uvicorn backend.app.main:app
+"""
+import asyncio
+import logging
 import smtplib
+import threading
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from backend.app.core.config import settings
+from backend.app.crud import crud_email_outbox
+from backend.app.db.session import SessionLocal
+from backend.app.models import EmailOutbox
 
+logger = logging.getLogger(__name__)
 
-def send_email(to_email: str, subject: str, body: str):
+
+def _build_message(to_email: str, subject: str, body: str) -> MIMEMultipart:
     msg = MIMEMultipart()
     msg['From'] = f"{settings.EMAILS_FROM_NAME} <{settings.EMAILS_FROM_EMAIL}>"
     msg['To'] = to_email
     msg['Subject'] = subject
     msg.attach(MIMEText(body, 'html'))
+    return msg
+
+
+def _is_permanent(error: Exception) -> bool:
+    """5xx answers about the message or its recipients won't change on retry; anything else might."""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in error.recipients.values())
+    return isinstance(error, (smtplib.SMTPSenderRefused, smtplib.SMTPDataError)) and error.smtp_code >= 500
+
+
+class SMTPPool:
+    """Up to `size` SMTP connections, each opened, upgraded with STARTTLS and logged in once, then reused."""
+
+    def __init__(self, size: int):
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: List[smtplib.SMTP] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        server = smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT, timeout=settings.SMTP_TIMEOUT_SECONDS)
+        try:
+            if settings.SMTP_STARTTLS:
+                server.starttls()
+            if settings.SMTP_USER:
+                server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+        except BaseException:
+            server.close()
+            raise
+        return server
+
+    @staticmethod
+    def _discard(server: smtplib.SMTP):
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+
+    def send(self, messages: List[MIMEMultipart]) -> List[Optional[Exception]]:
+        """Send over one connection, blocking; returns the error for each message, None when it was sent.
+
+        A connection that drops, e.g. one the server closed while it sat idle, is replaced and the
+        message tried once more.
+        """
+        errors: List[Optional[Exception]] = []
+        with self._slots:
+            with self._lock:
+                server = self._idle.pop() if self._idle else None
+            try:
+                for message in messages:
+                    error = None
+                    for _ in range(2):
+                        try:
+                            if server is None:
+                                server = self._connect()
+                            server.send_message(message)
+                            error = None
+                            break
+                        except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as e:
+                            # The server answered; the connection is still good
+                            error = e
+                            break
+                        except OSError as e:
+                            if server is not None:
+                                server.close()
+                            server, error = None, e
+                    errors.append(error)
+            finally:
+                if server is not None:
+                    with self._lock:
+                        self._idle.append(server)
+        return errors
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for server in idle:
+            self._discard(server)
+
+
+smtp_pool = SMTPPool(settings.EMAIL_SMTP_POOL_SIZE)
+
+
+def _claim_due() -> List[EmailOutbox]:
+    db = SessionLocal()
+    try:
+        return crud_email_outbox.claim_due(db, settings.EMAIL_BATCH_SIZE, settings.EMAIL_CLAIM_SECONDS)
+    finally:
+        db.close()
+
 
+def _record(messages: List[EmailOutbox], errors: List[Optional[Exception]]):
+    db = SessionLocal()
     try:
-        with smtplib.SMTP(settings.SMTP_HOST, settings.SMTP_PORT) as server:
-            server.starttls()
-            server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-            server.send_message(msg)
-    except Exception as e:
-        raise Exception(f"Failed to send email: {str(e)}")
+        crud_email_outbox.mark_sent(db, [message.id for message, error in zip(messages, errors) if error is None])
+        for message, error in zip(messages, errors):
+            if error is not None:
+                logger.warning("Email %d to %s failed (attempt %d): %s", message.id, message.to_email,
+                               message.attempts + 1, error)
+                crud_email_outbox.mark_failed(db, message, str(error), permanent=_is_permanent(error))
+    finally:
+        db.close()
+
+
+class EmailWorker:
+    """Delivers the outbox from the event loop that started it.
+
+    Wakes up when this process queues an email, and every EMAIL_POLL_SECONDS for retries that came due
+    and mail queued by other processes.
+    """
+
+    def __init__(self, pool: SMTPPool):
+        self.pool = pool
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = self._loop = self._wakeup = None
+        await asyncio.to_thread(self.pool.close)
+
+    def notify(self):
+        """Safe to call from any thread."""
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None:
+            loop.call_soon_threadsafe(wakeup.set)
+
+    async def deliver_due(self) -> int:
+        """Send one batch of due messages, spread over the pooled connections; returns how many were claimed."""
+        messages = await run_in_threadpool(_claim_due)
+        if not messages:
+            return 0
+        size = settings.EMAIL_SMTP_POOL_SIZE
+        chunks = [messages[i::size] for i in range(min(size, len(messages)))]
+        results = await asyncio.gather(*(
+            asyncio.to_thread(self.pool.send, [_build_message(m.to_email, m.subject, m.body) for m in chunk])
+            for chunk in chunks
+        ))
+        ordered = [message for chunk in chunks for message in chunk]
+        await run_in_threadpool(_record, ordered, [error for errors in results for error in errors])
+        return len(messages)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                delivered = await self.deliver_due()
+            except Exception:
+                logger.exception("Email delivery failed")
+                delivered = 0
+            if delivered < settings.EMAIL_BATCH_SIZE:
+                # Caught up: wait for new mail or the next poll
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), settings.EMAIL_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+
+
+email_worker = EmailWorker(smtp_pool)
+
+
+def send_email(to_email: str, subject: str, body: str):
+    """Send right away over the pool, blocking, for callers that need to know it went out."""
+    error = smtp_pool.send([_build_message(to_email, subject, body)])[0]
+    if error is not None:
+        raise Exception(f"Failed to send email: {str(error)}")
+
+
+def queue_email(db: Session, to_email: str, subject: str, body: str) -> EmailOutbox:
+    message = crud_email_outbox.enqueue(db, to_email, subject, body)
+    email_worker.notify()
+    return message
 
 
-def send_reset_password_email(email: str, token: str):
+def queue_reset_password_email(db: Session, email: str, token: str) -> EmailOutbox:
     reset_link = f"http://yourdomain.com/reset-password?token={token}"
     subject = "Password Reset Request"
     body = f"""
@@ -34,4 +227,4 @@ def send_reset_password_email(email: str, token: str):
         </body>
     </html>
     """
-    send_email(email, subject, body)
+    return queue_email(db, email, subject, body)
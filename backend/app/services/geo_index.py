@@ -0,0 +1,184 @@
+# /app/services/geo_index.py
+import heapq
+import math
+import threading
+from array import array
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from backend.app.core.config import settings
+from backend.app.core.geo import EARTH_RADIUS_KM, haversine_km
+
+# Segments this small are scanned linearly instead of being split further
+LEAF_SIZE = 16
+
+# (id, name, address, latitude, longitude)
+CenterRecord = Tuple[int, str, str, float, float]
+
+
+def _unit_vector(latitude: float, longitude: float) -> Tuple[float, float, float]:
+    phi, lam = math.radians(latitude), math.radians(longitude)
+    return math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi)
+
+
+def _max_chord_squared(radius_km: Optional[float]) -> float:
+    # Points on the unit sphere are ordered the same by chord length as by great-circle distance,
+    # so searching in 3D avoids any special casing of the poles or the antimeridian
+    if radius_km is None:
+        return 4.0
+    return (2 * math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi) / 2)) ** 2
+
+
+class _KDTree:
+    """Immutable KD-tree over unit vectors, stored as parallel arrays permuted into median-split order."""
+
+    def __init__(self, records: List[CenterRecord]):
+        points = [_unit_vector(record[3], record[4]) for record in records]
+        order = list(range(len(records)))
+        self.axis = array("b", bytes(len(records)))
+        self._build(order, points, 0, len(order))
+
+        self.records = [records[i] for i in order]
+        self.coords = tuple(array("d", (points[i][axis] for i in order)) for axis in range(3))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _build(self, order: List[int], points: List[Tuple[float, float, float]], lo: int, hi: int):
+        if hi - lo <= LEAF_SIZE:
+            return
+        segment = order[lo:hi]
+        spreads = [max(points[i][a] for i in segment) - min(points[i][a] for i in segment) for a in range(3)]
+        axis = spreads.index(max(spreads))
+        segment.sort(key=lambda i: points[i][axis])
+        order[lo:hi] = segment
+        mid = (lo + hi) // 2
+        self.axis[mid] = axis
+        self._build(order, points, lo, mid)
+        self._build(order, points, mid + 1, hi)
+
+    def nearest(self, query: Tuple[float, float, float], k: int, max_d2: float) -> List[Tuple[float, int]]:
+        """Up to k (squared chord, position) pairs within max_d2, closest first."""
+        qx, qy, qz = query
+        xs, ys, zs = self.coords
+        heap: List[Tuple[float, int]] = []  # max-heap via negated distances
+
+        def consider(pos: int):
+            d2 = (xs[pos] - qx) ** 2 + (ys[pos] - qy) ** 2 + (zs[pos] - qz) ** 2
+            if d2 > max_d2:
+                return
+            if len(heap) < k:
+                heapq.heappush(heap, (-d2, pos))
+            elif d2 < -heap[0][0]:
+                heapq.heapreplace(heap, (-d2, pos))
+
+        def visit(lo: int, hi: int):
+            if hi - lo <= LEAF_SIZE:
+                for pos in range(lo, hi):
+                    consider(pos)
+                return
+            mid = (lo + hi) // 2
+            consider(mid)
+            diff = query[self.axis[mid]] - self.coords[self.axis[mid]][mid]
+            near, far = ((lo, mid), (mid + 1, hi)) if diff < 0 else ((mid + 1, hi), (lo, mid))
+            visit(*near)
+            bound = max_d2 if len(heap) < k else min(max_d2, -heap[0][0])
+            if diff * diff <= bound:
+                visit(*far)
+
+        if k > 0:
+            visit(0, len(self.records))
+        return sorted((-neg_d2, pos) for neg_d2, pos in heap)
+
+
+class _Snapshot(NamedTuple):
+    tree: _KDTree
+    # Centers written since the tree was built, keyed by id with the sequence number of the write.
+    # Their entries in the tree (if any) are superseded and skipped; a None record marks a removal.
+    pending: Dict[int, Tuple[int, Optional[CenterRecord]]]
+
+
+class RecyclingCenterIndex:
+    """Nearest-k / radius lookups served from memory.
+
+    Readers grab the current snapshot without locking; writers build a new one and swap it in.
+    Upserts and removals go to a small overlay that is scanned linearly and folded into a fresh tree
+    once it outgrows `rebuild_threshold`.
+    """
+
+    def __init__(self, rebuild_threshold: int = 1024):
+        self.rebuild_threshold = rebuild_threshold
+        self._snapshot: Optional[_Snapshot] = None
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self._snapshot is not None
+
+    def load(self, fetch_records: Callable[[], Iterable[CenterRecord]]):
+        with self._lock:
+            since = self._sequence
+        tree = _KDTree(list(fetch_records()))
+        with self._lock:
+            # Keep upserts that landed while the rows were being read, the query may have missed them
+            pending = {}
+            if self._snapshot is not None:
+                pending = {id_: entry for id_, entry in self._snapshot.pending.items() if entry[0] > since}
+            self._snapshot = _Snapshot(tree, pending)
+
+    def upsert(self, record: CenterRecord):
+        self._write(record[0], record)
+
+    def remove(self, id_: int):
+        """Drop a center, e.g. one that was deleted or lost its coordinates."""
+        self._write(id_, None)
+
+    def _write(self, id_: int, record: Optional[CenterRecord]):
+        with self._lock:
+            if self._snapshot is None:
+                return
+            self._sequence += 1
+            pending = {**self._snapshot.pending, id_: (self._sequence, record)}
+            tree = self._snapshot.tree
+            if len(pending) > self.rebuild_threshold:
+                records = [r for r in tree.records if r[0] not in pending]
+                records.extend(entry[1] for entry in pending.values() if entry[1] is not None)
+                tree, pending = _KDTree(records), {}
+            self._snapshot = _Snapshot(tree, pending)
+
+    def nearest(self, latitude: float, longitude: float, limit: int = 10,
+                radius: Optional[float] = None) -> List[dict]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise RuntimeError("Recycling center index is not loaded")
+        query = _unit_vector(latitude, longitude)
+        max_d2 = _max_chord_squared(radius)
+
+        # Over-fetch by the overlay size so superseded tree entries can't crowd out real hits
+        hits = [
+            (d2, snapshot.tree.records[pos])
+            for d2, pos in snapshot.tree.nearest(query, limit + len(snapshot.pending), max_d2)
+            if snapshot.tree.records[pos][0] not in snapshot.pending
+        ]
+        for _, record in snapshot.pending.values():
+            if record is None:
+                continue
+            x, y, z = _unit_vector(record[3], record[4])
+            d2 = (x - query[0]) ** 2 + (y - query[1]) ** 2 + (z - query[2]) ** 2
+            if d2 <= max_d2:
+                hits.append((d2, record))
+
+        return [
+            {
+                "id": id_,
+                "name": name,
+                "address": address,
+                "latitude": float(lat),
+                "longitude": float(lon),
+                "distance": haversine_km(latitude, longitude, lat, lon),
+            }
+            for _, (id_, name, address, lat, lon) in heapq.nsmallest(limit, hits, key=lambda hit: hit[0])
+        ]
+
+
+recycling_center_index = RecyclingCenterIndex(rebuild_threshold=settings.GEO_INDEX_REBUILD_THRESHOLD)
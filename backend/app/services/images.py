@@ -0,0 +1,96 @@
+# /app/services/images.py
+import asyncio
+import io
+from dataclasses import dataclass
+from typing import BinaryIO, List, NamedTuple, Optional, Union
+
+from fastapi import HTTPException
+from PIL import Image, ImageOps, UnidentifiedImageError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+
+from backend.app.core.config import settings
+from backend.app.services.storage import upload_image
+
+
+@dataclass
+class StoredImage:
+    url: str
+    thumbnail_url: str
+    medium_url: str
+
+
+# Formats the full-size copy keeps; anything else is stored in IMAGE_VARIANT_FORMAT
+ORIGINAL_FORMATS = ("JPEG", "PNG", "WEBP")
+ORIGINAL_QUALITY = 95
+
+
+def _encode(image: Image.Image, fmt: Optional[str] = None, quality: Optional[int] = None,
+            icc_profile: Optional[bytes] = None) -> bytes:
+    fmt = fmt or settings.IMAGE_VARIANT_FORMAT.upper()
+    if fmt == "JPEG" and image.mode != "RGB":
+        image = image.convert("RGB")
+    buffer = io.BytesIO()
+    # No exif/xmp arguments are passed, so none of the source metadata (GPS included) survives
+    image.save(buffer, format=fmt, quality=quality or settings.IMAGE_VARIANT_QUALITY, icc_profile=icc_profile)
+    return buffer.getvalue()
+
+
+class Renditions(NamedTuple):
+    original: bytes
+    original_format: str
+    thumbnail: bytes
+    medium: bytes
+
+
+def render_variants(fileobj: BinaryIO) -> Renditions:
+    """Re-encode the upload without its metadata, plus a square thumbnail for grids and a bounded copy
+    for detail views."""
+    fileobj.seek(0)
+    with Image.open(fileobj) as source:
+        original_format = source.format if source.format in ORIGINAL_FORMATS else settings.IMAGE_VARIANT_FORMAT.upper()
+        # The color profile is kept on the full-size copy; it describes the pixels, not the photographer
+        icc_profile = source.info.get("icc_profile")
+        # Bake the EXIF orientation into the pixels before the metadata is dropped
+        image = ImageOps.exif_transpose(source)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        original = _encode(image, original_format, ORIGINAL_QUALITY, icc_profile)
+
+        size = settings.IMAGE_THUMBNAIL_SIZE
+        thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+
+        medium = image.copy()
+        medium.thumbnail((settings.IMAGE_MEDIUM_SIZE, settings.IMAGE_MEDIUM_SIZE), Image.Resampling.LANCZOS)
+    fileobj.seek(0)
+    return Renditions(original, original_format.lower(), _encode(thumbnail), _encode(medium))
+
+
+async def upload_image_with_variants(file: Union[UploadFile, BinaryIO]) -> StoredImage:
+    fileobj = file.file if isinstance(file, UploadFile) else file
+    try:
+        renditions = await run_in_threadpool(render_variants, fileobj)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        raise HTTPException(status_code=400, detail="Uploaded file is not a valid image")
+
+    # The upload itself is never published: its EXIF can carry the GPS position of the user's home
+    original_extension = renditions.original_format
+    extension = settings.IMAGE_VARIANT_FORMAT.lower()
+    content_type = f"image/{extension}"
+    url, thumbnail_url, medium_url = await asyncio.gather(
+        upload_image(io.BytesIO(renditions.original), f"original.{original_extension}",
+                     f"image/{original_extension}"),
+        upload_image(io.BytesIO(renditions.thumbnail), f"thumbnail.{extension}", content_type),
+        upload_image(io.BytesIO(renditions.medium), f"medium.{extension}", content_type),
+    )
+    return StoredImage(url=url, thumbnail_url=thumbnail_url, medium_url=medium_url)
+
+
+async def upload_images_with_variants(files: List[Union[UploadFile, BinaryIO]]) -> List[StoredImage]:
+    semaphore = asyncio.Semaphore(settings.UPLOAD_CONCURRENCY)
+
+    async def bounded(file):
+        async with semaphore:
+            return await upload_image_with_variants(file)
+
+    return list(await asyncio.gather(*(bounded(file) for file in files)))
@@ -0,0 +1,181 @@
+# /app/services/reference_data.py
+import threading
+import time
+from typing import Dict, Generic, Iterable, List, NamedTuple, Optional, Type, TypeVar
+
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from backend.app.core.config import settings
+from backend.app.models import WasteType, PostType, ProductType, ReferenceDataVersion
+from backend.app.services.response_cache_sync import invalidate_on_commit
+
+
+class WasteTypeEntry(NamedTuple):
+    id: int
+    name: str
+    reward_points: Optional[int]
+
+
+class TypeEntry(NamedTuple):
+    id: int
+    name: str
+
+
+E = TypeVar("E", WasteTypeEntry, TypeEntry)
+
+
+class Lookup(Generic[E]):
+    """Immutable id/name index over one reference table."""
+
+    def __init__(self, entries: Iterable[E]):
+        self.entries: List[E] = list(entries)
+        self._by_id: Dict[int, E] = {entry.id: entry for entry in self.entries}
+        self._by_name: Dict[str, E] = {entry.name: entry for entry in self.entries}
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def get(self, id_: Optional[int]) -> Optional[E]:
+        return self._by_id.get(id_)
+
+    def by_name(self, name: str) -> Optional[E]:
+        return self._by_name.get(name)
+
+    def name_of(self, id_: Optional[int], default: Optional[str] = None) -> Optional[str]:
+        entry = self._by_id.get(id_)
+        return entry.name if entry else default
+
+
+_MODELS = {
+    WasteType.__tablename__: WasteType,
+    PostType.__tablename__: PostType,
+    ProductType.__tablename__: ProductType,
+}
+
+
+class ReferenceData:
+    """Process-wide cache of the small lookup tables.
+
+    Every committed ORM write to one of them drops the local copy. With REFERENCE_DATA_SHARED the write
+    also bumps a row in reference_data_versions, and other workers compare against it at most every
+    REFERENCE_DATA_CHECK_SECONDS, so all processes converge without a message bus.
+    """
+
+    def __init__(self):
+        self._lookups: Dict[str, Lookup] = {}
+        self._versions: Dict[str, int] = {}
+        self._checked_at = 0.0
+        # Bumped by every invalidation, so a load that raced one is not stored
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _shared_versions(self, db: Session) -> Dict[str, int]:
+        return dict(db.execute(select(ReferenceDataVersion.name, ReferenceDataVersion.version)).all())
+
+    def _sync(self, db: Session):
+        if not settings.REFERENCE_DATA_SHARED:
+            return
+        now = time.monotonic()
+        if now - self._checked_at < settings.REFERENCE_DATA_CHECK_SECONDS:
+            return
+        versions = self._shared_versions(db)
+        with self._lock:
+            self._checked_at = now
+            for name, version in versions.items():
+                if self._versions.get(name) != version:
+                    self._lookups.pop(name, None)
+                    self._versions[name] = version
+                    self._generation += 1
+
+    def _get(self, db: Session, model: Type, load) -> Lookup:
+        self._sync(db)
+        name = model.__tablename__
+        with self._lock:
+            lookup = self._lookups.get(name)
+            generation = self._generation
+        if lookup is None:
+            # Loaded outside the lock; an invalidation meanwhile means the rows may predate it
+            lookup = Lookup(load(db))
+            with self._lock:
+                if self._generation == generation:
+                    self._lookups[name] = lookup
+        return lookup
+
+    def waste_types(self, db: Session) -> Lookup[WasteTypeEntry]:
+        return self._get(db, WasteType, lambda s: (
+            WasteTypeEntry(*row) for row in s.execute(
+                select(WasteType.id, WasteType.name, WasteType.reward_points).order_by(WasteType.id))
+        ))
+
+    def post_types(self, db: Session) -> Lookup[TypeEntry]:
+        return self._get(db, PostType, lambda s: (
+            TypeEntry(*row) for row in s.execute(select(PostType.id, PostType.name).order_by(PostType.id))
+        ))
+
+    def product_types(self, db: Session) -> Lookup[TypeEntry]:
+        return self._get(db, ProductType, lambda s: (
+            TypeEntry(*row) for row in s.execute(select(ProductType.id, ProductType.name).order_by(ProductType.id))
+        ))
+
+    def invalidate(self, *names: str):
+        with self._lock:
+            self._generation += 1
+            for name in names or list(self._lookups):
+                self._lookups.pop(name, None)
+
+
+reference_data = ReferenceData()
+
+
+def attach_types(objects: Iterable, relationship: str, foreign_key: str, lookup: Lookup, model: Type):
+    """Fill a many-to-one type relationship from the cache so listings don't have to join it.
+
+    Each object gets its own detached instance; results are meant to be serialized, not modified.
+    """
+    for obj in objects:
+        entry = lookup.get(getattr(obj, foreign_key))
+        instance = None
+        if entry is not None:
+            instance = model(**entry._asdict())
+            make_transient_to_detached(instance)
+        set_committed_value(obj, relationship, instance)
+
+
+def _changed_tables(session: Session) -> set:
+    return {
+        obj.__tablename__
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if type(obj) in _MODELS.values()
+    }
+
+
+@event.listens_for(Session, "before_flush")
+def _stamp_reference_changes(session: Session, flush_context, instances):
+    changed = _changed_tables(session) - session.info.get("reference_data_changed", set())
+    if not changed:
+        return
+    session.info.setdefault("reference_data_changed", set()).update(changed)
+    # Rendered responses are tagged with the table names of the types they embed
+    invalidate_on_commit(session, *changed)
+    if settings.REFERENCE_DATA_SHARED:
+        for name in changed:
+            bumped = session.execute(
+                update(ReferenceDataVersion).where(ReferenceDataVersion.name == name)
+                .values(version=ReferenceDataVersion.version + 1)
+            ).rowcount
+            if not bumped:
+                session.add(ReferenceDataVersion(name=name, version=1))
+
+
+@event.listens_for(Session, "after_commit")
+def _drop_committed_reference_data(session: Session):
+    changed = session.info.pop("reference_data_changed", None)
+    if changed:
+        reference_data.invalidate(*changed)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_reference_changes(session: Session, previous_transaction):
+    session.info.pop("reference_data_changed", None)
@@ -0,0 +1,119 @@
+# /app/services/response_cache_sync.py
+"""Invalidation of cached responses across workers.
+
+Write paths call `invalidate_on_commit(db, *tags)` before committing. Once the transaction commits the tags
+are dropped from this process's response cache. With REFERENCE_DATA_SHARED they are also written to
+response_cache_invalidations in the same transaction, and `invalidation_feed` replays the other workers'
+rows every REFERENCE_DATA_CHECK_SECONDS, so a write in one worker reaches all of them within that delay.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional, Set
+
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from backend.app.core.config import settings
+from backend.app.core.http_cache import ResponseCache, response_cache
+from backend.app.db.session import SessionLocal
+from backend.app.models import ResponseCacheInvalidation
+
+logger = logging.getLogger(__name__)
+
+# Identifies this process's rows, which the feed skips: they were applied when they committed
+ORIGIN = uuid.uuid4().hex
+# Rows are re-read for this long, as ids can commit out of order and worker clocks drift a little
+LOOKBACK = timedelta(seconds=60)
+RETENTION = timedelta(minutes=10)
+
+
+def invalidate_on_commit(session: Session, *tags: str):
+    """Drop `tags` from every worker's response cache once the session's pending changes commit."""
+    session.info.setdefault("response_cache_tags", set()).update(tags)
+
+
+@event.listens_for(Session, "after_flush")
+def _publish_invalidations(session: Session, flush_context):
+    if not (settings.REFERENCE_DATA_SHARED and settings.RESPONSE_CACHE_ENABLED):
+        return
+    published = session.info.setdefault("response_cache_published", set())
+    tags = session.info.get("response_cache_tags", set()) - published
+    if not tags:
+        return
+    now = datetime.utcnow()
+    session.connection().execute(
+        insert(ResponseCacheInvalidation.__table__),
+        [{"tag": tag, "origin": ORIGIN, "created_at": now} for tag in sorted(tags)],
+    )
+    published.update(tags)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session: Session):
+    session.info.pop("response_cache_published", None)
+    tags = session.info.pop("response_cache_tags", None)
+    if tags:
+        response_cache.invalidate(*tags)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_invalidations(session: Session, previous_transaction):
+    session.info.pop("response_cache_published", None)
+    session.info.pop("response_cache_tags", None)
+
+
+class InvalidationFeed:
+    """Replays invalidations committed by other workers into `cache`."""
+
+    def __init__(self, cache: ResponseCache, origin: str = ORIGIN):
+        self.cache = cache
+        self.origin = origin
+        self._seen: Optional[Set[int]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        # The first poll only records what is already there, before this process caches anything
+        await run_in_threadpool(self.poll)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def poll(self) -> int:
+        """Apply the rows not seen yet; returns how many tags were invalidated."""
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            rows = db.execute(
+                select(ResponseCacheInvalidation.id, ResponseCacheInvalidation.tag, ResponseCacheInvalidation.origin)
+                .where(ResponseCacheInvalidation.created_at >= now - LOOKBACK)
+            ).all()
+            db.execute(delete(ResponseCacheInvalidation).where(ResponseCacheInvalidation.created_at < now - RETENTION))
+            db.commit()
+        finally:
+            db.close()
+
+        first_poll, seen = self._seen is None, self._seen or set()
+        tags = {row.tag for row in rows if row.id not in seen and row.origin != self.origin}
+        self._seen = {row.id for row in rows}
+        if first_poll or not tags:
+            return 0
+        self.cache.invalidate(*tags)
+        return len(tags)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(settings.REFERENCE_DATA_CHECK_SECONDS)
+            try:
+                await run_in_threadpool(self.poll)
+            except Exception:
+                logger.exception("Failed to read response cache invalidations")
+
+
+invalidation_feed = InvalidationFeed(response_cache)
@@ -0,0 +1,203 @@
+# /app/services/storage.py
+import asyncio
+import hashlib
+import hmac
+import os
+import random
+import shutil
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import AsyncIterator, BinaryIO, Optional, Union
+from urllib.parse import quote
+
+import httpx
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+
+from backend.app.core.config import settings
+
+CHUNK_SIZE = 64 * 1024
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Process-wide client so uploads reuse pooled keep-alive connections."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=settings.UPLOAD_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=settings.UPLOAD_CONCURRENCY * 4,
+                                max_keepalive_connections=settings.UPLOAD_CONCURRENCY * 2),
+        )
+    return _client
+
+
+async def close_http_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+class UploadError(Exception):
+    def __init__(self, message: str, retryable: bool = False):
+        super().__init__(message)
+        self.retryable = retryable
+
+
+def _raise_for_status(response: httpx.Response):
+    if response.is_success:
+        return
+    raise UploadError(f"Storage responded with {response.status_code}",
+                      retryable=response.status_code in RETRYABLE_STATUS_CODES)
+
+
+def _object_key(filename: str) -> str:
+    extension = os.path.splitext(filename or "")[1].lower()
+    return f"{uuid.uuid4().hex}{extension}"
+
+
+async def _iter_file(fileobj: BinaryIO) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await run_in_threadpool(fileobj.read, CHUNK_SIZE)
+        if not chunk:
+            break
+        yield chunk
+
+
+class StorageBackend(ABC):
+    @abstractmethod
+    async def save(self, fileobj: BinaryIO, filename: str, content_type: str, size: int) -> str:
+        """Store the stream from its current position and return the public URL."""
+
+
+class ImgurStorage(StorageBackend):
+    url = "https://api.imgur.com/3/upload"
+
+    def __init__(self, client_id: str):
+        self.client_id = client_id
+
+    async def save(self, fileobj: BinaryIO, filename: str, content_type: str, size: int) -> str:
+        # httpx streams file objects inside multipart bodies chunk by chunk
+        response = await get_http_client().post(
+            self.url,
+            headers={"Authorization": f"Client-ID {self.client_id}"},
+            files={"image": (filename, fileobj, content_type)},
+        )
+        _raise_for_status(response)
+        return response.json()["data"]["link"]
+
+
+class LocalStorage(StorageBackend):
+    def __init__(self, directory: str, base_url: str):
+        self.directory = directory
+        self.base_url = base_url.rstrip("/")
+
+    def _write(self, fileobj: BinaryIO, path: str):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path, "wb") as out:
+            shutil.copyfileobj(fileobj, out, CHUNK_SIZE)
+
+    async def save(self, fileobj: BinaryIO, filename: str, content_type: str, size: int) -> str:
+        key = _object_key(filename)
+        await run_in_threadpool(self._write, fileobj, os.path.join(self.directory, key))
+        return f"{self.base_url}/{key}"
+
+
+class S3Storage(StorageBackend):
+    """Path-style PUT against any S3-compatible endpoint (AWS, MinIO, Ceph...) signed with SigV4."""
+
+    def __init__(self, endpoint_url: str, bucket: str, region: str, access_key_id: str, secret_access_key: str,
+                 public_url: Optional[str] = None):
+        self.endpoint_url = endpoint_url.rstrip("/")
+        self.bucket = bucket
+        self.region = region
+        self.access_key_id = access_key_id
+        self.secret_access_key = secret_access_key
+        self.public_url = (public_url or f"{self.endpoint_url}/{bucket}").rstrip("/")
+
+    def _sign(self, method: str, url: httpx.URL) -> dict:
+        now = datetime.now(timezone.utc)
+        amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+        date_stamp = now.strftime("%Y%m%d")
+        # The body is streamed, so it is sent unsigned instead of being hashed up front
+        headers = {
+            "host": url.netloc.decode(),
+            "x-amz-content-sha256": "UNSIGNED-PAYLOAD",
+            "x-amz-date": amz_date,
+        }
+        signed_headers = ";".join(sorted(headers))
+        canonical_headers = "".join(f"{name}:{headers[name]}\n" for name in sorted(headers))
+        canonical_request = "\n".join([method, url.raw_path.decode(), "", canonical_headers, signed_headers,
+                                       "UNSIGNED-PAYLOAD"])
+        scope = f"{date_stamp}/{self.region}/s3/aws4_request"
+        string_to_sign = "\n".join(["AWS4-HMAC-SHA256", amz_date, scope,
+                                    hashlib.sha256(canonical_request.encode()).hexdigest()])
+
+        key = f"AWS4{self.secret_access_key}".encode()
+        for part in (date_stamp, self.region, "s3", "aws4_request"):
+            key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+        signature = hmac.new(key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+        headers["authorization"] = (f"AWS4-HMAC-SHA256 Credential={self.access_key_id}/{scope}, "
+                                    f"SignedHeaders={signed_headers}, Signature={signature}")
+        del headers["host"]
+        return headers
+
+    async def save(self, fileobj: BinaryIO, filename: str, content_type: str, size: int) -> str:
+        key = _object_key(filename)
+        url = httpx.URL(f"{self.endpoint_url}/{self.bucket}/{quote(key)}")
+        headers = self._sign("PUT", url)
+        # S3 rejects chunked uploads without aws-chunked framing, so send an explicit length
+        headers.update({"content-type": content_type, "content-length": str(size)})
+        response = await get_http_client().put(url, content=_iter_file(fileobj), headers=headers)
+        _raise_for_status(response)
+        return f"{self.public_url}/{quote(key)}"
+
+
+@lru_cache
+def get_storage() -> StorageBackend:
+    backend = settings.IMAGE_STORAGE_BACKEND
+    if backend == "imgur":
+        return ImgurStorage(settings.IMGUR_CLIENT_ID)
+    if backend == "local":
+        return LocalStorage(settings.LOCAL_MEDIA_DIR, settings.LOCAL_MEDIA_URL)
+    if backend == "s3":
+        return S3Storage(settings.S3_ENDPOINT_URL, settings.S3_BUCKET, settings.S3_REGION,
+                         settings.S3_ACCESS_KEY_ID, settings.S3_SECRET_ACCESS_KEY, settings.S3_PUBLIC_URL)
+    raise ValueError(f"Unknown image storage backend: {backend}")
+
+
+def _stream_size(fileobj: BinaryIO) -> int:
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell()
+    fileobj.seek(0)
+    return size
+
+
+async def upload_image(file: Union[UploadFile, BinaryIO], filename: str = "", content_type: str = "") -> str:
+    if isinstance(file, UploadFile):
+        fileobj, filename, content_type = file.file, file.filename, file.content_type
+    else:
+        fileobj = file
+    content_type = content_type or "application/octet-stream"
+    size = await run_in_threadpool(_stream_size, fileobj)
+    storage = get_storage()
+
+    for attempt in range(settings.UPLOAD_MAX_RETRIES + 1):
+        await run_in_threadpool(fileobj.seek, 0)
+        try:
+            return await storage.save(fileobj, filename, content_type, size)
+        except UploadError as e:
+            if not e.retryable or attempt == settings.UPLOAD_MAX_RETRIES:
+                raise HTTPException(status_code=502, detail="Failed to upload image")
+        except httpx.TransportError:
+            if attempt == settings.UPLOAD_MAX_RETRIES:
+                raise HTTPException(status_code=502, detail="Failed to upload image")
+        # Full jitter keeps concurrent retries from hammering the storage in lockstep
+        await asyncio.sleep(random.uniform(0, settings.UPLOAD_RETRY_BACKOFF_SECONDS * 2 ** attempt))
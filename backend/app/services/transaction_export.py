@@ -0,0 +1,59 @@
+# /app/services/transaction_export.py
+import csv
+import io
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List
+
+import orjson
+from sqlalchemy.orm import Session
+
+from backend.app.crud import crud_user
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_FIELDS = ("type", "id", "description", "points", "created_at")
+
+# Rows fetched per database round trip and rows per chunk written to the client
+FETCH_BATCH_SIZE = 1000
+CHUNK_ROWS = 500
+
+
+def _batches(transactions: Iterable[Dict]) -> Iterator[List[Dict]]:
+    transactions = iter(transactions)
+    while batch := list(islice(transactions, CHUNK_ROWS)):
+        yield batch
+
+
+def _ndjson_chunks(transactions: Iterable[Dict]) -> Iterator[bytes]:
+    for batch in _batches(transactions):
+        yield b"".join(orjson.dumps(transaction) + b"\n" for transaction in batch)
+
+
+def _csv_chunks(transactions: Iterable[Dict]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    writer.writeheader()
+    for batch in _batches(transactions):
+        writer.writerows(
+            {**transaction, "created_at": transaction["created_at"] and transaction["created_at"].isoformat()}
+            for transaction in batch
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Empty history: still send the header
+        yield buffer.getvalue().encode()
+
+
+def export_transactions(open_session: Callable[[], Session], user_id: int, export_format: str) -> Iterator[bytes]:
+    """Stream a user's transaction history as NDJSON or CSV chunks.
+
+    Opens its own session, since a streamed body is produced after the request's dependencies have exited.
+    """
+    db = open_session()
+    try:
+        transactions = crud_user.iter_transactions(db, user_id, batch_size=FETCH_BATCH_SIZE)
+        chunks = _csv_chunks if export_format == "csv" else _ndjson_chunks
+        yield from chunks(transactions)
+    finally:
+        db.close()
@@ -1,12 +1,295 @@
-# /app/services/waste_collection.py
-
-
-# TODO: implement detecting waste type
-async def detect_waste_type(image_data: bytes):
-    # Integrate with an image recognition API to detect waste type
-    # api_url = f"{settings.WASTE_DETECTION_API_URL}/detect"
-    # files = {'file': image_data}
-    # response = requests.post(api_url, files=files)
-    # response.raise_for_status()
-    # return response.json().get("waste_type")
-    return "plastic"
+# /app/services/waste_detection.py
+import asyncio
+import io
+import logging
+import math
+import multiprocessing
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from backend.app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Prediction(NamedTuple):
+    waste_type: str
+    confidence: float
+    scores: Dict[str, float]
+
+
+def preprocess(image_data: bytes, size: int) -> bytes:
+    """Decode, orient and resize an upload to size x size RGB, returned as raw uint8 pixels.
+
+    Runs in the preprocessing processes. Normalization is left to the model, which does it for the whole
+    batch in one vectorized step; uint8 pixels are also a quarter of the size of floats to send back.
+    """
+    with Image.open(io.BytesIO(image_data)) as source:
+        image = ImageOps.exif_transpose(source).convert("RGB")
+        return ImageOps.fit(image, (size, size), Image.Resampling.BILINEAR).tobytes()
+
+
+def _softmax(logits: Sequence[float]) -> List[float]:
+    top = max(logits)
+    exps = [math.exp(value - top) for value in logits]
+    total = sum(exps)
+    return [value / total for value in exps]
+
+
+class WasteModel(ABC):
+    """Classifier backend: maps a batch of preprocessed images to per-label probabilities.
+
+    `input_size` of None means the model doesn't look at pixels and uploads are not decoded at all.
+    """
+    labels: Sequence[str]
+    input_size: Optional[int] = None
+
+    @abstractmethod
+    def predict(self, batch: List[Optional[bytes]]) -> List[List[float]]:
+        ...
+
+
+class ConstantModel(WasteModel):
+    """Answers with the first label; what the endpoint did before a model was available."""
+
+    def __init__(self, labels: Sequence[str]):
+        self.labels = labels
+
+    def predict(self, batch: List[Optional[bytes]]) -> List[List[float]]:
+        return [[1.0] + [0.0] * (len(self.labels) - 1) for _ in batch]
+
+
+class _ArrayModel(WasteModel):
+    def __init__(self, labels: Sequence[str], input_size: int, mean: Sequence[float], std: Sequence[float],
+                 outputs_logits: bool):
+        # Optional dependency, only needed when a real model is configured
+        import numpy
+        self.np = numpy
+        self.labels = labels
+        self.input_size = input_size
+        self.mean = numpy.asarray(mean, dtype=numpy.float32) * 255
+        self.std = numpy.asarray(std, dtype=numpy.float32) * 255
+        self.outputs_logits = outputs_logits
+
+    def _normalized(self, batch: List[bytes]):
+        """(N, size, size, 3) float32 array, normalized per channel."""
+        np = self.np
+        pixels = np.frombuffer(b"".join(batch), dtype=np.uint8).reshape(len(batch), self.input_size,
+                                                                        self.input_size, 3)
+        return (pixels.astype(np.float32) - self.mean) / self.std
+
+    def _probabilities(self, outputs) -> List[List[float]]:
+        rows = outputs.tolist()
+        return [_softmax(row) for row in rows] if self.outputs_logits else rows
+
+
+class NumpyLinearModel(_ArrayModel):
+    """Softmax regression over normalized pixels, loaded from an .npz with `weights` (features x labels),
+    `bias`, `labels` and optionally `mean`/`std`."""
+
+    def __init__(self, path: str, input_size: int, mean: Sequence[float], std: Sequence[float]):
+        import numpy
+        with numpy.load(path) as archive:
+            weights, bias = archive["weights"].astype(numpy.float32), archive["bias"].astype(numpy.float32)
+            labels = [str(label) for label in archive["labels"]]
+            mean = archive["mean"] if "mean" in archive else mean
+            std = archive["std"] if "std" in archive else std
+        super().__init__(labels, input_size, mean, std, outputs_logits=True)
+        self.weights, self.bias = weights, bias
+
+    def predict(self, batch: List[bytes]) -> List[List[float]]:
+        features = self._normalized(batch).reshape(len(batch), -1)
+        return self._probabilities(features @ self.weights + self.bias)
+
+
+class OnnxModel(_ArrayModel):
+    """Any ONNX image classifier taking (N, 3, size, size) float32 input."""
+
+    def __init__(self, path: str, labels: Sequence[str], input_size: int, mean: Sequence[float],
+                 std: Sequence[float], outputs_logits: bool, threads: int):
+        import onnxruntime
+        super().__init__(labels, input_size, mean, std, outputs_logits)
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def predict(self, batch: List[bytes]) -> List[List[float]]:
+        inputs = self._normalized(batch).transpose(0, 3, 1, 2)
+        return self._probabilities(self.session.run(None, {self.input_name: self.np.ascontiguousarray(inputs)})[0])
+
+
+def load_model() -> WasteModel:
+    backend = settings.WASTE_MODEL_BACKEND
+    if backend == "constant":
+        return ConstantModel(settings.WASTE_MODEL_LABELS)
+    if backend == "numpy":
+        return NumpyLinearModel(settings.WASTE_MODEL_PATH, settings.WASTE_MODEL_INPUT_SIZE,
+                                settings.WASTE_MODEL_MEAN, settings.WASTE_MODEL_STD)
+    if backend == "onnx":
+        return OnnxModel(settings.WASTE_MODEL_PATH, settings.WASTE_MODEL_LABELS, settings.WASTE_MODEL_INPUT_SIZE,
+                         settings.WASTE_MODEL_MEAN, settings.WASTE_MODEL_STD, settings.WASTE_MODEL_OUTPUTS_LOGITS,
+                         settings.WASTE_MODEL_THREADS)
+    raise ValueError(f"Unknown waste model backend: {backend}")
+
+
+class MicroBatcher:
+    """Collects concurrent requests into batches of up to `max_batch_size`.
+
+    A batch is run as soon as it is full or `max_latency` seconds after its first request arrived, so a lone
+    request waits at most that long. Batches run one at a time off the event loop.
+    """
+
+    def __init__(self, model: WasteModel, max_batch_size: int, max_latency: float):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self._queue: "asyncio.Queue[Tuple[Optional[bytes], asyncio.Future]]" = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def submit(self, pixels: Optional[bytes]) -> Prediction:
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((pixels, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[Optional[bytes], asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_latency
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            batch = [(pixels, future) for pixels, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            try:
+                probabilities = await asyncio.to_thread(self.model.predict, [pixels for pixels, _ in batch])
+            except Exception as e:
+                logger.exception("Waste classification failed for a batch of %d", len(batch))
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), scores in zip(batch, probabilities):
+                if not future.done():
+                    future.set_result(self._prediction(scores))
+
+    def _prediction(self, scores: Sequence[float]) -> Prediction:
+        best = max(range(len(scores)), key=scores.__getitem__)
+        return Prediction(self.model.labels[best], float(scores[best]),
+                          {label: float(score) for label, score in zip(self.model.labels, scores)})
+
+
+class WasteDetector:
+    """In-process classifier: uploads are decoded in a process pool, then classified in micro-batches.
+
+    The model is loaded once per process; the batcher belongs to the event loop that started it.
+    """
+
+    def __init__(self):
+        self._model: Optional[WasteModel] = None
+        self._model_lock = threading.Lock()
+        self._pool: Optional[Executor] = None
+        self._batcher: Optional[MicroBatcher] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _load(self) -> WasteModel:
+        with self._model_lock:
+            if self._model is None:
+                self._model = load_model()
+                if self._model.input_size is not None and settings.WASTE_DETECTION_PREPROCESS_WORKERS:
+                    self._pool = self._new_pool()
+            return self._model
+
+    @staticmethod
+    def _new_pool() -> Executor:
+        # spawn: forking a process that already runs threads can deadlock the children
+        return ProcessPoolExecutor(settings.WASTE_DETECTION_PREPROCESS_WORKERS,
+                                   mp_context=multiprocessing.get_context("spawn"))
+
+    def _replace_pool(self, broken: Executor):
+        with self._model_lock:
+            # Concurrent requests all see the same broken pool; only the first one replaces it
+            if self._pool is broken:
+                self._pool = self._new_pool()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    async def start(self) -> MicroBatcher:
+        loop = asyncio.get_running_loop()
+        if self._batcher is None or self._loop is not loop:
+            model = self._model or await asyncio.to_thread(self._load)
+            if self._batcher is None or self._loop is not loop:
+                self._batcher = MicroBatcher(model, settings.WASTE_DETECTION_MAX_BATCH_SIZE,
+                                             settings.WASTE_DETECTION_MAX_LATENCY_MS / 1000)
+                self._batcher.start()
+                self._loop = loop
+        return self._batcher
+
+    async def stop(self):
+        if self._batcher is not None and self._loop is asyncio.get_running_loop():
+            await self._batcher.stop()
+        self._batcher = self._loop = None
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        self._model = None
+
+    async def _pixels(self, image_data: bytes, size: int) -> bytes:
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        try:
+            # Without a pool this runs on threads; PIL releases the GIL while decoding and resizing
+            return await loop.run_in_executor(pool, preprocess, image_data, size)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed by the OOM killer) and took the pool with it
+            logger.warning("Image preprocessing pool broke, starting a new one", exc_info=True)
+            self._replace_pool(pool)
+            raise HTTPException(status_code=503, detail="Image processing is restarting, try again shortly")
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+            raise HTTPException(status_code=400, detail="Uploaded file is not a valid image")
+
+    async def detect(self, image_data: bytes) -> Prediction:
+        batcher = await self.start()
+        size = batcher.model.input_size
+        pixels = await self._pixels(image_data, size) if size is not None else None
+        return await batcher.submit(pixels)
+
+
+waste_detector = WasteDetector()
+
+
+async def classify_waste(image_data: bytes) -> Prediction:
+    if not settings.DETECTION_CACHE_ENABLED:
+        return await waste_detector.detect(image_data)
+    # Imported here: the cache module builds on Prediction from this one
+    from backend.app.services.detection_cache import detection_cache
+    return await detection_cache.get_or_compute(image_data, waste_detector.detect)
+
+
+async def detect_waste_type(image_data: bytes) -> str:
+    return (await classify_waste(image_data)).waste_type
@@ -0,0 +1,94 @@
+# benchmarks/serialization.py
+"""Compare response serialization throughput: FastAPI's response_model path against the fast path.
+
+Builds a page of in-memory ORM posts (no database needed) and renders it both ways:
+
+    python -m backend.benchmarks.serialization [--items 100] [--rounds 200]
+"""
+import argparse
+import asyncio
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from starlette.responses import JSONResponse
+
+from backend.app.core.serialization import FastJSONResponse, serializers
+from backend.app.models import Post, PostImage, PostType, User
+from backend.app.schemas import Post as PostSchema
+
+
+def make_posts(count: int) -> List[Post]:
+    author = User(id=1, email="author@example.com", full_name="Author", bio="No bio :(", is_active=True,
+                  balance=12.5, opt_out_newspaper=False)
+    post_type = PostType(id=1, name="news")
+    now = datetime(2024, 1, 1)
+    return [
+        Post(id=i, title=f"Post {i}", content="lorem ipsum " * 50, created_at=now - timedelta(minutes=i),
+             author_id=1, post_type_id=1, author=author, post_type=post_type,
+             images=[PostImage(id=i * 3 + j, post_id=i, url=f"/media/{i}-{j}.jpg",
+                               thumbnail_url=f"/media/{i}-{j}-thumb.jpg") for j in range(3)])
+        for i in range(count)
+    ]
+
+
+def make_rows(count: int) -> List[Dict]:
+    now = datetime(2024, 1, 1)
+    return [{"date": now - timedelta(hours=i), "amount": i * 1.5, "description": f"Reward {i}", "type": "reward"}
+            for i in range(count)]
+
+
+# Built once, like FastAPI does per route, and one loop for all runs so the stock numbers only
+# measure serialization
+_loop = asyncio.new_event_loop()
+_post_list_field = create_response_field(name="Response_read_feed", type_=List[PostSchema])
+_dict_list_field = create_response_field(name="Response_weekly_data", type_=List[Dict])
+
+
+def stock_models(posts: List[Post]) -> bytes:
+    content = _loop.run_until_complete(serialize_response(field=_post_list_field, response_content=posts))
+    return JSONResponse(content).body
+
+
+def stock_dicts(rows: List[Dict]) -> bytes:
+    content = _loop.run_until_complete(serialize_response(field=_dict_list_field, response_content=rows))
+    return JSONResponse(content).body
+
+
+def fast_models(posts: List[Post]) -> bytes:
+    return serializers.response(List[PostSchema], posts).body
+
+
+def fast_dicts(rows: List[Dict]) -> bytes:
+    return FastJSONResponse(rows).body
+
+
+def measure(render: Callable, payload, rounds: int) -> float:
+    render(payload)  # warm up adapters and caches
+    start = time.perf_counter()
+    for _ in range(rounds):
+        render(payload)
+    return rounds / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100, help="Items per rendered page")
+    parser.add_argument("--rounds", type=int, default=200, help="Pages rendered per measurement")
+    args = parser.parse_args()
+
+    cases = [
+        ("List[Post] from ORM", make_posts(args.items), stock_models, fast_models),
+        ("List[Dict]", make_rows(args.items), stock_dicts, fast_dicts),
+    ]
+    print(f"{'payload':<22}{'stock pages/s':>15}{'fast pages/s':>15}{'speedup':>10}")
+    for name, payload, stock, fast in cases:
+        stock_rate = measure(stock, payload, args.rounds)
+        fast_rate = measure(fast, payload, args.rounds)
+        print(f"{name:<22}{stock_rate:>15.0f}{fast_rate:>15.0f}{fast_rate / stock_rate:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
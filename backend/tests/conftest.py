@@ -0,0 +1,69 @@
+# tests/conftest.py
+"""Every test session runs against a fresh SQLite file built by the Alembic migrations.
+
+Settings are read once at import time, so the environment is set up here before anything from the app
+is imported. Background work (model loading, geo index refreshes, email delivery) stays off unless a
+test starts it itself.
+"""
+import os
+import tempfile
+
+_workdir = tempfile.mkdtemp(prefix="recycle-m-tests-")
+os.environ.update(
+    SQLALCHEMY_DATABASE_URI=f"sqlite:///{_workdir}/test.db",
+    LOCAL_MEDIA_DIR=os.path.join(_workdir, "media"),
+    IMAGE_STORAGE_BACKEND="local",
+    BCRYPT_ROUNDS="4",
+    RESPONSE_CACHE_ENABLED="false",
+    GEO_INDEX_ENABLED="false",
+    EMAIL_WORKER_ENABLED="false",
+    DETECTION_CACHE_ENABLED="false",
+    WASTE_DETECTION_PREPROCESS_WORKERS="0",
+)
+
+import pytest  # noqa: E402
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated_database():
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    command.upgrade(config, "head")
+
+
+@pytest.fixture
+def db():
+    from backend.app.db.session import SessionLocal
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture(scope="session")
+def client(migrated_database):
+    from fastapi.testclient import TestClient
+    from backend.app.main import app
+    # Not entered as a context manager, so the lifespan's background tasks don't start
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def auth_headers(client):
+    """Sign up (once per email) and return the Authorization header for that account."""
+    tokens = {}
+
+    def headers(email: str) -> dict:
+        if email not in tokens:
+            response = client.post("/api/v1/auth/signup",
+                                   json={"email": email, "password": "secret-password", "full_name": "Test User"})
+            assert response.status_code == 201, response.text
+            tokens[email] = response.json()["access_token"]
+        return {"Authorization": f"Bearer {tokens[email]}"}
+
+    return headers
@@ -0,0 +1,18 @@
+# tests/test_auth.py
+import pytest
+
+from backend.app.core.config import settings
+from backend.app.crud.crud_user import user_cache
+from backend.app.models import User
+
+
+@pytest.mark.parametrize("stateless", [False, True])
+def test_bad_balance_row_does_not_lock_the_user_out(client, auth_headers, db, monkeypatch, stateless):
+    monkeypatch.setattr(settings, "STATELESS_AUTH", stateless)
+    headers = auth_headers(f"negative-balance-{stateless}@example.com".lower())
+    user_id = client.get("/api/v1/users/me", headers=headers).json()["id"]
+    db.get(User, user_id).balance = -5
+    db.commit()
+    user_cache.invalidate(user_id)
+
+    assert client.get("/api/v1/expenses/", headers=headers).status_code == 200
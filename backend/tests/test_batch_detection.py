@@ -0,0 +1,54 @@
+# tests/test_batch_detection.py
+import io
+import zipfile
+
+import orjson
+import pytest
+
+from backend.app.core.config import settings
+
+BATCH = "/api/v1/waste-collection/detect-waste/batch"
+ZIP = {"Content-Type": "application/zip"}
+
+
+def archive(*names: str, size: int = 100) -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as zip_file:
+        for name in names:
+            zip_file.writestr(name, bytes(size))
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def headers(auth_headers):
+    return {**auth_headers("batch-detection@example.com"), **ZIP}
+
+
+def test_batch_needs_a_signed_in_user(client):
+    assert client.post(BATCH, content=archive("a.jpg"), headers=ZIP).status_code == 401
+
+
+def test_batch_streams_a_result_per_image(client, headers):
+    response = client.post(BATCH, content=archive("a.jpg", "b.jpg"), headers=headers)
+    assert response.status_code == 200, response.text
+    results = [orjson.loads(line) for line in response.text.splitlines()]
+    assert sorted(result["name"] for result in results) == ["a.jpg", "b.jpg"]
+
+
+def test_declared_body_over_the_cap_is_refused(client, headers, monkeypatch):
+    monkeypatch.setattr(settings, "WASTE_DETECTION_BATCH_MAX_BYTES", 1000)
+    # Every image is under the per-image limit, the request as a whole is not
+    response = client.post(BATCH, content=archive(*(f"{i}.jpg" for i in range(5)), size=400), headers=headers)
+    assert response.status_code == 413
+
+
+def test_chunked_body_over_the_cap_is_refused(client, headers, monkeypatch):
+    monkeypatch.setattr(settings, "WASTE_DETECTION_BATCH_MAX_BYTES", 1000)
+    body = archive(*(f"{i}.jpg" for i in range(5)), size=400)
+
+    def chunks():
+        for start in range(0, len(body), 256):
+            yield body[start:start + 256]
+
+    response = client.post(BATCH, content=chunks(), headers=headers)
+    assert response.status_code == 413
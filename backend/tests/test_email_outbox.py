@@ -0,0 +1,104 @@
+# tests/test_email_outbox.py
+import asyncio
+import socket
+from datetime import datetime, timedelta
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from backend.app.core.config import settings
+from backend.app.models import EmailOutbox
+from backend.app.services.email import email_worker, queue_email, smtp_pool
+
+
+class Mailbox:
+    """aiosmtpd handler: `full@` mailboxes answer 451, `nobody@` ones 550, everything else is delivered."""
+
+    def __init__(self):
+        self.delivered = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address.startswith("full@"):
+            return "451 4.2.2 Mailbox full, try again later"
+        if address.startswith("nobody@"):
+            return "550 5.1.1 No such user"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        self.delivered.append((envelope.rcpt_tos, envelope.content.decode()))
+        return "250 Message accepted for delivery"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def mailbox(monkeypatch, db):
+    handler = Mailbox()
+    controller = Controller(handler, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    monkeypatch.setattr(settings, "SMTP_HOST", controller.hostname)
+    monkeypatch.setattr(settings, "SMTP_PORT", controller.port)
+    monkeypatch.setattr(settings, "SMTP_STARTTLS", False)
+    monkeypatch.setattr(settings, "SMTP_USER", "")
+    db.query(EmailOutbox).delete()
+    db.commit()
+    try:
+        yield handler
+    finally:
+        smtp_pool.close()
+        controller.stop()
+
+
+def test_deliver_due_sends_retries_and_gives_up(mailbox, db):
+    sent = queue_email(db, "someone@example.com", "Hello", "<p>delivered</p>")
+    deferred = queue_email(db, "full@example.com", "Hello", "<p>deferred</p>")
+    bounced = queue_email(db, "nobody@example.com", "Hello", "<p>bounced</p>")
+
+    assert asyncio.run(email_worker.deliver_due()) == 3
+
+    db.expire_all()
+    assert (sent.status, sent.attempts, sent.sent_at is not None) == ("sent", 0, True)
+    assert [rcpt for rcpt, _ in mailbox.delivered] == [["someone@example.com"]]
+    # A 4xx is retried later with backoff, a 5xx about the recipient is final
+    assert (deferred.status, deferred.attempts) == ("pending", 1)
+    assert deferred.next_attempt_at > deferred.created_at and "451" in deferred.last_error
+    assert (bounced.status, bounced.attempts) == ("failed", 1)
+    assert "550" in bounced.last_error
+    # Finished messages don't keep their bodies, the retried one does
+    assert (sent.body, bounced.body, deferred.body) == ("", "", "<p>deferred</p>")
+    # Nothing is due until the backoff runs out
+    assert asyncio.run(email_worker.deliver_due()) == 0
+
+
+def test_password_reset_mail_goes_through_the_outbox(mailbox, client, auth_headers):
+    auth_headers("forgetful@example.com")
+    response = client.post("/api/v1/auth/request-password-reset", json={"email": "forgetful@example.com"})
+    assert response.status_code == 200, response.text
+
+    assert asyncio.run(email_worker.deliver_due()) == 1
+    [(recipients, content)] = mailbox.delivered
+    assert recipients == ["forgetful@example.com"]
+    assert "Password Reset Request" in content and "reset-password?token=" in content
+
+
+def test_finished_messages_are_purged_after_retention(mailbox, db):
+    old = datetime.utcnow() - timedelta(days=settings.EMAIL_RETENTION_DAYS + 1)
+    db.add_all([
+        EmailOutbox(to_email="a@example.com", subject="s", body="", status="sent", created_at=old),
+        EmailOutbox(to_email="b@example.com", subject="s", body="", status="failed", created_at=old),
+        EmailOutbox(to_email="c@example.com", subject="s", body="", status="sent"),
+    ])
+    db.commit()
+    waiting = queue_email(db, "full@example.com", "Hello", "<p>still due</p>")
+    waiting.created_at = old
+    db.commit()
+
+    asyncio.run(email_worker.deliver_due())
+
+    db.expire_all()
+    assert sorted(m.to_email for m in db.query(EmailOutbox)) == ["c@example.com", "full@example.com"]
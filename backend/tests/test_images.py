@@ -0,0 +1,41 @@
+# tests/test_images.py
+import asyncio
+import io
+import os
+
+from PIL import Image
+
+from backend.app.core.config import settings
+from backend.app.services.images import upload_image_with_variants
+
+ORIENTATION = 0x0112
+GPS_IFD = 0x8825
+
+
+def photo_with_location() -> bytes:
+    """A 400x200 JPEG tagged as rotated 90 degrees, with a GPS position in its EXIF."""
+    exif = Image.Exif()
+    exif[ORIENTATION] = 6
+    exif.get_ifd(GPS_IFD).update({1: "N", 2: (52.0, 22.0, 1.0), 3: "E", 4: (4.0, 53.0, 2.0)})
+    buffer = io.BytesIO()
+    Image.new("RGB", (400, 200), (30, 120, 60)).save(buffer, "JPEG", exif=exif)
+    return buffer.getvalue()
+
+
+def stored(url: str) -> Image.Image:
+    path = os.path.join(settings.LOCAL_MEDIA_DIR, url.rsplit("/", 1)[1])
+    return Image.open(path)
+
+
+def test_every_stored_copy_is_stripped_of_metadata():
+    result = asyncio.run(upload_image_with_variants(io.BytesIO(photo_with_location())))
+
+    for url in (result.url, result.thumbnail_url, result.medium_url):
+        with stored(url) as image:
+            assert not image.getexif(), url
+            assert "exif" not in image.info and "xmp" not in image.info, url
+
+    with stored(result.url) as original:
+        # Orientation is baked into the pixels, and a JPEG stays a JPEG
+        assert original.format == "JPEG"
+        assert original.size == (200, 400)
@@ -0,0 +1,87 @@
+# tests/test_ledger.py
+import pytest
+
+from backend.app.crud import crud_ledger
+from backend.app.models import User
+from backend.app.schemas import RewardCreate
+from backend.app.services.reference_data import reference_data
+
+EXPENSES = "/api/v1/expenses/"
+
+
+@pytest.fixture
+def spender(client, auth_headers, db):
+    """A fresh account credited with 100 points."""
+    def create(email: str):
+        headers = auth_headers(email)
+        user_id = client.get("/api/v1/users/me", headers=headers).json()["id"]
+        waste_type = next(iter(reference_data.waste_types(db)))
+        crud_ledger.post_reward(db, RewardCreate(points=100, waste_type_id=waste_type.id), user_id)
+        return headers, user_id
+    return create
+
+
+def balance(db, user_id: int) -> int:
+    db.expire_all()
+    return db.get(User, user_id).balance
+
+
+def ledger(db, user_id: int):
+    summary = crud_ledger.get_ledger_summary(db, user_id)
+    return summary.total_rewards, summary.total_expenses, summary.reward_count, summary.expense_count
+
+
+def test_expense_is_debited_with_its_summary(client, db, spender):
+    headers, user_id = spender("ledger-debit@example.com")
+
+    response = client.post(EXPENSES, headers=headers, json={"description": "Tote bag", "points": 30})
+
+    assert response.status_code == 201, response.text
+    assert balance(db, user_id) == 70
+    assert ledger(db, user_id) == (100, 30, 1, 1)
+
+
+def test_overdrawing_expense_is_refused_and_changes_nothing(client, db, spender):
+    headers, user_id = spender("ledger-overdraw@example.com")
+
+    response = client.post(EXPENSES, headers=headers, json={"description": "Bike", "points": 150})
+
+    assert response.status_code == 400
+    assert balance(db, user_id) == 100
+    assert ledger(db, user_id) == (100, 0, 1, 0)
+    assert client.get(EXPENSES, headers=headers).json() == []
+    # The account and the public feed keep working
+    assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+    assert client.get("/api/v1/feed/").status_code == 200
+
+
+def test_raising_an_expense_is_limited_by_the_balance(client, db, spender):
+    headers, user_id = spender("ledger-update@example.com")
+    expense = client.post(EXPENSES, headers=headers, json={"description": "Mug", "points": 40}).json()
+    url = f"{EXPENSES}{expense['id']}"
+
+    too_much = {"description": "Mug", "points": 150, "created_at": expense["created_at"]}
+    assert client.put(url, headers=headers, json=too_much).status_code == 400
+    assert balance(db, user_id) == 60
+
+    lowered = {"description": "Mug", "points": 10, "created_at": expense["created_at"]}
+    assert client.put(url, headers=headers, json=lowered).status_code == 200
+    assert balance(db, user_id) == 90
+    assert ledger(db, user_id) == (100, 10, 1, 1)
+
+
+def test_batch_that_overdraws_anyone_is_rolled_back(db, spender):
+    _, user_id = spender("ledger-batch@example.com")
+    waste_type = next(iter(reference_data.waste_types(db)))
+    postings = [
+        crud_ledger.Posting(user_id=user_id, points=20, waste_type_id=waste_type.id),
+        crud_ledger.Posting(user_id=user_id, points=200, description="Too much"),
+    ]
+
+    with pytest.raises(crud_ledger.InsufficientBalance):
+        crud_ledger.post_batch(db, postings)
+
+    assert balance(db, user_id) == 100
+    assert crud_ledger.post_batch(db, postings[:1]) == 1
+    assert balance(db, user_id) == 120
+    assert ledger(db, user_id) == (120, 0, 2, 0)
@@ -0,0 +1,89 @@
+# tests/test_query_counts.py
+"""Pin the number of SQL statements the read endpoints run, so an N+1 fails here instead of in production.
+
+The seeded data has several authors, post types and images per post: a per-row lazy load would push the
+counts well past these limits.
+"""
+import pytest
+
+from backend.app.db.query_counter import assert_max_queries
+from backend.app.models import Post, PostImage, PostType, Product, ProductType, User
+from backend.app.services.reference_data import reference_data
+
+POSTS_PER_AUTHOR = 8
+IMAGES_PER_POST = 3
+
+
+@pytest.fixture(scope="module")
+def seeded(migrated_database):
+    from backend.app.db.session import SessionLocal
+    db = SessionLocal()
+    try:
+        post_types = [PostType(name=f"query-count-type-{i}") for i in range(3)]
+        product_type = ProductType(name="query-count-products")
+        authors = [User(email=f"author{i}@example.com", hashed_password="x", full_name=f"Author {i}")
+                   for i in range(3)]
+        db.add_all([*post_types, product_type, *authors])
+        db.flush()
+        posts = []
+        for author in authors:
+            for i in range(POSTS_PER_AUTHOR):
+                post = Post(title=f"Recycling tips {author.id}-{i}", content="Sort your recycling " * 20,
+                            author_id=author.id, post_type_id=post_types[i % len(post_types)].id)
+                post.images = [PostImage(url=f"/media/{author.id}-{i}-{j}.jpg",
+                                         thumbnail_url=f"/media/{author.id}-{i}-{j}-thumb.jpg")
+                               for j in range(IMAGES_PER_POST)]
+                posts.append(post)
+        products = [Product(name=f"Recycling bin {i}", description="Sturdy recycling bin", price=10.0 + i,
+                            product_type_id=product_type.id, seller_id=authors[0].id) for i in range(5)]
+        db.add_all([*posts, *products])
+        db.commit()
+        yield {"author_id": authors[0].id, "post_id": posts[0].id}
+    finally:
+        db.close()
+
+
+@pytest.fixture(autouse=True)
+def warm_reference_data(client, seeded):
+    # Lookup tables are cached per process; load them up front so every test counts the same statements
+    client.get("/api/v1/feed/summary")
+    yield
+    reference_data.invalidate()
+
+
+def get_ok(client, url: str):
+    response = client.get(url)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_feed(client):
+    with assert_max_queries(2):
+        posts = get_ok(client, "/api/v1/feed/?limit=20")
+    assert len(posts) == 20
+    assert all(len(post["images"]) == IMAGES_PER_POST for post in posts)
+
+
+def test_feed_summary(client):
+    with assert_max_queries(1):
+        assert len(get_ok(client, "/api/v1/feed/summary?limit=20")) == 20
+
+
+def test_user_feed(client, seeded):
+    with assert_max_queries(2):
+        posts = get_ok(client, f"/api/v1/feed/user/{seeded['author_id']}")
+    assert len(posts) == POSTS_PER_AUTHOR
+    assert {post["author_id"] for post in posts} == {seeded["author_id"]}
+
+
+def test_post_detail(client, seeded):
+    with assert_max_queries(2):
+        post = get_ok(client, f"/api/v1/feed/{seeded['post_id']}")
+    assert len(post["images"]) == IMAGES_PER_POST
+
+
+def test_search(client):
+    with assert_max_queries(3):
+        results = get_ok(client, "/api/v1/search/?query=recycling&limit=50")
+    assert sum(result["type"] == "product" for result in results) == 5
+    assert len(results) == 5 + 3 * POSTS_PER_AUTHOR
@@ -0,0 +1,82 @@
+# tests/test_recycling_centers.py
+import pytest
+
+from backend.app.core.config import settings
+from backend.app.crud import crud_waste_collection
+from backend.app.services.geo_index import RecyclingCenterIndex, recycling_center_index
+
+CENTERS = "/api/v1/waste-collection/recycling-centers"
+ADMIN = "centers-admin@example.com"
+
+# Far from the centers seeded by the migrations, so only the ones created here are in range
+LATITUDE, LONGITUDE = -54.8, -68.3
+
+
+def test_index_overlay_handles_removals():
+    index = RecyclingCenterIndex(rebuild_threshold=2)
+    index.load(lambda: [(1, "a", "", 10.0, 10.0), (2, "b", "", 10.01, 10.0)])
+
+    index.remove(1)
+    assert [hit["id"] for hit in index.nearest(10.0, 10.0)] == [2]
+
+    # Folding the overlay into a new tree must not bring the removed center back
+    index.upsert((3, "c", "", 10.02, 10.0))
+    index.remove(2)
+    assert [hit["id"] for hit in index.nearest(10.0, 10.0)] == [3]
+
+
+@pytest.fixture
+def geo_index(monkeypatch, db):
+    monkeypatch.setattr(settings, "GEO_INDEX_ENABLED", True)
+    monkeypatch.setattr(settings, "ADMIN_EMAILS", [ADMIN])
+    crud_waste_collection.refresh_recycling_center_index(db)
+
+
+def nearby_ids(client):
+    response = client.get(CENTERS, params={"latitude": LATITUDE, "longitude": LONGITUDE, "radius": 50})
+    assert response.status_code == 200, response.text
+    return [center["id"] for center in response.json()]
+
+
+def test_center_writes_reach_the_index(client, auth_headers, geo_index):
+    headers = auth_headers(ADMIN)
+    response = client.post(CENTERS, headers=headers,
+                           json={"name": "Ushuaia depot", "address": "Av. Maipu", "latitude": LATITUDE,
+                                 "longitude": LONGITUDE})
+    assert response.status_code == 201, response.text
+    center_id = response.json()["id"]
+    assert nearby_ids(client) == [center_id]
+
+    response = client.patch(f"{CENTERS}/{center_id}", headers=headers, json={"latitude": None})
+    assert response.status_code == 200, response.text
+    assert nearby_ids(client) == []
+
+    client.patch(f"{CENTERS}/{center_id}", headers=headers, json={"latitude": LATITUDE})
+    assert nearby_ids(client) == [center_id]
+
+    assert client.delete(f"{CENTERS}/{center_id}", headers=headers).status_code == 200
+    assert nearby_ids(client) == []
+    assert client.delete(f"{CENTERS}/{center_id}", headers=headers).status_code == 404
+
+
+def test_center_writes_need_an_admin(client, auth_headers, geo_index):
+    response = client.post(CENTERS, headers=auth_headers("not-an-admin@example.com"),
+                           json={"name": "x", "address": "y", "latitude": 0, "longitude": 0})
+    assert response.status_code == 403
+
+
+def test_refresh_skips_rebuild_while_unchanged(client, auth_headers, geo_index, db, monkeypatch):
+    loads = []
+    load = crud_waste_collection.load_recycling_center_index
+    monkeypatch.setattr(crud_waste_collection, "load_recycling_center_index", lambda s: loads.append(load(s)))
+
+    version = crud_waste_collection.refresh_recycling_center_index(db)
+    assert crud_waste_collection.refresh_recycling_center_index(db, version) == version
+    assert len(loads) == 1
+
+    client.post(CENTERS, headers=auth_headers(ADMIN),
+                json={"name": "New depot", "address": "Somewhere", "latitude": 1.0, "longitude": 1.0})
+    db.rollback()  # end the test session's read transaction so it sees the write
+    assert crud_waste_collection.refresh_recycling_center_index(db, version) > version
+    assert len(loads) == 2
+    assert recycling_center_index.ready
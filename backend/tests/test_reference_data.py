@@ -0,0 +1,21 @@
+# tests/test_reference_data.py
+from backend.app.models import WasteType
+from backend.app.services.reference_data import ReferenceData, WasteTypeEntry
+
+
+def test_load_racing_an_invalidation_is_not_kept():
+    cache = ReferenceData()
+    loads = []
+
+    def load_then_invalidated(db):
+        loads.append(db)
+        if len(loads) == 1:
+            # A commit elsewhere lands while these rows are being read
+            cache.invalidate(WasteType.__tablename__)
+        return [WasteTypeEntry(1, "plastic", 5)]
+
+    cache._get(None, WasteType, load_then_invalidated)
+    cache._get(None, WasteType, load_then_invalidated)
+    cache._get(None, WasteType, load_then_invalidated)
+
+    assert len(loads) == 2
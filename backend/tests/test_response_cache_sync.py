@@ -0,0 +1,58 @@
+# tests/test_response_cache_sync.py
+import pytest
+
+from backend.app.core.config import settings
+from backend.app.core.http_cache import ResponseCache, response_cache
+from backend.app.models import PostType
+from backend.app.services.response_cache_sync import InvalidationFeed, invalidate_on_commit
+
+
+@pytest.fixture
+def shared(monkeypatch):
+    monkeypatch.setattr(settings, "REFERENCE_DATA_SHARED", True)
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+
+
+def cached(cache: ResponseCache, key: str, *tags: str):
+    cache.set(key, b"body", [], '"etag"', tags, cache.versions(tags))
+    assert cache.get(key) is not None
+
+
+def test_other_workers_replay_committed_invalidations(shared, db):
+    other_worker = ResponseCache(maxsize=10, ttl=60)
+    feed = InvalidationFeed(other_worker, origin="other-worker")
+    this_worker = InvalidationFeed(ResponseCache(maxsize=10, ttl=60))
+    feed.poll()
+    this_worker.poll()
+    cached(other_worker, "/feed/", "posts")
+    cached(other_worker, "/feed/types", "post_types")
+    cached(other_worker, "/products/", "products")
+    local_versions = response_cache.versions(("posts",))
+
+    # A new post type is tagged by the reference data hooks, "posts" explicitly
+    db.add(PostType(name="cache-sync-type"))
+    invalidate_on_commit(db, "posts")
+    db.commit()
+
+    assert response_cache.versions(("posts",)) != local_versions
+    assert feed.poll() == 2
+    assert other_worker.get("/feed/") is None and other_worker.get("/feed/types") is None
+    assert other_worker.get("/products/") is not None
+    # Already applied, and this worker's own rows are never replayed
+    assert feed.poll() == 0
+    assert this_worker.poll() == 0
+
+
+def test_rolled_back_invalidations_are_not_published(shared, db):
+    other_worker = ResponseCache(maxsize=10, ttl=60)
+    feed = InvalidationFeed(other_worker, origin="other-worker")
+    feed.poll()
+    cached(other_worker, "/feed/", "posts")
+
+    db.add(PostType(name="rolled-back-type"))
+    invalidate_on_commit(db, "posts")
+    db.flush()
+    db.rollback()
+
+    assert feed.poll() == 0
+    assert other_worker.get("/feed/") is not None
@@ -0,0 +1,127 @@
+# tests/test_routing.py
+import asyncio
+import itertools
+import time
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.api import deps
+from backend.app.core.config import settings
+from backend.app.core.http_cache import CacheRule, ResponseCache, ResponseCacheMiddleware
+from backend.app.db.routing import ReadYourWritesMiddleware, ReplicaRouter, replica_sessionmakers, \
+    replica_staleness, scope_is_pinned
+
+
+def make_router(lag: float) -> ReplicaRouter:
+    primary = sessionmaker(bind=create_engine("sqlite://"))
+    router = ReplicaRouter(primary, replica_sessionmakers([create_engine("sqlite://")]))
+    router._measure_lag = lambda index: lag
+    return router
+
+
+def probe_once(router: ReplicaRouter):
+    async def run():
+        await router.start()
+        await asyncio.sleep(0.05)
+        await router.stop()
+
+    asyncio.run(run())
+
+
+def test_reads_go_to_a_replica_within_the_lag_limit():
+    router = make_router(lag=0.0)
+    probe_once(router)
+    assert router.read_session().get_bind() is router.replicas[0].kw["bind"]
+
+
+def test_lagging_replica_is_skipped_once_probed():
+    router = make_router(lag=3600.0)
+    # Nothing is measured on the request path
+    assert router.read_session().get_bind() is router.replicas[0].kw["bind"]
+    probe_once(router)
+    assert router.read_session().get_bind() is router.primary.kw["bind"]
+
+
+def pinning_app(monkeypatch) -> FastAPI:
+    router = make_router(lag=0.0)
+    monkeypatch.setattr(deps, "read_router", router)
+    app = FastAPI()
+    app.add_middleware(ReadYourWritesMiddleware, cookie_name=settings.READ_YOUR_WRITES_COOKIE)
+
+    @app.post("/write")
+    def write(db=Depends(deps.get_db)):
+        return {}
+
+    @app.get("/read")
+    def read(db=Depends(deps.get_read_db)):
+        return "replica" if db.get_bind() is router.replicas[0].kw["bind"] else "primary"
+
+    return app
+
+
+def test_writer_reads_from_the_primary_on_any_worker(monkeypatch):
+    writer = TestClient(pinning_app(monkeypatch))
+    assert writer.get("/read").json() == "replica"
+
+    response = writer.post("/write")
+    assert settings.READ_YOUR_WRITES_COOKIE in response.cookies
+    assert writer.get("/read").json() == "primary"
+
+    # The pin lives in the cookie, so a fresh app (another worker) honours it too
+    other_worker = TestClient(pinning_app(monkeypatch), cookies=writer.cookies)
+    assert other_worker.get("/read").json() == "primary"
+    assert TestClient(pinning_app(monkeypatch)).get("/read").json() == "replica"
+
+
+def test_expired_or_far_future_pins_are_ignored(monkeypatch):
+    client = TestClient(pinning_app(monkeypatch))
+    for until in (time.time() - 1, time.time() + 3600, "garbage"):
+        client.cookies.set(settings.READ_YOUR_WRITES_COOKIE, str(until))
+        assert client.get("/read").json() == "replica"
+
+
+def caching_app(monkeypatch, cache: ResponseCache) -> FastAPI:
+    router = make_router(lag=0.0)
+    monkeypatch.setattr(deps, "read_router", router)
+    renders = itertools.count()
+    app = FastAPI()
+    app.add_middleware(ResponseCacheMiddleware, cache=cache, rules=[CacheRule.route("/items", "items")],
+                       max_body_size=1024, bypass=scope_is_pinned, staleness=replica_staleness)
+
+    @app.get("/items")
+    def items(db=Depends(deps.get_read_db)):
+        source = "replica" if db.get_bind() is router.replicas[0].kw["bind"] else "primary"
+        return {"source": source, "render": next(renders)}
+
+    return app
+
+
+def test_replica_render_is_not_cached_right_after_an_invalidation(monkeypatch):
+    cache = ResponseCache(maxsize=10, ttl=60)
+    client = TestClient(caching_app(monkeypatch, cache))
+    first = client.get("/items").json()
+    assert first["source"] == "replica"
+    assert client.get("/items").json() == first
+
+    cache.invalidate("items")
+    # Within REPLICA_MAX_LAG_SECONDS of the write the replica may still serve the old rows
+    assert client.get("/items").json()["render"] == 1
+    assert client.get("/items").json()["render"] == 2
+    assert len(cache) == 0
+
+
+def test_pinned_client_bypasses_the_cache(monkeypatch):
+    cache = ResponseCache(maxsize=10, ttl=60)
+    client = TestClient(caching_app(monkeypatch, cache))
+    cached = client.get("/items").json()
+
+    client.cookies.set(settings.READ_YOUR_WRITES_COOKIE, str(time.time() + 2))
+    fresh = client.get("/items").json()
+    assert fresh["source"] == "primary" and fresh["render"] != cached["render"]
+    assert client.get("/items").json()["render"] != fresh["render"]
+
+    client.cookies.clear()
+    assert client.get("/items").json() == cached
@@ -0,0 +1,95 @@
+# tests/test_storage.py
+import asyncio
+import io
+import os
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from backend.app.core.config import settings
+from backend.app.services import storage
+from backend.app.services.storage import LocalStorage, S3Storage, upload_image
+
+
+def test_local_storage_writes_file_under_unique_key(tmp_path):
+    backend = LocalStorage(str(tmp_path / "media"), "/media/")
+    data = os.urandom(3 * storage.CHUNK_SIZE + 17)
+
+    first = asyncio.run(backend.save(io.BytesIO(data), "photo.JPG", "image/jpeg", len(data)))
+    second = asyncio.run(backend.save(io.BytesIO(data), "photo.JPG", "image/jpeg", len(data)))
+
+    assert first != second
+    assert first.startswith("/media/") and first.endswith(".jpg")
+    assert (tmp_path / "media" / first.rsplit("/", 1)[1]).read_bytes() == data
+
+
+class FlakyStorage:
+    """Handler for httpx.MockTransport answering with `statuses` in turn; None raises a connection error."""
+
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.bodies = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.bodies.append(await request.aread())
+        status = self.statuses.pop(0)
+        if status is None:
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(status)
+
+
+@pytest.fixture
+def s3(monkeypatch):
+    """Route uploads to an S3 backend on a mock transport and record the backoff delays instead of sleeping."""
+    delays = []
+
+    async def no_sleep(delay):
+        delays.append(delay)
+
+    def use(handler):
+        monkeypatch.setattr(storage, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        return delays
+
+    monkeypatch.setattr(storage, "get_storage", lambda: S3Storage("http://s3.test", "bucket", "us-east-1",
+                                                                  "key-id", "secret"))
+    monkeypatch.setattr(storage.asyncio, "sleep", no_sleep)
+    return use
+
+
+def test_upload_retries_transient_failures_with_jittered_backoff(s3):
+    handler = FlakyStorage(503, None, 200)
+    delays = s3(handler)
+    data = b"image bytes" * 1000
+
+    url = asyncio.run(upload_image(io.BytesIO(data), "photo.png", "image/png"))
+
+    assert url.startswith("http://s3.test/bucket/") and url.endswith(".png")
+    # Every attempt sends the whole file again from the start
+    assert handler.bodies == [data, data, data]
+    assert len(delays) == 2
+    for attempt, delay in enumerate(delays):
+        assert 0 <= delay <= settings.UPLOAD_RETRY_BACKOFF_SECONDS * 2 ** attempt
+
+
+def test_upload_gives_up_after_max_retries(s3):
+    handler = FlakyStorage(*[500] * (settings.UPLOAD_MAX_RETRIES + 1))
+    delays = s3(handler)
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(upload_image(io.BytesIO(b"data"), "photo.png", "image/png"))
+
+    assert error.value.status_code == 502
+    assert len(handler.bodies) == settings.UPLOAD_MAX_RETRIES + 1
+    assert len(delays) == settings.UPLOAD_MAX_RETRIES
+
+
+def test_upload_does_not_retry_client_errors(s3):
+    handler = FlakyStorage(403)
+    delays = s3(handler)
+
+    with pytest.raises(HTTPException):
+        asyncio.run(upload_image(io.BytesIO(b"data"), "photo.png", "image/png"))
+
+    assert len(handler.bodies) == 1
+    assert delays == []
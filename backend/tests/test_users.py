@@ -0,0 +1,17 @@
+# tests/test_users.py
+from backend.app.crud import crud_user_async
+
+
+def test_profile_update_of_a_missing_user_is_a_404(client, auth_headers, monkeypatch):
+    async def gone(db, user_id, *args):
+        return None
+
+    headers = auth_headers("vanished@example.com")
+    monkeypatch.setattr(crud_user_async, "update_user_profile", gone)
+    monkeypatch.setattr(crud_user_async, "update_user_profile_photo", gone)
+
+    response = client.patch("/api/v1/users/me", headers=headers, json={"bio": "gone"})
+    assert response.status_code == 404, response.text
+    response = client.patch("/api/v1/users/me/profile-photo", headers=headers,
+                            files={"profile_photo": ("photo.png", b"not read", "image/png")})
+    assert response.status_code == 404, response.text
@@ -0,0 +1,51 @@
+# tests/test_waste_collection_bulk.py
+import orjson
+import pytest
+
+from backend.app.core.config import settings
+from backend.app.models import User
+from backend.app.services.reference_data import reference_data
+
+BULK = "/api/v1/waste-collection/bulk"
+
+
+@pytest.fixture
+def collector(client, auth_headers):
+    headers = auth_headers("bulk-collector@example.com")
+    return headers, client.get("/api/v1/users/me", headers=headers).json()["id"]
+
+
+def item(waste_type: str, **overrides):
+    return {"waste_type": waste_type, "quantity": 1.5, "collection_date": "2024-05-01T10:00:00",
+            "location_latitude": 52.5, "location_longitude": 13.4, **overrides}
+
+
+@pytest.mark.parametrize("ndjson", [False, True])
+def test_bulk_reports_bad_items_and_rewards_the_rest(client, collector, db, ndjson):
+    headers, user_id = collector
+    rewarded = next(entry for entry in reference_data.waste_types(db) if entry.reward_points)
+    items = [item(rewarded.name), item("no-such-type"), item(rewarded.name, quantity="lots"), item(rewarded.name)]
+    db.expire_all()
+    before = db.get(User, user_id).balance
+
+    if ndjson:
+        response = client.post(BULK, headers={**headers, "Content-Type": "application/x-ndjson"},
+                               content=b"\n".join(orjson.dumps(entry) for entry in items))
+    else:
+        response = client.post(BULK, headers=headers, content=orjson.dumps(items))
+    assert response.status_code == 200, response.text
+    result = response.json()
+
+    assert (result["received"], result["created"]) == (4, 2)
+    assert result["reward_points"] == 2 * rewarded.reward_points
+    assert [error["index"] for error in result["errors"]] == [1, 2]
+    assert "Unknown waste type" in result["errors"][0]["detail"]
+    assert "quantity" in result["errors"][1]["detail"]
+    db.expire_all()
+    assert db.get(User, user_id).balance == before + result["reward_points"]
+
+
+def test_bulk_array_over_the_byte_cap_is_refused(client, collector, monkeypatch):
+    monkeypatch.setattr(settings, "WASTE_COLLECTION_BULK_MAX_BYTES", 1000)
+    body = orjson.dumps([item("plastic")] * 20)
+    assert client.post(BULK, headers=collector[0], content=body).status_code == 413
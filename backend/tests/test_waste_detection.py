@@ -0,0 +1,41 @@
+# tests/test_waste_detection.py
+import asyncio
+import io
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+
+from backend.app.core.config import settings
+from backend.app.services.waste_detection import WasteDetector, WasteModel
+
+
+def test_models_must_implement_predict():
+    class Incomplete(WasteModel):
+        labels = ["plastic"]
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_broken_preprocessing_pool_is_replaced(monkeypatch):
+    monkeypatch.setattr(settings, "WASTE_DETECTION_PREPROCESS_WORKERS", 1)
+    buffer = io.BytesIO()
+    Image.new("RGB", (32, 32), (200, 10, 10)).save(buffer, "PNG")
+    detector = WasteDetector()
+    detector._pool = broken = detector._new_pool()
+    # A worker dying, as when the OOM killer picks it, breaks the whole pool
+    with pytest.raises(BrokenProcessPool):
+        broken.submit(os._exit, 1).result()
+
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(detector._pixels(buffer.getvalue(), 8))
+    assert error.value.status_code == 503
+
+    try:
+        assert detector._pool is not broken
+        assert len(asyncio.run(detector._pixels(buffer.getvalue(), 8))) == 8 * 8 * 3
+    finally:
+        detector._pool.shutdown()